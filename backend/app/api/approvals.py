@@ -1,17 +1,18 @@
 """Approval management API endpoints."""
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
+from app.api.idempotency import run_idempotent
 from app.core.database import get_db
 from app.core.security import require_role
-from app.models.user import User
+from app.core.principal_cache import Principal
 from app.models.approval import ApprovalRequest, ApprovalStatus
-from app.models.asset import Asset
-from app.models.site import Site
 from app.schemas.approval import ApprovalAction
 from app.schemas.custody import CustodyActionResponse
 from app.services.custody_service import CustodyService
+from app.services.entity_resolver import EntityResolver
+from app.services.verification_store import VerificationStore
 
 router = APIRouter(prefix="/approvals", tags=["Approvals"])
 
@@ -20,7 +21,7 @@ router = APIRouter(prefix="/approvals", tags=["Approvals"])
 async def list_approvals(
     status_filter: str = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN", "MANAGER"]))
+    current_user: Principal = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
     """List approval requests (Manager/Admin only)."""
     query = db.query(ApprovalRequest)
@@ -29,13 +30,18 @@ async def list_approvals(
         query = query.filter(ApprovalRequest.status == status_filter)
     
     approvals = query.order_by(ApprovalRequest.created_at.desc()).all()
+    resolver = EntityResolver(db).load(
+        asset_ids=[approval.asset_id for approval in approvals],
+        user_ids=[approval.requester_id for approval in approvals] + [approval.target_user_id for approval in approvals],
+        site_ids=[approval.site_id for approval in approvals]
+    )
     result = []
     
     for approval in approvals:
-        asset = db.query(Asset).filter(Asset.id == approval.asset_id).first()
-        requester = db.query(User).filter(User.id == approval.requester_id).first()
-        site = db.query(Site).filter(Site.id == approval.site_id).first() if approval.site_id else None
-        target_user = db.query(User).filter(User.id == approval.target_user_id).first() if approval.target_user_id else None
+        asset = resolver.asset(approval.asset_id)
+        requester = resolver.user(approval.requester_id)
+        site = resolver.site(approval.site_id)
+        target_user = resolver.user(approval.target_user_id)
         
         result.append({
             "id": approval.id,
@@ -71,7 +77,7 @@ async def list_approvals(
 async def get_approval(
     approval_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN", "MANAGER"]))
+    current_user: Principal = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
     """Get approval request by ID."""
     approval = db.query(ApprovalRequest).filter(ApprovalRequest.id == approval_id).first()
@@ -81,10 +87,15 @@ async def get_approval(
             detail="Approval request not found"
         )
     
-    asset = db.query(Asset).filter(Asset.id == approval.asset_id).first()
-    requester = db.query(User).filter(User.id == approval.requester_id).first()
-    site = db.query(Site).filter(Site.id == approval.site_id).first() if approval.site_id else None
-    target_user = db.query(User).filter(User.id == approval.target_user_id).first() if approval.target_user_id else None
+    resolver = EntityResolver(db).load(
+        asset_ids=[approval.asset_id],
+        user_ids=[approval.requester_id, approval.target_user_id],
+        site_ids=[approval.site_id]
+    )
+    asset = resolver.asset(approval.asset_id)
+    requester = resolver.user(approval.requester_id)
+    site = resolver.site(approval.site_id)
+    target_user = resolver.user(approval.target_user_id)
     
     return {
         "id": approval.id,
@@ -93,7 +104,7 @@ async def get_approval(
         "justification": approval.reason,
         "status": approval.status,
         "resolved_at": approval.resolved_at.isoformat() if approval.resolved_at else None,
-        "verification_summary": approval.verification_summary,
+        "verification_summary": VerificationStore(db).text_for(approval),
         "asset": {
             "id": asset.id,
             "name": asset.name,
@@ -127,69 +138,87 @@ class ProcessApprovalRequest(BaseModel):
 async def process_approval(
     approval_id: int,
     request: ProcessApprovalRequest,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN", "MANAGER"]))
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: Principal = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
     """Process (approve or reject) an approval request."""
-    try:
-        service = CustodyService(db)
-        approved = request.action == 'APPROVED'
-        return service.process_approval(
-            approval_id=approval_id,
-            manager=current_user,
-            approved=approved,
-            note=request.note
-        )
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
+    async def run():
+        try:
+            service = CustodyService(db)
+            approved = request.action == 'APPROVED'
+            return service.process_approval(
+                approval_id=approval_id,
+                manager=current_user,
+                approved=approved,
+                note=request.note
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
+    payload = {"approval_id": approval_id, "request": request}
+    return await run_idempotent(db, response, idempotency_key, current_user, "approvals.process", payload, run)
 
 
 @router.post("/{approval_id}/approve", response_model=CustodyActionResponse)
 async def approve_request(
     approval_id: int,
+    response: Response,
     action: ApprovalAction = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN", "MANAGER"]))
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: Principal = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
     """Approve an approval request."""
-    try:
-        service = CustodyService(db)
-        note = action.note if action else None
-        return service.process_approval(
-            approval_id=approval_id,
-            manager=current_user,
-            approved=True,
-            note=note
-        )
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
+    async def run():
+        try:
+            service = CustodyService(db)
+            note = action.note if action else None
+            return service.process_approval(
+                approval_id=approval_id,
+                manager=current_user,
+                approved=True,
+                note=note
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
+    payload = {"approval_id": approval_id, "request": action}
+    return await run_idempotent(db, response, idempotency_key, current_user, "approvals.approve", payload, run)
 
 
 @router.post("/{approval_id}/reject", response_model=CustodyActionResponse)
 async def reject_request(
     approval_id: int,
+    response: Response,
     action: ApprovalAction = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN", "MANAGER"]))
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: Principal = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
     """Reject an approval request."""
-    try:
-        service = CustodyService(db)
-        note = action.note if action else None
-        return service.process_approval(
-            approval_id=approval_id,
-            manager=current_user,
-            approved=False,
-            note=note
-        )
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
+    async def run():
+        try:
+            service = CustodyService(db)
+            note = action.note if action else None
+            return service.process_approval(
+                approval_id=approval_id,
+                manager=current_user,
+                approved=False,
+                note=note
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
+    payload = {"approval_id": approval_id, "request": action}
+    return await run_idempotent(db, response, idempotency_key, current_user, "approvals.reject", payload, run)
@@ -1,15 +1,21 @@
 """Asset management API endpoints."""
+import json
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.security import require_role, get_current_user
+from app.core.database import get_db, SessionLocal
+from app.core.security import require_role, get_current_principal
+from app.core.principal_cache import Principal
 from app.models.asset import Asset
 from app.models.site import Site
 from app.models.user import User
-from app.models.audit import AuditEvent
 from app.schemas.asset import AssetCreate, AssetUpdate
+from app.services.audit_service import AuditService
+from app.services.bulk_import import AssetImporter, spool_body
+from app.services.entity_resolver import EntityResolver
+from app.services.custody_service import CustodyService
 
 router = APIRouter(prefix="/assets", tags=["Assets"])
 
@@ -38,7 +44,7 @@ async def list_assets(
     status_filter: Optional[str] = Query(None, description="Filter by status"),
     sensitivity: Optional[str] = Query(None, description="Filter by sensitivity"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """List all assets with optional filters."""
     query = db.query(Asset)
@@ -61,11 +67,15 @@ async def list_assets(
         )
     
     assets = query.all()
+    resolver = EntityResolver(db).load(
+        user_ids=[asset.current_custodian_id for asset in assets],
+        site_ids=[asset.site_id for asset in assets]
+    )
     result = []
     
     for asset in assets:
-        site = db.query(Site).filter(Site.id == asset.site_id).first() if asset.site_id else None
-        custodian = db.query(User).filter(User.id == asset.current_custodian_id).first() if asset.current_custodian_id else None
+        site = resolver.site(asset.site_id)
+        custodian = resolver.user(asset.current_custodian_id)
         result.append(asset_to_dict(asset, site, custodian))
     
     return result
@@ -75,7 +85,7 @@ async def list_assets(
 async def create_asset(
     asset_data: AssetCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN"]))
+    current_user: Principal = Depends(require_role(["ADMIN"]))
 ):
     """Create a new asset (Admin only)."""
     # Check if tag_id already exists
@@ -108,11 +118,39 @@ async def create_asset(
     return asset_to_dict(asset)
 
 
+@router.post("/import")
+async def import_assets(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$", description="Body format, by default from Content-Type"),
+    current_user: Principal = Depends(require_role(["ADMIN"]))
+):
+    """
+    Create assets from a CSV or NDJSON body of AssetCreate rows (Admin only).
+    
+    The response streams NDJSON events: one per rejected row, progress
+    after every chunk and a final summary.
+    """
+    body = await spool_body(request.stream())
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    
+    async def generate():
+        db = SessionLocal()
+        try:
+            async for event in AssetImporter(db).run(body, format):
+                yield json.dumps(event) + "\n"
+        finally:
+            db.close()
+            body.close()
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.get("/{asset_id}")
 async def get_asset(
     asset_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get asset by ID."""
     asset = db.query(Asset).filter(Asset.id == asset_id).first()
@@ -132,7 +170,7 @@ async def get_asset(
 async def get_asset_history(
     asset_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get asset custody history from audit events."""
     asset = db.query(Asset).filter(Asset.id == asset_id).first()
@@ -142,13 +180,19 @@ async def get_asset_history(
             detail="Asset not found"
         )
     
-    events = db.query(AuditEvent).filter(AuditEvent.asset_id == asset_id).order_by(AuditEvent.timestamp.desc()).limit(50).all()
+    # Continues into sealed segments when the hot table holds fewer than 50
+    events = AuditService(db).get_events(asset_id=asset_id, limit=50)
+    
+    resolver = EntityResolver(db).load(
+        user_ids=[event.actor_user_id for event in events] + [event.target_user_id for event in events],
+        site_ids=[event.site_id for event in events]
+    )
     
     result = []
     for event in events:
-        actor = db.query(User).filter(User.id == event.actor_user_id).first()
-        target = db.query(User).filter(User.id == event.target_user_id).first() if event.target_user_id else None
-        site = db.query(Site).filter(Site.id == event.site_id).first() if event.site_id else None
+        actor = resolver.user(event.actor_user_id)
+        target = resolver.user(event.target_user_id)
+        site = resolver.site(event.site_id)
         
         result.append({
             "id": event.id,
@@ -166,10 +210,17 @@ async def get_asset_history(
 @router.get("/tag/{tag_id}")
 async def get_asset_by_tag(
     tag_id: str,
+    speculate: bool = Query(False, description="Start verifying the user at the asset's site"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Get asset by tag ID (for scanning)."""
+    """
+    Get asset by tag ID (for scanning).
+    
+    With speculate, verification of the current user at the asset's site
+    starts in the background, and the user's next custody action there uses
+    the result while it is fresh.
+    """
     asset = db.query(Asset).filter(Asset.tag_id == tag_id).first()
     if not asset:
         raise HTTPException(
@@ -180,7 +231,10 @@ async def get_asset_by_tag(
     site = db.query(Site).filter(Site.id == asset.site_id).first() if asset.site_id else None
     custodian = db.query(User).filter(User.id == asset.current_custodian_id).first() if asset.current_custodian_id else None
     
-    return asset_to_dict(asset, site, custodian)
+    result = asset_to_dict(asset, site, custodian)
+    if speculate:
+        result["verification_started"] = site is not None and CustodyService(db).speculate(current_user, site.id)
+    return result
 
 
 @router.put("/{asset_id}")
@@ -188,7 +242,7 @@ async def update_asset(
     asset_id: int,
     asset_data: AssetUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN"]))
+    current_user: Principal = Depends(require_role(["ADMIN"]))
 ):
     """Update an asset (Admin only)."""
     asset = db.query(Asset).filter(Asset.id == asset_id).first()
@@ -212,7 +266,7 @@ async def update_asset(
 async def delete_asset(
     asset_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN"]))
+    current_user: Principal = Depends(require_role(["ADMIN"]))
 ):
     """Delete an asset (Admin only)."""
     asset = db.query(Asset).filter(Asset.id == asset_id).first()
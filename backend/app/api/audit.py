@@ -1,57 +1,117 @@
 """Audit trail API endpoints."""
 from typing import List, Optional
+from datetime import datetime
+import csv
+import io
 import json
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.security import get_current_user
-from app.models.user import User
-from app.models.asset import Asset
-from app.models.site import Site
+from app.core.database import get_db, SessionLocal
+from app.core.security import get_current_principal, require_role
+from app.core.principal_cache import Principal
 from app.models.audit import AuditEvent
 from app.schemas.audit import ChainVerificationResult
-from app.services.audit_service import AuditService
+from app.services.audit_service import (
+    AuditService,
+    EXPORT_FIELDS,
+    chain_key_for,
+    encode_cursor
+)
+from app.services.audit_anchor import AuditAnchors, anchor_to_dict
+from app.services.audit_archive import AuditArchive, hot_cutoff, segment_to_dict
+from app.services.audit_search import AuditSearchIndex
+from app.services.audit_journal import get_journal
+from app.services.entity_resolver import EntityResolver
+from app.core.config import settings
 
 router = APIRouter(prefix="/audit", tags=["Audit"])
 
 
+def risk_signal_filters(
+    number_match: Optional[bool] = Query(None, description="Filter by phone number match"),
+    inside_geofence: Optional[bool] = Query(None, description="Filter by geofence outcome"),
+    sim_swap: Optional[bool] = Query(None, description="Filter by recent SIM swap"),
+    device_swap: Optional[bool] = Query(None, description="Filter by recent device swap"),
+    gateway_error: Optional[bool] = Query(None, description="Filter by gateway error")
+) -> dict:
+    """Collect structured verification outcome filters."""
+    return {
+        "number_match": number_match,
+        "inside_geofence": inside_geofence,
+        "sim_swap": sim_swap,
+        "device_swap": device_swap,
+        "gateway_error": gateway_error
+    }
+
+
 @router.get("/events")
 async def list_audit_events(
+    response: Response,
     asset_id: Optional[int] = Query(None, description="Filter by asset ID"),
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     event_type: Optional[str] = Query(None, description="Filter by event type"),
     decision: Optional[str] = Query(None, description="Filter by decision"),
-    limit: int = Query(100, description="Maximum number of events to return"),
+    site_id: Optional[int] = Query(None, description="Filter by site ID"),
+    since: Optional[datetime] = Query(None, description="Only events at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only events before this time"),
+    signals: dict = Depends(risk_signal_filters),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of events to return"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """List audit events with optional filters."""
-    query = db.query(AuditEvent)
+    """
+    List audit events with optional filters, newest first.
     
-    if asset_id:
-        query = query.filter(AuditEvent.asset_id == asset_id)
-    if user_id:
-        query = query.filter(AuditEvent.actor_user_id == user_id)
-    if event_type:
-        query = query.filter(AuditEvent.action == event_type)
-    if decision:
-        query = query.filter(AuditEvent.decision == decision)
+    When more events may follow, the cursor for the next page is returned
+    in the X-Next-Cursor response header.
+    """
+    service = AuditService(db)
+    try:
+        events = service.get_events(
+            asset_id=asset_id,
+            user_id=user_id,
+            limit=limit,
+            action=event_type,
+            decision=decision,
+            since=since,
+            until=until,
+            cursor=cursor,
+            site_id=site_id,
+            signals=signals
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    events = query.order_by(AuditEvent.timestamp.desc()).limit(limit).all()
+    if len(events) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(events[-1])
+    
+    resolver = EntityResolver(db).load(
+        asset_ids=[event.asset_id for event in events],
+        user_ids=[event.actor_user_id for event in events] + [event.target_user_id for event in events],
+        site_ids=[event.site_id for event in events]
+    )
+    summaries = service.verification_store.get_many(event.verification_hash for event in events)
     
     result = []
     for event in events:
-        asset = db.query(Asset).filter(Asset.id == event.asset_id).first()
-        actor = db.query(User).filter(User.id == event.actor_user_id).first()
-        site = db.query(Site).filter(Site.id == event.site_id).first() if event.site_id else None
-        target = db.query(User).filter(User.id == event.target_user_id).first() if event.target_user_id else None
+        asset = resolver.asset(event.asset_id)
+        actor = resolver.user(event.actor_user_id)
+        site = resolver.site(event.site_id)
+        target = resolver.user(event.target_user_id)
         
         # Parse verification summary
         verification_results = {}
-        if event.verification_summary:
+        verification_text = service.verification_store.text_for(event, summaries)
+        if verification_text:
             try:
-                verification_results = json.loads(event.verification_summary)
+                verification_results = json.loads(verification_text)
             except:
                 pass
         
@@ -78,6 +138,14 @@ async def list_audit_events(
                 "name": site.name
             } if site else None,
             "verification_results": verification_results,
+            "signals": {
+                "number_match": event.number_match,
+                "inside_geofence": event.inside_geofence,
+                "sim_swap": event.sim_swap,
+                "device_swap": event.device_swap,
+                "match_rate": event.match_rate,
+                "gateway_error": event.gateway_error
+            },
             "event_hash": event.hash,
             "prev_hash": event.prev_hash
         })
@@ -85,13 +153,340 @@ async def list_audit_events(
     return result
 
 
+@router.get("/search")
+async def search_audit_trail(
+    response: Response,
+    q: str = Query(..., min_length=1, description="Free text: reasons, asset names, actors, gateway errors"),
+    kind: Optional[str] = Query(None, pattern="^(event|approval)$", description="Only audit events or only approval requests"),
+    offset: int = Query(0, ge=0, le=10000),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Full-text search over audit events and approval requests, best match first.
+    
+    When more results may follow, the offset of the next page is returned in
+    the X-Next-Offset response header.
+    """
+    search_index = AuditSearchIndex(db)
+    try:
+        hits = search_index.search(q, kind=kind, limit=limit, offset=offset)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if len(hits) == limit:
+        response.headers["X-Next-Offset"] = str(offset + limit)
+    
+    events, approvals = search_index.load(hits)
+    records = list(events.values()) + list(approvals.values())
+    resolver = EntityResolver(db).load(
+        asset_ids=[record.asset_id for record in records],
+        user_ids=[event.actor_user_id for event in events.values()] + [approval.requester_id for approval in approvals.values()]
+    )
+    
+    result = []
+    for kind_, ref_id, rank, snippet in hits:
+        if kind_ == "event":
+            record = events.get(ref_id)
+            if record is None:
+                continue
+            timestamp, decision, actor_id = record.timestamp, record.decision, record.actor_user_id
+            reason = None
+        else:
+            record = approvals.get(ref_id)
+            if record is None:
+                continue
+            timestamp, decision, actor_id = record.created_at, record.status, record.requester_id
+            reason = record.reason
+        asset = resolver.asset(record.asset_id)
+        actor = resolver.user(actor_id)
+        
+        result.append({
+            "kind": kind_,
+            "id": ref_id,
+            "rank": rank,
+            "snippet": snippet,
+            "timestamp": timestamp.isoformat() if timestamp else None,
+            "event_type": record.action,
+            "decision": decision,
+            "reason": reason,
+            "asset": {
+                "id": asset.id,
+                "name": asset.name,
+                "tag_id": asset.tag_id
+            } if asset else None,
+            "actor": {
+                "id": actor.id,
+                "full_name": actor.full_name
+            } if actor else None
+        })
+    
+    return result
+
+
+@router.get("/events/export")
+async def export_audit_events(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format"),
+    asset_id: Optional[int] = Query(None, description="Filter by asset ID"),
+    user_id: Optional[int] = Query(None, description="Filter by user ID"),
+    event_type: Optional[str] = Query(None, description="Filter by event type"),
+    decision: Optional[str] = Query(None, description="Filter by decision"),
+    site_id: Optional[int] = Query(None, description="Filter by site ID"),
+    since: Optional[datetime] = Query(None, description="Only events at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only events before this time"),
+    signals: dict = Depends(risk_signal_filters),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Stream the full filtered audit trail as NDJSON or CSV.
+    
+    Rows are written as they are read from the database, so server memory
+    stays constant however large the export is. The stream uses its own
+    session because it outlives the request-scoped one.
+    """
+    filters = dict(
+        asset_id=asset_id,
+        user_id=user_id,
+        action=event_type,
+        decision=decision,
+        since=since,
+        until=until,
+        site_id=site_id,
+        signals=signals
+    )
+    
+    def generate_ndjson():
+        db = SessionLocal()
+        try:
+            for row in AuditService(db).iter_export_rows(**filters):
+                yield json.dumps(row) + "\n"
+        finally:
+            db.close()
+    
+    def generate_csv():
+        db = SessionLocal()
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        try:
+            writer.writeheader()
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            for row in AuditService(db).iter_export_rows(**filters):
+                writer.writerow(row)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        finally:
+            db.close()
+    
+    if format == "csv":
+        return StreamingResponse(
+            generate_csv(),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=audit_events.csv"}
+        )
+    return StreamingResponse(
+        generate_ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=audit_events.ndjson"}
+    )
+
+
+@router.get("/signal-stats")
+async def get_signal_stats(
+    since: Optional[datetime] = Query(None, description="Only events at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only events before this time"),
+    action: Optional[str] = Query(None, description="Filter by action"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_role(["ADMIN", "MANAGER"]))
+):
+    """
+    Count verification outcomes per site and decision.
+    
+    Aggregates the structured signal columns in SQL, e.g. how many STEP_UPs
+    at each site were accompanied by a SIM swap in a given week. Events in
+    sealed segments are counted too when the range reaches them.
+    """
+    query = db.query(
+        AuditEvent.site_id,
+        AuditEvent.decision,
+        func.count(AuditEvent.id),
+        func.sum(case((AuditEvent.number_match == False, 1), else_=0)),
+        func.sum(case((AuditEvent.inside_geofence == False, 1), else_=0)),
+        func.sum(case((AuditEvent.sim_swap == True, 1), else_=0)),
+        func.sum(case((AuditEvent.device_swap == True, 1), else_=0)),
+        func.sum(case((AuditEvent.gateway_error == True, 1), else_=0))
+    )
+    if since:
+        query = query.filter(AuditEvent.timestamp >= since)
+    if until:
+        query = query.filter(AuditEvent.timestamp < until)
+    if action:
+        query = query.filter(AuditEvent.action == action)
+    
+    counts = {
+        (site_id, decision): [total, *(value or 0 for value in signals)]
+        for site_id, decision, total, *signals in query.group_by(AuditEvent.site_id, AuditEvent.decision)
+    }
+    archive = AuditArchive(db)
+    if archive.needed_for(since):
+        for row in archive.iter_matching(since=since, until=until, action=action):
+            key = (row["site_id"], row["decision"])
+            counts[key] = [
+                value + increment for value, increment in zip(counts.get(key, [0] * 6), (
+                    1,
+                    row["number_match"] is False,
+                    row["inside_geofence"] is False,
+                    row["sim_swap"] is True,
+                    row["device_swap"] is True,
+                    row["gateway_error"] is True
+                ))
+            ]
+    resolver = EntityResolver(db).load(site_ids=[site_id for site_id, _ in counts])
+    
+    result = []
+    for (site_id, decision), (total, number_mismatch, outside_geofence, sim_swap, device_swap, gateway_error) in counts.items():
+        site = resolver.site(site_id)
+        result.append({
+            "site": {"id": site.id, "name": site.name} if site else None,
+            "decision": decision,
+            "total": total,
+            "number_mismatch": number_mismatch,
+            "outside_geofence": outside_geofence,
+            "sim_swap": sim_swap,
+            "device_swap": device_swap,
+            "gateway_error": gateway_error
+        })
+    
+    return result
+
+
+@router.get("/segments")
+async def list_audit_segments(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_role(["ADMIN", "MANAGER"]))
+):
+    """List sealed (cold) audit segments."""
+    return [segment_to_dict(segment) for segment in AuditArchive(db).segments()]
+
+
+@router.post("/segments/seal")
+async def seal_audit_segments(
+    before: Optional[datetime] = Query(None, description="Seal whole months ending on or before this time"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_role(["ADMIN"]))
+):
+    """
+    Seal old months of the audit trail into immutable segment files (Admin only).
+    
+    Defaults to keeping AUDIT_HOT_MONTHS months hot.
+    """
+    if before is None:
+        if not settings.AUDIT_HOT_MONTHS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Provide 'before' or configure AUDIT_HOT_MONTHS"
+            )
+        before = hot_cutoff(settings.AUDIT_HOT_MONTHS)
+    
+    segments = AuditArchive(db).seal_before(before)
+    return [segment_to_dict(segment) for segment in segments]
+
+
+@router.get("/anchors")
+async def list_audit_anchors(
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_role(["ADMIN", "MANAGER"]))
+):
+    """List the most recent signed anchors over the audit chain heads."""
+    return [anchor_to_dict(anchor) for anchor in AuditAnchors(db).recent(limit)]
+
+
+@router.post("/anchors")
+async def create_audit_anchor(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_role(["ADMIN"]))
+):
+    """Sign the current chain heads now (Admin only)."""
+    try:
+        anchor = AuditAnchors(db).commit()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if anchor is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No new events to anchor"
+        )
+    return anchor_to_dict(anchor)
+
+
+def _journal_or_400():
+    journal = get_journal()
+    if journal is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Audit journal is not enabled (set AUDIT_JOURNAL_DIR)"
+        )
+    return journal
+
+
+@router.get("/journal/reconcile")
+async def reconcile_audit_journal(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_role(["ADMIN"]))
+):
+    """
+    Compare the binary audit journal with the database (Admin only).
+    
+    Also verifies the hash chain from the journal records alone.
+    """
+    journal = _journal_or_400()
+    result = journal.reconcile(db)
+    result["chain"] = journal.verify()
+    return result
+
+
+@router.post("/journal/reconcile")
+async def repair_audit_journal(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_role(["ADMIN"]))
+):
+    """
+    Reconcile the audit journal and append events missing from its tail
+    (Admin only).
+    """
+    journal = _journal_or_400()
+    result = journal.reconcile(db, repair=True)
+    result["chain"] = journal.verify()
+    return result
+
+
 @router.get("/verify-chain", response_model=ChainVerificationResult)
 async def verify_audit_chain(
+    asset_id: Optional[int] = Query(None, description="Verify only this asset's chain (asset topology)"),
+    site_id: Optional[int] = Query(None, description="Verify only this site's chain (site topology)"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Verify the integrity of the audit chain."""
+    """
+    Verify the integrity of the audit chain.
+    
+    With asset_id or site_id only that shard is verified; otherwise all
+    shards are verified in parallel and checked against the global roots.
+    """
+    chain_key = None
+    if asset_id is not None:
+        chain_key = chain_key_for(asset_id, None, topology="asset")
+    elif site_id is not None:
+        chain_key = chain_key_for(None, site_id, topology="site")
+    
     service = AuditService(db)
-    result = service.verify_chain()
+    result = service.verify_chain(chain_key)
     
     return ChainVerificationResult(**result)
@@ -5,9 +5,10 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.security import (
-    verify_password,
+    verify_password_async,
     create_access_token,
-    get_current_user
+    get_current_user,
+    principal_claims
 )
 from app.core.config import settings
 from app.models.user import User
@@ -33,8 +34,10 @@ def user_to_dict(user: User) -> dict:
 async def login(request: LoginRequest, db: Session = Depends(get_db)):
     """Authenticate user and return JWT token."""
     user = db.query(User).filter(User.email == request.email).first()
+    # Return the connection while bcrypt runs; the user stays readable
+    db.close()
     
-    if not user or not verify_password(request.password, user.hashed_password):
+    if not user or not await verify_password_async(request.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -48,7 +51,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
         )
     
     access_token = create_access_token(
-        data={"sub": str(user.id), "email": user.email, "role": user.role},
+        data=principal_claims(user),
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     
@@ -1,106 +1,344 @@
 """Custody transaction API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.security import get_current_user
-from app.models.user import User
+from app.api.idempotency import run_idempotent
+from app.core.database import get_db, SessionLocal
+from app.core.principal_cache import Principal
+from app.core.security import get_current_principal
+from app.models.custody_job import CustodyJob
 from app.schemas.custody import (
     CheckoutRequest,
     ReturnRequest,
     TransferRequest,
     InventoryCloseRequest,
-    CustodyActionResponse
+    CustodyActionResponse,
+    BulkCustodyRequest,
+    BulkTransferRequest,
+    BulkCustodyResponse,
+    CustodyJobAccepted,
+    CustodyJobResponse
 )
 from app.services.custody_service import CustodyService
+from app.services.custody_jobs import FINAL_STATUSES, JobAction, custody_jobs, job_is_stale
 
 router = APIRouter(prefix="/custody", tags=["Custody"])
 
+# Comment lines keep idle event streams open through proxies
+SSE_KEEPALIVE_SECONDS = 15
 
-@router.post("/checkout", response_model=CustodyActionResponse)
+
+def respond_async(prefer: Optional[str]) -> bool:
+    """Whether the client asked for asynchronous processing (RFC 7240 Prefer)."""
+    if not prefer:
+        return False
+    return any(part.split("=")[0].strip().lower() == "respond-async" for part in prefer.split(","))
+
+
+async def run_custody_action(
+    db: Session,
+    response: Response,
+    user: Principal,
+    request,
+    action: str,
+    scope: str,
+    idempotency_key: Optional[str],
+    prefer: Optional[str],
+    run: JobAction
+):
+    """
+    Run a custody action for the current user, or accept it as a background
+    job when the client sends "Prefer: respond-async".
+    
+    run gets the service and user to act with, so it must not hold on to the
+    request's session: background jobs run it in a session of their own.
+    """
+    if respond_async(prefer):
+        async def submit():
+            job = custody_jobs.submit(db, user, action, run)
+            return CustodyJobAccepted(
+                job_id=job.id,
+                status=job.status,
+                status_url=f"/api/custody/jobs/{job.id}",
+                events_url=f"/api/custody/jobs/{job.id}/events"
+            )
+        
+        accepted = await run_idempotent(db, response, idempotency_key, user, f"{scope}.async", request, submit)
+        response.status_code = status.HTTP_202_ACCEPTED
+        response.headers["Location"] = accepted["status_url"] if isinstance(accepted, dict) else accepted.status_url
+        response.headers["Preference-Applied"] = "respond-async"
+        return accepted
+    
+    async def execute():
+        try:
+            return await run(CustodyService(db), user)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
+    return await run_idempotent(db, response, idempotency_key, user, scope, request, execute)
+
+
+@router.post("/checkout", response_model=Union[CustodyActionResponse, CustodyJobAccepted])
 async def checkout_asset(
     request: CheckoutRequest,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    prefer: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Check out an asset to the current user."""
-    try:
-        service = CustodyService(db)
-        return await service.checkout(
+    return await run_custody_action(
+        db, response, current_user, request, "CHECK_OUT", "custody.checkout", idempotency_key, prefer,
+        lambda service, user: service.checkout(
             asset_id=request.asset_id,
             site_id=request.site_id,
-            user=current_user,
-            mock_context=request.mock_context
-        )
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
+            user=user,
+            mock_context=request.mock_context,
+            device_id=request.device_id
         )
+    )
 
 
-@router.post("/return", response_model=CustodyActionResponse)
+@router.post("/return", response_model=Union[CustodyActionResponse, CustodyJobAccepted])
 async def return_asset(
     request: ReturnRequest,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    prefer: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Return a checked-out asset."""
-    try:
-        service = CustodyService(db)
-        return await service.return_asset(
+    return await run_custody_action(
+        db, response, current_user, request, "CHECK_IN", "custody.return", idempotency_key, prefer,
+        lambda service, user: service.return_asset(
             asset_id=request.asset_id,
             site_id=request.site_id,
-            user=current_user,
-            mock_context=request.mock_context
-        )
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
+            user=user,
+            mock_context=request.mock_context,
+            device_id=request.device_id
         )
+    )
 
 
-@router.post("/transfer", response_model=CustodyActionResponse)
+@router.post("/transfer", response_model=Union[CustodyActionResponse, CustodyJobAccepted])
 async def transfer_asset(
     request: TransferRequest,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    prefer: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Transfer asset custody to another user."""
-    try:
-        service = CustodyService(db)
-        return await service.transfer(
+    return await run_custody_action(
+        db, response, current_user, request, "TRANSFER", "custody.transfer", idempotency_key, prefer,
+        lambda service, user: service.transfer(
             asset_id=request.asset_id,
             site_id=request.site_id,
-            user=current_user,
+            user=user,
             target_user_id=request.target_user_id,
-            mock_context=request.mock_context
-        )
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
+            mock_context=request.mock_context,
+            device_id=request.device_id
         )
+    )
 
 
-@router.post("/inventory-close", response_model=CustodyActionResponse)
+@router.post("/inventory-close", response_model=Union[CustodyActionResponse, CustodyJobAccepted])
 async def inventory_close(
     request: InventoryCloseRequest,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    prefer: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Close inventory cycle for an asset."""
-    try:
-        service = CustodyService(db)
-        return await service.inventory_close(
+    return await run_custody_action(
+        db, response, current_user, request, "INVENTORY_CLOSE", "custody.inventory_close", idempotency_key, prefer,
+        lambda service, user: service.inventory_close(
             asset_id=request.asset_id,
             site_id=request.site_id,
-            user=current_user,
-            mock_context=request.mock_context
+            user=user,
+            mock_context=request.mock_context,
+            device_id=request.device_id
+        )
+    )
+
+
+@router.post("/bulk/checkout", response_model=Union[BulkCustodyResponse, CustodyJobAccepted])
+async def bulk_checkout(
+    request: BulkCustodyRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    prefer: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Check out several assets to the current user with one verification."""
+    return await run_custody_action(
+        db, response, current_user, request, "CHECK_OUT", "custody.bulk_checkout", idempotency_key, prefer,
+        lambda service, user: service.bulk_action(
+            action="CHECK_OUT",
+            site_id=request.site_id,
+            user=user,
+            asset_ids=request.asset_ids,
+            tag_ids=request.tag_ids,
+            mock_context=request.mock_context,
+            device_id=request.device_id
+        )
+    )
+
+
+@router.post("/bulk/return", response_model=Union[BulkCustodyResponse, CustodyJobAccepted])
+async def bulk_return(
+    request: BulkCustodyRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    prefer: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Return several checked-out assets with one verification."""
+    return await run_custody_action(
+        db, response, current_user, request, "CHECK_IN", "custody.bulk_return", idempotency_key, prefer,
+        lambda service, user: service.bulk_action(
+            action="CHECK_IN",
+            site_id=request.site_id,
+            user=user,
+            asset_ids=request.asset_ids,
+            tag_ids=request.tag_ids,
+            mock_context=request.mock_context,
+            device_id=request.device_id
+        )
+    )
+
+
+@router.post("/bulk/transfer", response_model=Union[BulkCustodyResponse, CustodyJobAccepted])
+async def bulk_transfer(
+    request: BulkTransferRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    prefer: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Transfer custody of several assets to another user with one verification."""
+    return await run_custody_action(
+        db, response, current_user, request, "TRANSFER", "custody.bulk_transfer", idempotency_key, prefer,
+        lambda service, user: service.bulk_action(
+            action="TRANSFER",
+            site_id=request.site_id,
+            user=user,
+            asset_ids=request.asset_ids,
+            tag_ids=request.tag_ids,
+            target_user_id=request.target_user_id,
+            mock_context=request.mock_context,
+            device_id=request.device_id
+        )
+    )
+
+
+def job_to_response(job: CustodyJob) -> CustodyJobResponse:
+    """Convert a custody job to its API representation."""
+    if job_is_stale(job):
+        return CustodyJobResponse(
+            job_id=job.id,
+            action=job.action,
+            status="FAILED",
+            created_at=job.created_at,
+            poll_interval=job.poll_interval,
+            error="Job was interrupted before it finished"
         )
-    except ValueError as e:
+    return CustodyJobResponse(
+        job_id=job.id,
+        action=job.action,
+        status=job.status,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        poll_interval=job.poll_interval,
+        result=json.loads(job.result) if job.result else None,
+        error=job.error
+    )
+
+
+def _get_job(db: Session, job_id: str, user: Principal) -> CustodyJob:
+    """Get a job the user may see; other users' jobs are reported as missing."""
+    job = db.get(CustodyJob, job_id)
+    if job is None or (job.user_id != user.id and user.role not in ["ADMIN", "MANAGER"]):
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Custody job not found"
         )
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=CustodyJobResponse)
+async def get_custody_job(
+    job_id: str,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Poll a background custody job; honour Retry-After while it runs."""
+    result = job_to_response(_get_job(db, job_id, current_user))
+    if result.status not in FINAL_STATUSES:
+        response.headers["Retry-After"] = str(result.poll_interval)
+    return result
+
+
+@router.get("/jobs/{job_id}/events")
+async def custody_job_events(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Stream a background custody job's status as server-sent events.
+    
+    A "status" event is sent on every change; the stream ends after the
+    SUCCEEDED or FAILED one.
+    """
+    _get_job(db, job_id, current_user)
+    
+    async def events():
+        last = None
+        idle = 0
+        while True:
+            # The request's session is closed once streaming starts
+            stream_db = SessionLocal()
+            try:
+                job = stream_db.get(CustodyJob, job_id)
+                current = job_to_response(job) if job else None
+            finally:
+                stream_db.close()
+            if current is None:
+                return
+            
+            if current != last:
+                yield f"event: status\ndata: {current.model_dump_json()}\n\n"
+                last = current
+                idle = 0
+            if current.status in FINAL_STATUSES:
+                return
+            
+            # Jobs running in this process wake the stream as soon as they
+            # finish; otherwise re-read at the job's poll interval
+            await custody_jobs.wait(job_id, current.poll_interval)
+            idle += current.poll_interval
+            if idle >= SSE_KEEPALIVE_SECONDS:
+                yield ": keepalive\n\n"
+                idle = 0
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
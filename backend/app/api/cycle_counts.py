@@ -0,0 +1,94 @@
+"""Cycle count API endpoints."""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.principal_cache import Principal
+from app.core.security import get_current_principal
+from app.schemas.cycle_count import (
+    CycleCountOpenRequest,
+    CycleCountScanRequest,
+    CycleCountResponse,
+    CycleCountScanResponse,
+    CycleCountCloseResponse
+)
+from app.services.cycle_count_service import CycleCountService
+
+router = APIRouter(prefix="/cycle-counts", tags=["Cycle Counts"])
+
+
+@router.post("", response_model=CycleCountResponse)
+async def open_cycle_count(
+    request: CycleCountOpenRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Open a cycle count at a site, verifying the current user once."""
+    try:
+        service = CycleCountService(db)
+        cycle_count, verification_summary = await service.open(
+            site_id=request.site_id,
+            user=current_user,
+            mock_context=request.mock_context,
+            device_id=request.device_id
+        )
+        return service.to_response(cycle_count, verification_summary)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/{cycle_count_id}", response_model=CycleCountResponse)
+async def get_cycle_count(
+    cycle_count_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Get a cycle count session."""
+    service = CycleCountService(db)
+    try:
+        cycle_count = service.get(cycle_count_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    return service.to_response(cycle_count)
+
+
+@router.post("/{cycle_count_id}/scans", response_model=CycleCountScanResponse)
+async def record_scans(
+    cycle_count_id: int,
+    request: CycleCountScanRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Record a batch of scanned tag IDs; rescans are ignored."""
+    try:
+        service = CycleCountService(db)
+        accepted, scanned_count = service.record_scans(cycle_count_id, current_user, request.tag_ids)
+        return CycleCountScanResponse(accepted=accepted, scanned_count=scanned_count)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post("/{cycle_count_id}/close", response_model=CycleCountCloseResponse)
+async def close_cycle_count(
+    cycle_count_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Reconcile scans against the site's assets and close the count."""
+    try:
+        service = CycleCountService(db)
+        return service.close(cycle_count_id, current_user)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
@@ -4,13 +4,17 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from app.core.database import get_db
-from app.core.security import require_role, get_current_user
+from app.core.security import require_role, get_current_principal
+from app.core.principal_cache import Principal
 from app.core.config import settings
+from app.core.password_pool import password_pool
 from app.models.user import User
 from app.models.asset import Asset, AssetStatus
 from app.models.site import Site
 from app.models.approval import ApprovalRequest, ApprovalStatus
 from app.models.audit import AuditEvent
+from app.services.custody_service import verification_flights
+from app.services.speculative_verification import speculative_verifications
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
@@ -18,7 +22,7 @@ router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 @router.get("")
 async def get_dashboard(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get basic dashboard data for any authenticated user."""
     # Asset counts
@@ -40,7 +44,7 @@ async def get_dashboard(
 @router.get("/stats")
 async def get_dashboard_stats(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN", "MANAGER"]))
+    current_user: Principal = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
     """Get dashboard statistics."""
     # Asset counts
@@ -105,7 +109,7 @@ async def get_dashboard_stats(
 
 @router.get("/gateway-status")
 async def get_gateway_status(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get the current Telefónica Open Gateway configuration status.
@@ -137,3 +141,31 @@ async def get_gateway_status(
         },
         "documentation_url": "https://developers.opengateway.telefonica.com/reference"
     }
+
+
+@router.get("/verification-metrics")
+async def get_verification_metrics(
+    current_user: Principal = Depends(require_role(["ADMIN", "MANAGER"]))
+):
+    """
+    Get verification coalescing counters for this server process.
+    
+    coalesced counts custody requests that joined an identical verification
+    already in flight instead of calling the gateway themselves.
+    speculative counts verifications started by tag lookups: used by a
+    custody action, or discarded as stale or failed.
+    """
+    return {**verification_flights.metrics(), "speculative": speculative_verifications.metrics()}
+
+
+@router.get("/password-hash-metrics")
+async def get_password_hash_metrics(
+    current_user: Principal = Depends(require_role(["ADMIN"]))
+):
+    """
+    Get password pool counters for this server process.
+    
+    queued counts logins and password changes waiting for a worker;
+    avg_wait_ms and max_wait_ms are the time jobs waited for one.
+    """
+    return password_pool.metrics()
@@ -0,0 +1,189 @@
+"""Idempotency-Key support for custody and approval endpoints.
+
+Clients on poor links retry after timeouts. When a request carries an
+``Idempotency-Key`` header, its successful response is stored for
+``IDEMPOTENCY_TTL_SECONDS`` and replayed to retries with the same key,
+without running verification or writing anything again:
+
+- A retry of a completed request gets the stored response, marked with an
+  ``Idempotent-Replayed: true`` header.
+- A duplicate arriving while the original is still running in this process
+  waits for it and shares its response; one running in another process gets
+  409 Conflict. A claim older than ``IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS`` is
+  taken to belong to a worker that died, and the duplicate takes it over.
+- Reusing a key for a different request is rejected with 422.
+
+The record is marked completed in the same transaction as the action's audit
+events (or the custody job it queues), so a worker dying before it stores the
+response cannot leave a claim that a retry takes over and runs again; such a
+retry gets 409 instead. Failed requests are not stored, so they can be
+retried with the same key.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+from fastapi import HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.principal_cache import Principal
+from app.models.idempotency import IdempotencyRecord
+from app.services.audit_service import before_audit_commit
+from app.services.single_flight import SingleFlight
+
+IN_PROGRESS = "IN_PROGRESS"
+COMPLETED = "COMPLETED"
+
+# Requests running in this process, shared by same-key duplicates
+_requests_in_flight = SingleFlight()
+
+
+def request_fingerprint(scope: str, payload: Any) -> str:
+    """Hash the endpoint and payload a key was first used with."""
+    canonical = json.dumps([scope, jsonable_encoder(payload)], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _in_progress() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A request with this Idempotency-Key is still in progress"
+    )
+
+
+def _response_lost() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A request with this Idempotency-Key already completed, but its response was not stored"
+    )
+
+
+def _claim(db: Session, user: Principal, idempotency_key: str, scope: str, fingerprint: str, now: datetime) -> int:
+    """Claim a new key; the unique constraint settles races between processes."""
+    db.query(IdempotencyRecord).filter(IdempotencyRecord.expires_at <= now).delete(synchronize_session=False)
+    record = IdempotencyRecord(
+        user_id=user.id,
+        key=idempotency_key,
+        scope=scope,
+        request_hash=fingerprint,
+        status=IN_PROGRESS,
+        created_at=now,
+        expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+    )
+    db.add(record)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise _in_progress()
+    return record.id
+
+
+def _take_over_stale_claim(db: Session, record: IdempotencyRecord, now: datetime) -> int:
+    """
+    Take over a claim left IN_PROGRESS by a worker that died before
+    finishing, or raise 409 while the claim is recent.
+    """
+    claimed_at = record.created_at
+    if (now - claimed_at.replace(tzinfo=None)).total_seconds() < settings.IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS:
+        raise _in_progress()
+    # Only one of several duplicates can move the claim time it read
+    taken = db.query(IdempotencyRecord).filter(
+        IdempotencyRecord.id == record.id,
+        IdempotencyRecord.status == IN_PROGRESS,
+        IdempotencyRecord.created_at == claimed_at
+    ).update(
+        {"created_at": now, "expires_at": now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)},
+        synchronize_session=False
+    )
+    db.commit()
+    if not taken:
+        raise _in_progress()
+    return record.id
+
+
+async def run_idempotent(
+    db: Session,
+    response: Response,
+    idempotency_key: Optional[str],
+    user: Principal,
+    scope: str,
+    payload: Any,
+    action: Callable[[], Awaitable[Any]]
+) -> Any:
+    """Run an endpoint action at most once per user and Idempotency-Key."""
+    if not idempotency_key:
+        return await action()
+    if len(idempotency_key) > 255:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Idempotency-Key must be at most 255 characters"
+        )
+    
+    fingerprint = request_fingerprint(scope, payload)
+    replayed = True
+    
+    async def first_attempt() -> Any:
+        nonlocal replayed
+        now = datetime.utcnow()
+        record = (
+            db.query(IdempotencyRecord)
+            .filter(IdempotencyRecord.user_id == user.id, IdempotencyRecord.key == idempotency_key)
+            .first()
+        )
+        if record is not None and record.expires_at.replace(tzinfo=None) <= now:
+            db.delete(record)
+            db.flush()
+            record = None
+        
+        if record is not None:
+            if record.request_hash != fingerprint:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key was already used for a different request"
+                )
+            if record.status == COMPLETED:
+                if record.response_body is None:
+                    raise _response_lost()
+                return json.loads(record.response_body)
+            record_id = _take_over_stale_claim(db, record, now)
+        else:
+            record_id = _claim(db, user, idempotency_key, scope, fingerprint, now)
+        replayed = False
+        
+        def complete(session: Session) -> None:
+            session.query(IdempotencyRecord).filter(IdempotencyRecord.id == record_id).update(
+                {"status": COMPLETED}, synchronize_session=False
+            )
+        
+        token = before_audit_commit.set(complete)
+        try:
+            result = await action()
+        except BaseException:
+            # Let the client retry a failed request with the same key, unless
+            # the action's changes were committed before it failed
+            db.rollback()
+            db.query(IdempotencyRecord).filter(
+                IdempotencyRecord.id == record_id,
+                IdempotencyRecord.status == IN_PROGRESS
+            ).delete(synchronize_session=False)
+            db.commit()
+            raise
+        finally:
+            before_audit_commit.reset(token)
+        
+        db.query(IdempotencyRecord).filter(IdempotencyRecord.id == record_id).update(
+            {"status": COMPLETED, "response_body": json.dumps(jsonable_encoder(result))},
+            synchronize_session=False
+        )
+        db.commit()
+        return result
+    
+    # Duplicates that join the running request also count as replays
+    result = await _requests_in_flight.run((user.id, idempotency_key, fingerprint), first_attempt)
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
@@ -0,0 +1,91 @@
+"""Policy rule API endpoints."""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.security import require_role
+from app.core.principal_cache import Principal
+from app.schemas.policy import PolicyRuleSetUpdate, PolicyRuleSetResponse, PolicyBacktestRequest
+from app.services.policy_engine import BUILTIN_RULES, policy_engine
+from app.services.policy_store import PolicyRuleStore
+from app.services.policy_backtest import PolicyBacktest
+
+router = APIRouter(prefix="/policies", tags=["Policies"])
+
+
+@router.get("", response_model=PolicyRuleSetResponse)
+async def get_policy_rules(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_role(["ADMIN", "MANAGER"]))
+):
+    """Get the active policy rule set."""
+    store = PolicyRuleStore(db)
+    store.sync(force=True)
+    rule_set = store.active()
+    if rule_set is None or rule_set.id != policy_engine.version:
+        return PolicyRuleSetResponse(version=policy_engine.version, rules=policy_engine.rules)
+    return PolicyRuleSetResponse(
+        version=rule_set.id,
+        rules=policy_engine.rules,
+        created_at=rule_set.created_at,
+        created_by_id=rule_set.created_by_id
+    )
+
+
+@router.get("/builtin", response_model=PolicyRuleSetResponse)
+async def get_builtin_policy_rules(
+    current_user: Principal = Depends(require_role(["ADMIN", "MANAGER"]))
+):
+    """Get the built-in rule set, as a starting point for edits."""
+    return PolicyRuleSetResponse(rules=BUILTIN_RULES)
+
+
+@router.put("", response_model=PolicyRuleSetResponse)
+async def update_policy_rules(
+    request: PolicyRuleSetUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_role(["ADMIN"]))
+):
+    """Replace the active rule set; it applies to custody actions at once."""
+    try:
+        rule_set = PolicyRuleStore(db).save(
+            [rule.model_dump(exclude_none=True) for rule in request.rules],
+            current_user
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return PolicyRuleSetResponse(
+        version=rule_set.id,
+        rules=policy_engine.rules,
+        created_at=rule_set.created_at,
+        created_by_id=rule_set.created_by_id
+    )
+
+
+@router.post("/backtest")
+async def backtest_policy_rules(
+    request: PolicyBacktestRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_role(["ADMIN", "MANAGER"]))
+):
+    """
+    Count past custody decisions a candidate rule set would change.
+    
+    Totals are broken down by site, asset sensitivity and the candidate
+    rule that would have decided; nothing is stored or activated.
+    """
+    try:
+        return PolicyBacktest(db).run(
+            [rule.model_dump(exclude_none=True) for rule in request.rules],
+            since=request.since,
+            until=request.until,
+            action=request.action
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
@@ -4,10 +4,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.security import require_role, get_current_user
+from app.core.security import require_role, get_current_principal
+from app.core.principal_cache import Principal
 from app.models.site import Site
 from app.models.user import User
 from app.models.asset import Asset
+from app.services.site_cache import site_geofence_cache
 
 router = APIRouter(prefix="/sites", tags=["Sites"])
 
@@ -30,7 +32,7 @@ def site_to_dict(site: Site) -> dict:
 @router.get("")
 async def list_sites(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """List all sites."""
     sites = db.query(Site).filter(Site.is_active == True).all()
@@ -49,7 +51,7 @@ async def list_sites(
 async def create_site(
     site_data: dict,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN"]))
+    current_user: Principal = Depends(require_role(["ADMIN"]))
 ):
     """Create a new site (Admin only)."""
     site = Site(
@@ -72,7 +74,7 @@ async def create_site(
 async def get_site(
     site_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get site by ID."""
     site = db.query(Site).filter(Site.id == site_id).first()
@@ -93,7 +95,7 @@ async def update_site(
     site_id: int,
     site_data: dict,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN"]))
+    current_user: Principal = Depends(require_role(["ADMIN"]))
 ):
     """Update a site (Admin only)."""
     site = db.query(Site).filter(Site.id == site_id).first()
@@ -108,6 +110,7 @@ async def update_site(
             setattr(site, key, site_data[key])
     
     db.commit()
+    site_geofence_cache.invalidate(site_id)
     db.refresh(site)
     
     return site_to_dict(site)
@@ -117,7 +120,7 @@ async def update_site(
 async def delete_site(
     site_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN"]))
+    current_user: Principal = Depends(require_role(["ADMIN"]))
 ):
     """Delete a site (Admin only)."""
     site = db.query(Site).filter(Site.id == site_id).first()
@@ -130,5 +133,6 @@ async def delete_site(
     # Soft delete
     site.is_active = False
     db.commit()
+    site_geofence_cache.invalidate(site_id)
     
     return {"message": "Site deleted"}
@@ -1,13 +1,19 @@
 """User management API endpoints."""
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.security import get_password_hash, require_role
+from app.core.database import get_db, SessionLocal
+from app.core.security import get_password_hash_async, require_role
+from app.core.principal_cache import Principal, principal_cache
+from app.core.revocation import revocation_filter
 from app.models.user import User
 from app.models.site import Site
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
+from app.services.bulk_import import UserImporter, spool_body
+from app.services.entity_resolver import EntityResolver
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -15,13 +21,14 @@ router = APIRouter(prefix="/users", tags=["Users"])
 @router.get("")
 async def list_users(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN"]))
+    current_user: Principal = Depends(require_role(["ADMIN"]))
 ):
     """List all users (Admin only)."""
     users = db.query(User).all()
+    resolver = EntityResolver(db).load(site_ids=[user.home_site_id for user in users])
     result = []
     for user in users:
-        site = db.query(Site).filter(Site.id == user.home_site_id).first() if user.home_site_id else None
+        site = resolver.site(user.home_site_id)
         result.append({
             "id": user.id,
             "email": user.email,
@@ -40,7 +47,7 @@ async def list_users(
 async def create_user(
     user_data: UserCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN"]))
+    current_user: Principal = Depends(require_role(["ADMIN"]))
 ):
     """Create a new user (Admin only)."""
     # Check if email already exists
@@ -60,7 +67,7 @@ async def create_user(
     
     user = User(
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash_async(user_data.password),
         full_name=user_data.full_name,
         role=user_data.role,
         phone_number=user_data.phone_number,
@@ -74,11 +81,41 @@ async def create_user(
     return {"id": user.id, "email": user.email, "full_name": user.full_name, "role": user.role}
 
 
+@router.post("/import")
+async def import_users(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$", description="Body format, by default from Content-Type"),
+    current_user: Principal = Depends(require_role(["ADMIN"]))
+):
+    """
+    Create users from a CSV or NDJSON body of UserCreate rows (Admin only).
+    
+    Rows are checked like single creates; invalid and duplicate rows are
+    reported and skipped without stopping the import. The response streams
+    NDJSON events: one per rejected row, progress after every chunk and a
+    final summary.
+    """
+    body = await spool_body(request.stream())
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    
+    async def generate():
+        db = SessionLocal()
+        try:
+            async for event in UserImporter(db).run(body, format):
+                yield json.dumps(event) + "\n"
+        finally:
+            db.close()
+            body.close()
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.get("/{user_id}")
 async def get_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN", "MANAGER"]))
+    current_user: Principal = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
     """Get user by ID."""
     user = db.query(User).filter(User.id == user_id).first()
@@ -105,7 +142,7 @@ async def update_user(
     user_id: int,
     user_data: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN"]))
+    current_user: Principal = Depends(require_role(["ADMIN"]))
 ):
     """Update a user (Admin only)."""
     user = db.query(User).filter(User.id == user_id).first()
@@ -117,15 +154,20 @@ async def update_user(
     
     update_data = user_data.model_dump(exclude_unset=True)
     if 'password' in update_data and update_data['password']:
-        update_data['hashed_password'] = get_password_hash(update_data.pop('password'))
+        update_data['hashed_password'] = await get_password_hash_async(update_data.pop('password'))
     elif 'password' in update_data:
         del update_data['password']
     
+    claims_before = Principal.from_user(user)
     for key, value in update_data.items():
         setattr(user, key, value)
     
     db.commit()
     db.refresh(user)
+    principal_cache.invalidate(user.id)
+    # Issued tokens carry the old claims, or authenticate a replaced password
+    if Principal.from_user(user) != claims_before or 'hashed_password' in update_data:
+        revocation_filter.revoke_user(db, user.id)
     
     return {"id": user.id, "email": user.email, "full_name": user.full_name, "role": user.role}
 
@@ -134,7 +176,7 @@ async def update_user(
 async def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(["ADMIN"]))
+    current_user: Principal = Depends(require_role(["ADMIN"]))
 ):
     """Delete a user (Admin only)."""
     user = db.query(User).filter(User.id == user_id).first()
@@ -153,5 +195,7 @@ async def delete_user(
     
     db.delete(user)
     db.commit()
+    principal_cache.invalidate(user_id)
+    revocation_filter.revoke_user(db, user_id)
     
     return {"message": "User deleted"}
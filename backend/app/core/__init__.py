@@ -3,9 +3,12 @@ from app.core.config import settings
 from app.core.database import Base, engine, get_db, SessionLocal
 from app.core.security import (
     get_password_hash,
+    get_password_hash_async,
     verify_password,
+    verify_password_async,
     create_access_token,
     get_current_user,
+    get_current_principal,
     require_role
 )
 
@@ -16,8 +19,11 @@ __all__ = [
     "get_db",
     "SessionLocal",
     "get_password_hash",
+    "get_password_hash_async",
     "verify_password",
+    "verify_password_async",
     "create_access_token",
     "get_current_user",
+    "get_current_principal",
     "require_role"
 ]
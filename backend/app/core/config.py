@@ -18,6 +18,91 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours for demo
     
+    # Authenticated users are cached per token for role checks; changes made
+    # by other processes show after at most PRINCIPAL_CACHE_TTL_SECONDS
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Stateless mode authorizes from the token's signed claims without
+    # querying the user; revoked tokens are rejected after at most
+    # TOKEN_REVOCATION_REFRESH_SECONDS in other processes
+    STATELESS_AUTH: bool = False
+    TOKEN_REVOCATION_REFRESH_SECONDS: int = 5
+    
+    # Password hashing runs on a thread pool of this many workers (0 = one
+    # per CPU); beyond PASSWORD_HASH_MAX_PENDING jobs logins get 503 (0 = no limit)
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_PENDING: int = 256
+    
+    # Verification summaries at least this large are zlib-compressed (0 disables)
+    VERIFICATION_BLOB_COMPRESS_MIN_BYTES: int = 256
+    
+    # Audit chain topology: "global" (one chain), "asset" or "site" (one chain
+    # per shard, anchored by a periodic global root)
+    AUDIT_CHAIN_TOPOLOGY: str = "global"
+    AUDIT_ROOT_INTERVAL_EVENTS: int = 1000  # Commit a root every N events (0 disables)
+    AUDIT_VERIFY_WORKERS: int = 4  # Shards verified in parallel
+    
+    # Signed anchors over the chain heads, every N events or T seconds
+    # (0 disables a trigger). The key is an HMAC secret separate from
+    # SECRET_KEY or, for Ed25519, the path of a PEM private key; without
+    # one no anchors are written
+    AUDIT_ANCHOR_INTERVAL_EVENTS: int = 1000
+    AUDIT_ANCHOR_INTERVAL_SECONDS: int = 3600
+    AUDIT_ANCHOR_ALGORITHM: str = "HMAC-SHA256"
+    AUDIT_ANCHOR_KEY: Optional[str] = None
+    
+    # Hash format for new events: 1 = canonical JSON, 2 = binary (faster).
+    # Existing events keep the version they were written with
+    AUDIT_HASH_VERSION: int = 2
+    
+    # Months of audit events kept in the hot table; older months are sealed
+    # into compressed segment files at startup (0 disables archival)
+    AUDIT_HOT_MONTHS: int = 0
+    AUDIT_SEGMENT_DIR: str = "data/audit_segments"
+    
+    # Directory of the append-only binary audit journal (unset disables it)
+    AUDIT_JOURNAL_DIR: Optional[str] = None
+    
+    # Site geofence snapshots cached per process (0 disables the cache)
+    SITE_CACHE_TTL_SECONDS: int = 300
+    
+    # Seconds a clean verification may be reused for consecutive custody
+    # actions by the same user, device and site, per asset sensitivity
+    VERIFICATION_LEASE_TTL_SECONDS: dict[str, int] = {"LOW": 120, "MEDIUM": 60, "HIGH": 0}
+    
+    # A verification started speculatively by a tag lookup is used by the
+    # user's next custody action at that site within this window (0 disables)
+    SPECULATIVE_VERIFICATION_TTL_SECONDS: int = 30
+    
+    # Responses to requests with an Idempotency-Key are replayed for this long
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    # A key still in progress after this long was claimed by a worker that
+    # died; a retry takes it over instead of getting 409
+    IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS: int = 5 * 60
+    
+    # Largest number of assets a bulk custody request may name
+    CUSTODY_BULK_MAX_ASSETS: int = 200
+    
+    # Bulk user and asset imports validate, hash and insert this many rows at a time
+    IMPORT_CHUNK_ROWS: int = 1000
+    
+    # Cycle counts accept scans and close for this long after opening
+    CYCLE_COUNT_SESSION_TTL_SECONDS: int = 8 * 60 * 60
+    CYCLE_COUNT_MAX_SCANS_PER_REQUEST: int = 5000
+    
+    # Custody requests sent with "Prefer: respond-async" run as background
+    # jobs: at most CUSTODY_JOB_CONCURRENCY at once per worker, each given up
+    # after CUSTODY_JOB_TIMEOUT_SECONDS; finished jobs are kept for polling
+    # for CUSTODY_JOB_TTL_SECONDS
+    CUSTODY_JOB_CONCURRENCY: int = 32
+    CUSTODY_JOB_TIMEOUT_SECONDS: int = 300
+    CUSTODY_JOB_TTL_SECONDS: int = 60 * 60
+    CUSTODY_JOB_POLL_SECONDS: int = 1
+    
+    # Each process checks for a newer stored policy rule set this often
+    POLICY_RELOAD_SECONDS: int = 5
+    
     # CORS
     CORS_ORIGINS: list[str] = ["http://localhost:5173", "http://127.0.0.1:5173"]
     
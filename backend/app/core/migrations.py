@@ -0,0 +1,83 @@
+"""Additive schema migrations.
+
+Tables are created with ``Base.metadata.create_all``, which never alters a
+table that already exists. This module brings older databases up to date by
+adding columns and indexes that were introduced after their tables were
+first created. Only nullable columns are added this way. SQLite tables
+whose model asks for AUTOINCREMENT are rebuilt once with it, since SQLite
+cannot add it to an existing table.
+"""
+import logging
+from typing import Dict, Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateTable
+
+from app.core.database import Base
+
+logger = logging.getLogger(__name__)
+
+
+def add_missing_columns(engine: Engine) -> None:
+    """Add model columns and indexes missing from existing tables."""
+    inspector = inspect(engine)
+    
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                logger.info(f"Adding column {table.name}.{column.name}")
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+def ensure_sqlite_autoincrement(engine: Engine, id_floors: Optional[Dict[str, str]] = None) -> None:
+    """
+    Rebuild SQLite tables created without the AUTOINCREMENT their model
+    declares, so IDs of deleted rows are never issued again.
+    
+    id_floors maps a table to a query for the highest ID it ever issued,
+    for tables whose highest rows may already have been deleted.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    id_floors = id_floors or {}
+    
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not table.dialect_options["sqlite"].get("autoincrement"):
+                continue
+            sql = conn.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": table.name}
+            ).scalar()
+            if sql is None or "AUTOINCREMENT" in sql.upper():
+                continue
+            
+            logger.info(f"Rebuilding {table.name} with AUTOINCREMENT")
+            rebuilt = f"{table.name}__rebuild"
+            create = str(CreateTable(table).compile(dialect=engine.dialect)).strip()
+            conn.execute(text(create.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {rebuilt} ", 1)))
+            columns = ", ".join(column.name for column in table.columns)
+            conn.execute(text(f"INSERT INTO {rebuilt} ({columns}) SELECT {columns} FROM {table.name}"))
+            conn.execute(text(f"DROP TABLE {table.name}"))
+            conn.execute(text(f"ALTER TABLE {rebuilt} RENAME TO {table.name}"))
+            for index in table.indexes:
+                index.create(conn)
+            
+            floor = conn.execute(text(id_floors[table.name])).scalar() if table.name in id_floors else None
+            if floor:
+                conn.execute(text("DELETE FROM sqlite_sequence WHERE name = :name AND seq < :floor"),
+                             {"name": table.name, "floor": floor})
+                conn.execute(text(
+                    "INSERT INTO sqlite_sequence (name, seq) SELECT :name, :floor "
+                    "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = :name)"
+                ), {"name": table.name, "floor": floor})
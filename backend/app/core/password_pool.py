@@ -0,0 +1,105 @@
+"""Bounded thread pool for bcrypt.
+
+A bcrypt check or hash takes a few hundred milliseconds of CPU. Run inside
+an async endpoint it blocks the event loop, so a burst of logins at shift
+start stalls every other request of the worker. bcrypt releases the GIL
+while it works, so running it on a pool of threads keeps the loop free and
+uses up to ``PASSWORD_HASH_WORKERS`` cores. Beyond
+``PASSWORD_HASH_MAX_PENDING`` waiting or running jobs, new ones are refused
+with 503 rather than queued without bound. Bulk imports hash through map(),
+which keeps at most one job per worker in the queue, so logins wait behind
+one window of them at most.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class PasswordPool:
+    """Process-wide pool running password hashing off the event loop."""
+    
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0  # Queued or running
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+    
+    @property
+    def workers(self) -> int:
+        return settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+    
+    async def run(self, function: Callable[..., T], *args) -> T:
+        """Run a hashing function in the pool, raising 503 if it is saturated."""
+        if settings.PASSWORD_HASH_MAX_PENDING and self.pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many password checks in progress, retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        return await self._submit(function, *args)
+    
+    async def map(self, function: Callable[..., T], items: Sequence) -> List[T]:
+        """Apply a hashing function to many items, one window of workers at a time."""
+        results: List[T] = []
+        window = self.workers
+        for start in range(0, len(items), window):
+            batch = items[start:start + window]
+            results.extend(await asyncio.gather(*(self._submit(function, item) for item in batch)))
+        return results
+    
+    async def _submit(self, function: Callable[..., T], *args) -> T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+        
+        queued_at = time.perf_counter()
+        
+        def work() -> T:
+            wait = time.perf_counter() - queued_at
+            with self._lock:
+                self.running += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            try:
+                return function(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+        
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, work)
+        finally:
+            self.pending -= 1
+    
+    def metrics(self) -> dict:
+        """Queue state and counters since process start."""
+        with self._lock:
+            started = self.completed + self.running
+            return {
+                "workers": self.workers,
+                "pending": self.pending,
+                "running": self.running,
+                "queued": max(self.pending - self.running, 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self._total_wait / started * 1000, 1) if started else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 1)
+            }
+
+
+password_pool = PasswordPool()
@@ -0,0 +1,80 @@
+"""Process-wide cache of authenticated principals.
+
+Every authenticated request used to query the user behind its token, even
+when the endpoint only checks the role. The cache keeps an immutable
+snapshot of the user per token subject and token ID, so role checks run
+without a database round trip. User updates and deletions invalidate the
+user's entries; ``PRINCIPAL_CACHE_TTL_SECONDS`` bounds staleness for changes
+made by other processes, and the least recently used entries are dropped
+beyond ``PRINCIPAL_CACHE_MAX_ENTRIES``.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Snapshot of the user fields endpoints read from the current user."""
+    id: int
+    email: str
+    full_name: str
+    role: str
+    phone_number: Optional[str]
+    is_active: bool
+    
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            phone_number=user.phone_number,
+            is_active=user.is_active
+        )
+
+
+class PrincipalCache:
+    """Bounded TTL/LRU cache of principals by (user ID, token ID)."""
+    
+    def __init__(self):
+        self._entries: "OrderedDict[Tuple[int, Optional[str]], Tuple[Principal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, user_id: int, token_id: Optional[str]) -> Optional[Principal]:
+        """Get a cached principal, or None if missing or expired."""
+        key = (user_id, token_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+    
+    def put(self, user_id: int, token_id: Optional[str], principal: Principal) -> None:
+        """Cache the principal of a token."""
+        if settings.PRINCIPAL_CACHE_TTL_SECONDS <= 0:
+            return
+        with self._lock:
+            self._entries[(user_id, token_id)] = (principal, time.monotonic() + settings.PRINCIPAL_CACHE_TTL_SECONDS)
+            self._entries.move_to_end((user_id, token_id))
+            while len(self._entries) > settings.PRINCIPAL_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, user_id: int) -> None:
+        """Drop every cached token of a user after it changed."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,74 @@
+"""In-memory filter of revoked access tokens.
+
+In stateless mode (``STATELESS_AUTH``) requests are authorized from the
+signed claims of their token, so a change to a user has to revoke the
+tokens already issued to them. Revocations are rows of token_revocations:
+the user's tokens issued before a point in time are no longer valid. Each
+process keeps the latest revocation per user in memory and reads the rows
+added since its last refresh at most every
+``TOKEN_REVOCATION_REFRESH_SECONDS``, so checking a token needs no query.
+Rows and entries are dropped once every token they revoke has expired;
+the table uses AUTOINCREMENT so IDs keep growing after a purge.
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+class RevocationFilter:
+    """Latest revocation time per user, refreshed from the database."""
+    
+    def __init__(self):
+        self._revoked: Dict[int, Tuple[float, float]] = {}  # User ID -> (revoked_at, expires_at)
+        self._last_id = 0
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+    
+    def is_revoked(self, user_id: int, issued_at: Optional[float]) -> bool:
+        """Whether a token of the user issued at issued_at (Unix time) is revoked."""
+        entry = self._revoked.get(user_id)
+        return entry is not None and (issued_at is None or issued_at < entry[0])
+    
+    def _add(self, user_id: int, revoked_at: float, expires_at: float) -> None:
+        current = self._revoked.get(user_id)
+        if current is None or revoked_at > current[0]:
+            self._revoked[user_id] = (revoked_at, expires_at)
+    
+    def refresh(self, db: Session, force: bool = False) -> None:
+        """Load revocations added by any process since the last refresh."""
+        from app.models.token_revocation import TokenRevocation
+        
+        now = time.monotonic()
+        if not force and now < self._next_refresh:
+            return
+        self._next_refresh = now + settings.TOKEN_REVOCATION_REFRESH_SECONDS
+        
+        rows = db.query(TokenRevocation).filter(
+            TokenRevocation.id > self._last_id
+        ).order_by(TokenRevocation.id).all()
+        with self._lock:
+            for row in rows:
+                self._add(row.user_id, row.revoked_at, row.expires_at)
+                self._last_id = row.id
+            wall_clock = time.time()
+            for user_id in [user_id for user_id, entry in self._revoked.items() if entry[1] <= wall_clock]:
+                del self._revoked[user_id]
+    
+    def revoke_user(self, db: Session, user_id: int) -> None:
+        """Revoke every token issued to a user until now, and commit."""
+        from app.models.token_revocation import TokenRevocation
+        
+        now = time.time()
+        db.query(TokenRevocation).filter(TokenRevocation.expires_at <= now).delete(synchronize_session=False)
+        expires_at = now + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        db.add(TokenRevocation(user_id=user_id, revoked_at=now, expires_at=expires_at))
+        db.commit()
+        # Effective here at once; the row reaches other processes on their refresh
+        with self._lock:
+            self._add(user_id, now, expires_at)
+
+
+revocation_filter = RevocationFilter()
@@ -1,6 +1,8 @@
 """Security utilities for authentication and authorization."""
 from datetime import datetime, timedelta
 from typing import Optional
+import time
+import uuid
 import bcrypt
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
@@ -9,6 +11,9 @@ from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.principal_cache import Principal, principal_cache
+from app.core.password_pool import password_pool
+from app.core.revocation import revocation_filter
 
 security = HTTPBearer()
 
@@ -29,6 +34,16 @@ def get_password_hash(password: str) -> str:
     ).decode('utf-8')
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password pool, without blocking the event loop."""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the password pool, without blocking the event loop."""
+    return await password_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -36,7 +51,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    # Token ID: principals are cached per token; issue time: tokens are
+    # revoked by user and time
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -50,39 +67,112 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
-    """Get the current authenticated user from JWT token."""
-    from app.models.user import User
-    
-    credentials_exception = HTTPException(
+def principal_claims(user) -> dict:
+    """Token claims of a user, from which stateless mode authorizes."""
+    return {
+        "sub": str(user.id),
+        "email": user.email,
+        "role": user.role,
+        "name": user.full_name,
+        "phone": user.phone_number,
+        "active": user.is_active
+    }
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _token_claims(credentials: HTTPAuthorizationCredentials) -> dict:
+    """Decode a bearer token, raising 401 if invalid."""
+    payload = decode_token(credentials.credentials)
+    if payload is None or payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+
+def _ensure_active(principal: Principal) -> None:
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is disabled"
+        )
+
+
+def _load_user(db: Session, user_id: int, token_id: Optional[str]):
+    """Query the user of a token and refresh its cached principal."""
+    from app.models.user import User
     
-    token = credentials.credentials
-    payload = decode_token(token)
-    
-    if payload is None:
-        raise credentials_exception
-    
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+    principal_cache.put(user_id, token_id, Principal.from_user(user))
+    return user
+
+
+def _stateless_principal(payload: dict, db: Session) -> Optional[Principal]:
+    """
+    Principal from the token's claims, or None for tokens issued without
+    them. Raises 401 if the token is revoked.
+    """
+    if "role" not in payload or "active" not in payload:
+        return None
+    user_id = int(payload["sub"])
+    # At most one query per refresh interval, not per request
+    revocation_filter.refresh(db)
+    if revocation_filter.is_revoked(user_id, payload.get("iat")):
+        raise _credentials_exception()
+    return Principal(
+        id=user_id,
+        email=payload.get("email"),
+        full_name=payload.get("name"),
+        role=payload["role"],
+        phone_number=payload.get("phone"),
+        is_active=bool(payload["active"])
+    )
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+):
+    """Get the current authenticated user from JWT token."""
+    payload = _token_claims(credentials)
+    user = _load_user(db, int(payload["sub"]), payload.get("jti"))
+    _ensure_active(Principal.from_user(user))
     return user
 
 
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """
+    Get a snapshot of the current user, from the token's claims in
+    stateless mode, otherwise from the principal cache when possible. For
+    endpoints that only read the user's fields.
+    """
+    payload = _token_claims(credentials)
+    principal = _stateless_principal(payload, db) if settings.STATELESS_AUTH else None
+    if principal is None:
+        user_id, token_id = int(payload["sub"]), payload.get("jti")
+        principal = principal_cache.get(user_id, token_id)
+        if principal is None:
+            principal = Principal.from_user(_load_user(db, user_id, token_id))
+    _ensure_active(principal)
+    return principal
+
+
 def require_role(allowed_roles: list[str]):
-    """Dependency factory to require specific roles."""
-    async def role_checker(current_user = Depends(get_current_user)):
+    """
+    Dependency factory to require specific roles. The dependency returns
+    the current user's Principal, usually without a database query.
+    """
+    async def role_checker(current_user: Principal = Depends(get_current_principal)):
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -2,8 +2,14 @@
 from app.models.user import User
 from app.models.site import Site
 from app.models.asset import Asset, AssetSensitivity, AssetStatus
-from app.models.audit import AuditEvent
+from app.models.audit import AuditEvent, AuditChainRoot, AuditAnchor, AuditSegment
 from app.models.approval import ApprovalRequest, ApprovalStatus
+from app.models.verification_blob import VerificationBlob
+from app.models.idempotency import IdempotencyRecord
+from app.models.cycle_count import CycleCount, CycleCountScan, CycleCountStatus
+from app.models.custody_job import CustodyJob, CustodyJobStatus
+from app.models.policy import PolicyRuleSet
+from app.models.token_revocation import TokenRevocation
 
 __all__ = [
     "User",
@@ -12,6 +18,18 @@ __all__ = [
     "AssetSensitivity",
     "AssetStatus",
     "AuditEvent",
+    "AuditChainRoot",
+    "AuditAnchor",
+    "AuditSegment",
     "ApprovalRequest",
-    "ApprovalStatus"
+    "ApprovalStatus",
+    "VerificationBlob",
+    "IdempotencyRecord",
+    "CycleCount",
+    "CycleCountScan",
+    "CycleCountStatus",
+    "CustodyJob",
+    "CustodyJobStatus",
+    "PolicyRuleSet",
+    "TokenRevocation"
 ]
@@ -30,7 +30,8 @@ class ApprovalRequest(Base):
     target_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # For transfers
     
     # Verification context
-    verification_summary = Column(Text, nullable=True)  # JSON with why step-up was needed
+    verification_summary = Column(Text, nullable=True)  # Legacy inline JSON; new requests use verification_hash
+    verification_hash = Column(String(64), ForeignKey("verification_blobs.hash"), nullable=True, index=True)
     reason = Column(String, nullable=True)  # Human-readable reason
     
     # Resolution
@@ -1,5 +1,5 @@
 """Audit event model for custody trail."""
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, Boolean
 from sqlalchemy.sql import func
 
 from app.core.database import Base
@@ -9,6 +9,16 @@ class AuditEvent(Base):
     """Immutable audit event for custody actions."""
     
     __tablename__ = "audit_events"
+    __table_args__ = (
+        # Keyset pagination walks (timestamp, id) in descending order
+        Index("ix_audit_events_timestamp_id", "timestamp", "id"),
+        # Per-site signal analytics over a time window
+        Index("ix_audit_events_site_timestamp", "site_id", "timestamp"),
+        # Head lookup and ordered walk of a single chain shard
+        Index("ix_audit_events_chain_key_id", "chain_key", "id"),
+        # Sealing empties the table; IDs must never be issued twice
+        {"sqlite_autoincrement": True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -19,6 +29,91 @@ class AuditEvent(Base):
     site_id = Column(Integer, ForeignKey("sites.id"), nullable=True)
     target_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # For transfers
     approval_id = Column(Integer, ForeignKey("approval_requests.id"), nullable=True)
-    verification_summary = Column(Text, nullable=True)  # JSON string with verification results
-    prev_hash = Column(String(64), nullable=True)  # SHA256 of previous event
+    verification_summary = Column(Text, nullable=True)  # Legacy inline JSON; new events use verification_hash
+    verification_hash = Column(String(64), ForeignKey("verification_blobs.hash"), nullable=True, index=True)
+    
+    # Verification outcomes materialized from the summary at write time, so
+    # analytics and filters run as SQL predicates. NULL when the event has no
+    # summary. Derived data: not part of the event hash.
+    number_match = Column(Boolean, nullable=True, index=True)
+    inside_geofence = Column(Boolean, nullable=True, index=True)
+    sim_swap = Column(Boolean, nullable=True, index=True)
+    device_swap = Column(Boolean, nullable=True, index=True)
+    match_rate = Column(Integer, nullable=True)
+    gateway_error = Column(Boolean, nullable=True, index=True)
+    
+    chain_key = Column(String, nullable=True)  # Chain shard: global, asset:<id> or site:<id>
+    prev_hash = Column(String(64), nullable=True)  # SHA256 of previous event in the same chain
     hash = Column(String(64), nullable=False)  # SHA256 of this event
+    hash_version = Column(Integer, nullable=True)  # Hash format; NULL = 1 (canonical JSON)
+
+
+class AuditChainRoot(Base):
+    """
+    Global anchor over sharded audit chains.
+    
+    Commits the head hash of every chain shard as of last_event_id into a
+    single root hash. Roots are themselves chained through prev_root_hash.
+    """
+    
+    __tablename__ = "audit_chain_roots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_event_id = Column(Integer, nullable=False)  # Highest event ID covered
+    heads = Column(Text, nullable=False)  # JSON {chain_key: head hash}
+    # Previous root's ID, 0 for the first; unique so concurrent writers cannot fork the roots
+    prev_root_id = Column(Integer, nullable=True, unique=True, index=True)
+    prev_root_hash = Column(String(64), nullable=True)
+    root_hash = Column(String(64), nullable=False)
+
+
+class AuditAnchor(Base):
+    """
+    Signed commitment to the audit chain heads.
+    
+    Every AUDIT_ANCHOR_INTERVAL_EVENTS events or AUDIT_ANCHOR_INTERVAL_SECONDS
+    seconds the head of every chain shard is committed into a digest, which
+    is signed with a key held outside the database. Anchors are chained
+    through prev_digest.
+    """
+    
+    __tablename__ = "audit_anchors"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    last_event_id = Column(Integer, nullable=False)  # Highest event ID covered
+    heads = Column(Text, nullable=False)  # JSON {chain_key: head hash}
+    # Previous anchor's ID, 0 for the first; unique so concurrent writers cannot fork the anchors
+    prev_anchor_id = Column(Integer, nullable=True, unique=True, index=True)
+    prev_digest = Column(String(64), nullable=True)
+    digest = Column(String(64), nullable=False)  # Commitment over prev_digest, last_event_id and heads
+    algorithm = Column(String, nullable=False)  # HMAC-SHA256 or Ed25519
+    key_id = Column(String(16), nullable=False)  # Fingerprint of the signing key
+    signature = Column(Text, nullable=False)  # Hex-encoded signature of digest
+
+
+class AuditSegment(Base):
+    """
+    Sealed month of audit events exported to an immutable segment file.
+    
+    Segments cover contiguous event ID ranges. start_heads and end_heads
+    record the head hash of every chain shard before and after the segment,
+    so chain verification can continue across the hot/cold boundary.
+    """
+    
+    __tablename__ = "audit_segments"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    period = Column(String, unique=True, nullable=False)  # YYYY-MM
+    path = Column(String, nullable=False)  # Compressed NDJSON file
+    file_sha256 = Column(String(64), nullable=False)
+    event_count = Column(Integer, nullable=False)
+    first_event_id = Column(Integer, nullable=False)
+    last_event_id = Column(Integer, nullable=False)
+    first_timestamp = Column(DateTime(timezone=True), nullable=False)
+    last_timestamp = Column(DateTime(timezone=True), nullable=False)
+    start_heads = Column(Text, nullable=False)  # JSON {chain_key: head hash} before the segment
+    end_heads = Column(Text, nullable=False)  # JSON {chain_key: head hash} after the segment
+    blocks = Column(Text, nullable=True)  # JSON list of gzip members: offset, length, min/max (timestamp, id)
+    sealed_at = Column(DateTime(timezone=True), server_default=func.now())
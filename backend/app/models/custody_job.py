@@ -0,0 +1,37 @@
+"""Background custody job model."""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+import enum
+
+from app.core.database import Base
+
+
+class CustodyJobStatus(str, enum.Enum):
+    """Custody job states."""
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+class CustodyJob(Base):
+    """
+    Custody action accepted for background processing.
+    
+    Requests sent with ``Prefer: respond-async`` return at once; the
+    verification, policy evaluation and audit write run in a background task
+    of the worker that accepted them, and the outcome is stored here so any
+    worker can answer polls.
+    """
+    
+    __tablename__ = "custody_jobs"
+    
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    action = Column(String, nullable=False)  # CHECK_OUT, CHECK_IN, TRANSFER, INVENTORY_CLOSE
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    poll_interval = Column(Integer, nullable=False)  # Seconds clients should wait between polls
+    result = Column(Text, nullable=True)  # JSON response of the action, once succeeded
+    error = Column(Text, nullable=True)  # Reason the job failed
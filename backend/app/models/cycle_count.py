@@ -0,0 +1,55 @@
+"""Cycle count session models."""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, UniqueConstraint
+import enum
+
+from app.core.database import Base
+
+
+class CycleCountStatus(str, enum.Enum):
+    """Cycle count session states."""
+    OPEN = "OPEN"
+    CLOSED = "CLOSED"
+
+
+class CycleCount(Base):
+    """
+    Site-wide inventory count covered by a single verification.
+    
+    While the session is OPEN scanned tags are streamed into
+    cycle_count_scans. Closing it reconciles the scans against the assets
+    recorded at the site and writes one INVENTORY_CLOSE event per scanned
+    asset; the reconciliation totals are kept on the session.
+    """
+    
+    __tablename__ = "cycle_counts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    site_id = Column(Integer, ForeignKey("sites.id"), nullable=False, index=True)
+    opened_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    status = Column(String, nullable=False, default=CycleCountStatus.OPEN.value)
+    opened_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # Scans and close refused afterwards
+    closed_at = Column(DateTime(timezone=True), nullable=True)
+    verification_hash = Column(String(64), ForeignKey("verification_blobs.hash"), nullable=True)
+    
+    # Reconciliation totals, set on close
+    expected_count = Column(Integer, nullable=True)
+    scanned_count = Column(Integer, nullable=True)
+    missing_count = Column(Integer, nullable=True)
+    unexpected_count = Column(Integer, nullable=True)
+    misplaced_count = Column(Integer, nullable=True)
+    discrepancies = Column(Text, nullable=True)  # JSON {missing, unexpected, misplaced} tag IDs
+
+
+class CycleCountScan(Base):
+    """A tag scanned during a cycle count; repeated scans are kept once."""
+    
+    __tablename__ = "cycle_count_scans"
+    __table_args__ = (
+        UniqueConstraint("cycle_count_id", "tag_id", name="uq_cycle_count_scans_count_tag"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cycle_count_id = Column(Integer, ForeignKey("cycle_counts.id"), nullable=False)
+    tag_id = Column(String, nullable=False)
+    scanned_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,30 @@
+"""Stored responses of requests made with an Idempotency-Key."""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, UniqueConstraint
+
+from app.core.database import Base
+
+
+class IdempotencyRecord(Base):
+    """
+    Outcome of the first request made with an Idempotency-Key.
+    
+    Keys are scoped to the user who sent them. While the original request
+    runs the record is IN_PROGRESS; it becomes COMPLETED in the transaction
+    that commits the action, and the response is stored right after and
+    replayed to retries until expires_at.
+    """
+    
+    __tablename__ = "idempotency_records"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_records_user_key"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    scope = Column(String, nullable=False)  # Endpoint the key was used on
+    request_hash = Column(String(64), nullable=False)  # SHA256 of the request payload
+    status = Column(String, nullable=False)  # IN_PROGRESS, COMPLETED
+    response_body = Column(Text, nullable=True)  # JSON response, once stored
+    created_at = Column(DateTime(timezone=True), nullable=False)  # When the current claim was taken
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
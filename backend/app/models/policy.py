@@ -0,0 +1,20 @@
+"""Stored policy rule sets."""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text
+
+from app.core.database import Base
+
+
+class PolicyRuleSet(Base):
+    """
+    A version of the custody policy rules.
+    
+    Rule sets are never edited: saving rules adds a row, and the row with
+    the highest ID is the active one. Without rows the built-in rules apply.
+    """
+    
+    __tablename__ = "policy_rule_sets"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    rules = Column(Text, nullable=False)  # JSON list of rules, first match decides
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
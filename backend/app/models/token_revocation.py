@@ -0,0 +1,24 @@
+"""Revocations of users' access tokens."""
+from sqlalchemy import Column, Integer, Float
+
+from app.core.database import Base
+
+
+class TokenRevocation(Base):
+    """
+    Tokens of a user issued before revoked_at are no longer valid.
+    
+    Rows are added when a user's token claims go stale (role, status,
+    profile or password changes, deletion) and are only needed until every
+    token they revoke has expired, at expires_at.
+    """
+    
+    __tablename__ = "token_revocations"
+    # Workers poll for IDs above the last they read; purging expired rows
+    # must not let SQLite hand out a lower ID again
+    __table_args__ = {"sqlite_autoincrement": True}
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)  # No foreign key: outlives deleted users
+    revoked_at = Column(Float, nullable=False)  # Unix time, compared with the token's iat claim
+    expires_at = Column(Float, nullable=False, index=True)
@@ -0,0 +1,22 @@
+"""Content-addressed storage for verification summaries."""
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class VerificationBlob(Base):
+    """
+    Deduplicated verification summary, keyed by the SHA256 of its text.
+    
+    Audit events and approval requests reference a blob by hash instead of
+    each storing their own copy of the JSON.
+    """
+    
+    __tablename__ = "verification_blobs"
+    
+    hash = Column(String(64), primary_key=True)  # SHA256 of the summary text
+    encoding = Column(String, nullable=False)  # raw, zlib
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)  # Uncompressed size in bytes
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -34,3 +34,5 @@ class ChainVerificationResult(BaseModel):
     verified_events: int
     first_broken_id: Optional[int] = None
     message: str
+    shards: int = 1
+    anchors: int = 0
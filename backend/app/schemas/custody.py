@@ -1,6 +1,7 @@
 """Custody action schemas."""
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+from datetime import datetime
 
 
 class MockNetworkContext(BaseModel):
@@ -18,6 +19,7 @@ class CustodyActionRequest(BaseModel):
     asset_id: int
     site_id: int
     mock_context: Optional[MockNetworkContext] = None
+    device_id: Optional[str] = None  # Enables verification leases across consecutive actions
 
 
 class CheckoutRequest(CustodyActionRequest):
@@ -40,6 +42,21 @@ class InventoryCloseRequest(BaseModel):
     asset_id: int
     site_id: int
     mock_context: Optional[MockNetworkContext] = None
+    device_id: Optional[str] = None  # Enables verification leases across consecutive actions
+
+
+class BulkCustodyRequest(BaseModel):
+    """Schema for bulk checkout and return requests."""
+    asset_ids: List[int] = []
+    tag_ids: List[str] = []
+    site_id: int
+    mock_context: Optional[MockNetworkContext] = None
+    device_id: Optional[str] = None  # Enables verification leases across consecutive actions
+
+
+class BulkTransferRequest(BulkCustodyRequest):
+    """Schema for bulk transfer request."""
+    target_user_id: int
 
 
 class VerificationResult(BaseModel):
@@ -68,3 +85,44 @@ class CustodyActionResponse(BaseModel):
     event_id: Optional[int] = None
     approval_id: Optional[int] = None
     message: str
+
+
+class BulkAssetResult(BaseModel):
+    """Outcome of a bulk custody action for one asset."""
+    asset_id: Optional[int] = None  # None for an unknown tag ID
+    tag_id: Optional[str] = None
+    success: bool
+    decision: str
+    reason: str
+    event_id: Optional[int] = None
+    approval_id: Optional[int] = None
+    message: str
+
+
+class BulkCustodyResponse(BaseModel):
+    """Response for bulk custody actions."""
+    verification: Optional[VerificationResult] = None  # None when no asset needed verifying
+    results: List[BulkAssetResult]
+    allowed: int
+    step_up: int
+    denied: int
+
+
+class CustodyJobAccepted(BaseModel):
+    """Response to a custody request accepted for background processing."""
+    job_id: str
+    status: str
+    status_url: str
+    events_url: str
+
+
+class CustodyJobResponse(BaseModel):
+    """State of a background custody job."""
+    job_id: str
+    action: str
+    status: str  # PENDING, RUNNING, SUCCEEDED, FAILED
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    poll_interval: int  # Seconds to wait before polling again
+    result: Optional[dict] = None  # Response of the action, once succeeded
+    error: Optional[str] = None
@@ -0,0 +1,61 @@
+"""Cycle count schemas."""
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+from app.schemas.custody import MockNetworkContext, VerificationResult
+
+
+class CycleCountOpenRequest(BaseModel):
+    """Schema for opening a cycle count at a site."""
+    site_id: int
+    mock_context: Optional[MockNetworkContext] = None
+    device_id: Optional[str] = None  # Enables verification leases across consecutive actions
+
+
+class CycleCountScanRequest(BaseModel):
+    """A batch of scanned tag IDs; may be sent any number of times."""
+    tag_ids: List[str]
+
+
+class CycleCountResponse(BaseModel):
+    """Schema for a cycle count session."""
+    id: int
+    site_id: int
+    opened_by_id: int
+    status: str
+    opened_at: datetime
+    expires_at: datetime
+    closed_at: Optional[datetime] = None
+    scanned_count: int
+    verification: Optional[VerificationResult] = None
+
+
+class CycleCountScanResponse(BaseModel):
+    """Result of recording a batch of scans."""
+    accepted: int  # Tags not scanned before in this session
+    scanned_count: int
+
+
+class MisplacedAsset(BaseModel):
+    """A scanned asset recorded elsewhere or as checked out."""
+    asset_id: int
+    tag_id: str
+    site_id: Optional[int] = None
+    status: str
+
+
+class CycleCountCloseResponse(BaseModel):
+    """Reconciliation of a closed cycle count."""
+    id: int
+    site_id: int
+    expected_count: int
+    scanned_count: int
+    counted_count: int  # Expected and scanned
+    missing: List[str]  # Expected but not scanned
+    unexpected: List[str]  # Scanned tags that match no asset
+    misplaced: List[MisplacedAsset]
+    allowed: int
+    step_up: int
+    denied: int
+    approval_ids: List[int]
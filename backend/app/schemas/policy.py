@@ -0,0 +1,44 @@
+"""Policy rule schemas."""
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class PolicyRule(BaseModel):
+    """
+    A policy rule: the first rule in a set whose conditions all hold decides.
+    Omitted conditions match any input.
+    """
+    name: str  # Returned as rule_triggered
+    decision: str  # ALLOW, DENY, STEP_UP
+    reason: str  # May name the risk signals present with {signals}
+    actions: Optional[List[str]] = None
+    sensitivities: Optional[List[str]] = None
+    roles: Optional[List[str]] = None
+    site_requires_onsite: Optional[bool] = None
+    number_match: Optional[bool] = None
+    inside_geofence: Optional[bool] = None
+    sim_swap_recent: Optional[bool] = None
+    device_swap_recent: Optional[bool] = None
+    any_signal: Optional[List[str]] = None  # At least one of these risk signals
+
+
+class PolicyRuleSetUpdate(BaseModel):
+    """Schema for replacing the active rule set."""
+    rules: List[PolicyRule]
+
+
+class PolicyRuleSetResponse(BaseModel):
+    """Schema for a rule set; version is None for the built-in rules."""
+    version: Optional[int] = None
+    rules: List[PolicyRule]
+    created_at: Optional[datetime] = None
+    created_by_id: Optional[int] = None
+
+
+class PolicyBacktestRequest(BaseModel):
+    """Schema for replaying past custody decisions under candidate rules."""
+    rules: List[PolicyRule]
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    action: Optional[str] = None
@@ -2,6 +2,8 @@
 from app.services.open_gateway_mock import OpenGatewayMock
 from app.services.policy_engine import policy_engine, PolicyEngine, PolicyDecision
 from app.services.audit_service import AuditService
+from app.services.entity_resolver import EntityResolver
+from app.services.verification_store import VerificationStore
 from app.services.custody_service import CustodyService
 
 __all__ = [
@@ -10,5 +12,7 @@ __all__ = [
     "PolicyEngine",
     "PolicyDecision",
     "AuditService",
+    "EntityResolver",
+    "VerificationStore",
     "CustodyService"
 ]
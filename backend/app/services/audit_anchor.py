@@ -0,0 +1,245 @@
+"""Signed anchors over the audit hash chain.
+
+Hash links alone only detect tampering by someone who cannot recompute the
+hashes. Anchors add a key: every ``AUDIT_ANCHOR_INTERVAL_EVENTS`` events or
+``AUDIT_ANCHOR_INTERVAL_SECONDS`` seconds the current head of every chain
+shard is committed into one digest and signed. A rewritten chain no longer
+matches the signed heads, and forging new anchors requires the key. The cost
+is one signature per interval rather than one per event.
+
+Two schemes are supported:
+
+- ``HMAC-SHA256`` with ``AUDIT_ANCHOR_KEY`` as the secret
+- ``Ed25519`` with ``AUDIT_ANCHOR_KEY`` pointing at a PEM private key
+
+The key is never borrowed from ``SECRET_KEY``: its default is published with
+the code, and rotating the JWT secret would invalidate every anchor. Without
+``AUDIT_ANCHOR_KEY`` no anchors are written.
+"""
+import hashlib
+import hmac
+import json
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.audit import AuditAnchor, AuditEvent
+from app.services.audit_service import AuditService, compute_root_hash
+
+logger = logging.getLogger(__name__)
+
+
+class HmacAnchorSigner:
+    """Sign anchors with a shared secret."""
+    
+    algorithm = "HMAC-SHA256"
+    
+    def __init__(self, key: bytes):
+        self._key = key
+        self.key_id = hashlib.sha256(b"audit-anchor:" + key).hexdigest()[:16]
+    
+    def sign(self, digest: str) -> str:
+        return hmac.new(self._key, digest.encode('ascii'), hashlib.sha256).hexdigest()
+    
+    def verify(self, digest: str, signature: str) -> bool:
+        return hmac.compare_digest(self.sign(digest), signature)
+
+
+class Ed25519AnchorSigner:
+    """Sign anchors with an Ed25519 private key."""
+    
+    algorithm = "Ed25519"
+    
+    def __init__(self, private_key_pem: bytes):
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+        
+        private_key = serialization.load_pem_private_key(private_key_pem, password=None)
+        if not isinstance(private_key, Ed25519PrivateKey):
+            raise ValueError("AUDIT_ANCHOR_KEY is not an Ed25519 private key")
+        self._private_key = private_key
+        self._public_key = private_key.public_key()
+        public_bytes = self._public_key.public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw
+        )
+        self.key_id = hashlib.sha256(public_bytes).hexdigest()[:16]
+    
+    def sign(self, digest: str) -> str:
+        return self._private_key.sign(digest.encode('ascii')).hex()
+    
+    def verify(self, digest: str, signature: str) -> bool:
+        from cryptography.exceptions import InvalidSignature
+        
+        try:
+            self._public_key.verify(bytes.fromhex(signature), digest.encode('ascii'))
+            return True
+        except (InvalidSignature, ValueError):
+            return False
+
+
+@lru_cache()
+def get_anchor_signer():
+    """Build the signer for the configured anchor algorithm."""
+    if settings.AUDIT_ANCHOR_ALGORITHM == Ed25519AnchorSigner.algorithm:
+        if not settings.AUDIT_ANCHOR_KEY:
+            raise ValueError("AUDIT_ANCHOR_KEY must point at an Ed25519 PEM private key")
+        with open(settings.AUDIT_ANCHOR_KEY, "rb") as f:
+            return Ed25519AnchorSigner(f.read())
+    if settings.AUDIT_ANCHOR_ALGORITHM == HmacAnchorSigner.algorithm:
+        if not settings.AUDIT_ANCHOR_KEY:
+            raise ValueError("AUDIT_ANCHOR_KEY must be set to sign anchors")
+        if settings.AUDIT_ANCHOR_KEY == settings.SECRET_KEY:
+            logger.warning("AUDIT_ANCHOR_KEY equals SECRET_KEY; anyone holding the JWT secret can forge anchors")
+        return HmacAnchorSigner(settings.AUDIT_ANCHOR_KEY.encode('utf-8'))
+    raise ValueError(f"Unsupported AUDIT_ANCHOR_ALGORITHM: {settings.AUDIT_ANCHOR_ALGORITHM}")
+
+
+def anchor_to_dict(anchor: AuditAnchor) -> dict:
+    """Convert an anchor to a dictionary."""
+    return {
+        "id": anchor.id,
+        "created_at": anchor.created_at.isoformat(),
+        "last_event_id": anchor.last_event_id,
+        "heads": json.loads(anchor.heads),
+        "digest": anchor.digest,
+        "algorithm": anchor.algorithm,
+        "key_id": anchor.key_id,
+        "signature": anchor.signature
+    }
+
+
+class AuditAnchors:
+    """Create and check signed anchors."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def last(self) -> Optional[AuditAnchor]:
+        """Get the most recent anchor."""
+        return self.db.query(AuditAnchor).order_by(AuditAnchor.id.desc()).first()
+    
+    def recent(self, limit: int = 100) -> List[AuditAnchor]:
+        """Get the most recent anchors, newest first."""
+        return self.db.query(AuditAnchor).order_by(AuditAnchor.id.desc()).limit(limit).all()
+    
+    def commit(self, upto_event_id: Optional[int] = None) -> Optional[AuditAnchor]:
+        """
+        Sign the heads of all chain shards as of an event ID.
+        
+        Defaults to the latest event. Returns None when there is nothing new
+        to anchor.
+        """
+        service = AuditService(self.db)
+        if upto_event_id is None:
+            upto_event_id = self.db.query(func.max(AuditEvent.id)).scalar()
+        # Each anchor names its predecessor in the unique prev_anchor_id:
+        # when two workers race, one insert fails and rechecks the winner
+        for _ in range(3):
+            last_anchor = self.last()
+            if upto_event_id is None or (last_anchor and last_anchor.last_event_id >= upto_event_id):
+                return None
+            
+            signer = get_anchor_signer()
+            heads = service.get_chain_heads(upto_event_id)
+            prev_digest = last_anchor.digest if last_anchor else None
+            digest = compute_root_hash(prev_digest, upto_event_id, heads)
+            anchor = AuditAnchor(
+                created_at=datetime.utcnow(),
+                last_event_id=upto_event_id,
+                heads=json.dumps(heads, sort_keys=True),
+                prev_anchor_id=last_anchor.id if last_anchor else 0,
+                prev_digest=prev_digest,
+                digest=digest,
+                algorithm=signer.algorithm,
+                key_id=signer.key_id,
+                signature=signer.sign(digest)
+            )
+            self.db.add(anchor)
+            try:
+                self.db.commit()
+                return anchor
+            except IntegrityError:
+                self.db.rollback()
+        logger.warning(f"Gave up anchoring event {upto_event_id} after repeated conflicts")
+        return None
+    
+    def maybe_commit(self, event_id: int) -> Optional[AuditAnchor]:
+        """Anchor once enough events or time have passed since the last anchor."""
+        interval_events = settings.AUDIT_ANCHOR_INTERVAL_EVENTS
+        interval_seconds = settings.AUDIT_ANCHOR_INTERVAL_SECONDS
+        if not settings.AUDIT_ANCHOR_KEY or (not interval_events and not interval_seconds):
+            return None
+        
+        last_anchor = self.last()
+        if last_anchor is not None:
+            due_by_count = interval_events and event_id - last_anchor.last_event_id >= interval_events
+            due_by_time = interval_seconds and (
+                (datetime.utcnow() - last_anchor.created_at.replace(tzinfo=None)).total_seconds() >= interval_seconds
+            )
+            if not (due_by_count or due_by_time):
+                return None
+        return self.commit(event_id)
+    
+    def verify(self) -> Tuple[Optional[str], int]:
+        """
+        Check every anchor's link, digest and signature, and that the signed
+        heads still match the chain.
+        
+        Returns an error message for the first invalid anchor (or None) and
+        the number of anchors checked.
+        """
+        if not settings.AUDIT_ANCHOR_KEY:
+            if self.last() is not None:
+                return "Anchors exist but AUDIT_ANCHOR_KEY is not configured to verify them.", 0
+            return None, 0
+        signer = get_anchor_signer()
+        service = AuditService(self.db)
+        sealed_upto = service.archive.sealed_upto()
+        stale = self._stale_anchors(service, sealed_upto)
+        prev_digest = None
+        count = 0
+        for anchor in self.db.query(AuditAnchor).order_by(AuditAnchor.id.asc()).yield_per(500):
+            if anchor.prev_digest != prev_digest:
+                return f"Anchor {anchor.id} does not link to the previous anchor.", count
+            
+            heads = json.loads(anchor.heads)
+            if anchor.digest != compute_root_hash(anchor.prev_digest, anchor.last_event_id, heads):
+                return f"Anchor {anchor.id} digest mismatch.", count
+            if anchor.algorithm != signer.algorithm or anchor.key_id != signer.key_id:
+                return f"Anchor {anchor.id} was signed with a key that is not configured ({anchor.key_id}).", count
+            if not signer.verify(anchor.digest, anchor.signature):
+                return f"Anchor {anchor.id} signature is invalid.", count
+            if anchor.id in stale:
+                return f"Anchor {anchor.id} no longer matches the chain heads (events may have been rewritten).", count
+            
+            prev_digest = anchor.digest
+            count += 1
+        return None, count
+    
+    def _stale_anchors(self, service: AuditService, sealed_upto: int) -> Set[int]:
+        """
+        IDs of anchors whose signed heads no longer match the chain, found
+        in one ordered pass over the hot events. Heads of sealed anchors are
+        covered by the segment boundary hashes.
+        """
+        anchors = (
+            self.db.query(AuditAnchor.id, AuditAnchor.last_event_id, AuditAnchor.heads)
+            .filter(AuditAnchor.last_event_id >= sealed_upto)
+            .order_by(AuditAnchor.last_event_id.asc(), AuditAnchor.id.asc())
+        )
+        event_ids = [event_id for (event_id,) in anchors.with_entities(AuditAnchor.last_event_id)]
+        stale = set()
+        rows = iter(anchors.yield_per(500))
+        row = next(rows, None)
+        for event_id, heads in service.iter_chain_heads(event_ids):
+            while row is not None and row.last_event_id == event_id:
+                if json.loads(row.heads) != heads:
+                    stale.add(row.id)
+                row = next(rows, None)
+        return stale
@@ -0,0 +1,448 @@
+"""Cold storage for sealed months of the audit trail.
+
+The hot ``audit_events`` table only needs to hold recent activity. Whole
+months older than ``AUDIT_HOT_MONTHS`` are sealed: exported in chain order to
+an immutable gzip-compressed NDJSON segment file, recorded in
+``audit_segments`` together with the shard head hashes before and after the
+segment, and removed from the hot table. Workers seal one at a time under
+an exclusive lock on the segment directory, each writing its own temporary
+file, so sealing on every worker's startup is safe.
+
+Segments cover contiguous event ID ranges, so the chain can be verified by
+walking the segments in order and then continuing into the hot table from the
+last segment's end heads.
+
+A segment file is a series of gzip members of ``SEGMENT_BLOCK_EVENTS`` events
+each, which reads as one gzip stream. The offset, length, (timestamp, id)
+range and ID range of every member are recorded with the segment, so paging
+through cold events or loading them by ID decompresses only the blocks that
+can hold them. Search documents of sealed events stay in the full-text index.
+"""
+import gzip
+import hashlib
+import heapq
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+from app.core.config import settings
+from app.models.audit import AuditEvent, AuditSegment
+from app.services.audit_service import AuditService, chain_result, compute_event_hash
+
+# Events per gzip member of a segment file
+SEGMENT_BLOCK_EVENTS = 1000
+
+# Held exclusively while sealing, in AUDIT_SEGMENT_DIR
+SEAL_LOCK_FILE = ".seal.lock"
+
+# Keyset bounds of segments sealed without a block index
+_KEY_MIN = (datetime.min, 0)
+_KEY_MAX = (datetime.max, 0)
+
+
+def month_start(timestamp: datetime) -> datetime:
+    """Get the start of the month containing a timestamp."""
+    return timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(timestamp: datetime, months: int) -> datetime:
+    """Shift a month-start timestamp by a number of months."""
+    month_index = timestamp.year * 12 + timestamp.month - 1 + months
+    return timestamp.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def hot_cutoff(months: int, now: Optional[datetime] = None) -> datetime:
+    """Get the start of the oldest month kept hot when keeping the given months."""
+    return add_months(month_start(now or datetime.utcnow()), -months)
+
+
+def segment_to_dict(segment: AuditSegment) -> dict:
+    """Convert a segment to a dictionary."""
+    return {
+        "id": segment.id,
+        "period": segment.period,
+        "event_count": segment.event_count,
+        "first_event_id": segment.first_event_id,
+        "last_event_id": segment.last_event_id,
+        "first_timestamp": segment.first_timestamp.isoformat(),
+        "last_timestamp": segment.last_timestamp.isoformat(),
+        "file_sha256": segment.file_sha256,
+        "end_heads": json.loads(segment.end_heads),
+        "sealed_at": segment.sealed_at.isoformat() if segment.sealed_at else None
+    }
+
+
+def row_matches(
+    row: dict,
+    asset_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    decision: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    site_id: Optional[int] = None,
+    signals: Optional[dict] = None
+) -> bool:
+    """Apply AuditService.filtered_query filters to a cold segment row."""
+    if asset_id and row["asset_id"] != asset_id:
+        return False
+    if user_id and row["actor_user_id"] != user_id:
+        return False
+    if action and row["action"] != action:
+        return False
+    if decision and row["decision"] != decision:
+        return False
+    if site_id and row["site_id"] != site_id:
+        return False
+    if since or until:
+        timestamp = datetime.fromisoformat(row["timestamp"])
+        if since and timestamp < since:
+            return False
+        if until and timestamp >= until:
+            return False
+    for column, value in (signals or {}).items():
+        if value is not None and row.get(column) != value:
+            return False
+    return True
+
+
+def row_to_event(row: dict) -> AuditEvent:
+    """Build a transient (never persisted) AuditEvent from a segment row."""
+    fields = dict(row)
+    fields["timestamp"] = datetime.fromisoformat(row["timestamp"])
+    return AuditEvent(**fields)
+
+
+def _file_sha256(path: str) -> str:
+    """Hash a file in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextmanager
+def _seal_lock() -> Iterator[None]:
+    """Hold the sealing lock shared by all workers."""
+    os.makedirs(settings.AUDIT_SEGMENT_DIR, exist_ok=True)
+    with open(os.path.join(settings.AUDIT_SEGMENT_DIR, SEAL_LOCK_FILE), "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class AuditArchive:
+    """Seal, read and verify cold audit segments."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def segments(self) -> List[AuditSegment]:
+        """Get all sealed segments in chain order."""
+        return self.db.query(AuditSegment).order_by(AuditSegment.first_event_id.asc()).all()
+    
+    def last_segment(self) -> Optional[AuditSegment]:
+        """Get the most recently sealed segment."""
+        return self.db.query(AuditSegment).order_by(AuditSegment.last_event_id.desc()).first()
+    
+    def sealed_heads(self) -> Dict[str, str]:
+        """Get the shard heads at the hot/cold boundary."""
+        segment = self.last_segment()
+        return json.loads(segment.end_heads) if segment else {}
+    
+    def sealed_upto(self) -> int:
+        """Get the highest event ID held in cold storage (0 if none)."""
+        segment = self.last_segment()
+        return segment.last_event_id if segment else 0
+    
+    def needed_for(self, since: Optional[datetime]) -> bool:
+        """Whether a query starting at since reaches into cold storage."""
+        segment = self.last_segment()
+        return segment is not None and (since is None or since <= segment.last_timestamp)
+    
+    # ==================== Sealing ====================
+    
+    def seal_before(self, cutoff: datetime) -> List[AuditSegment]:
+        """
+        Seal every whole month of hot events that ends on or before cutoff.
+        
+        A worker that waited for another to finish sealing sees the months
+        it sealed gone from the hot table and skips them.
+        """
+        sealed = []
+        with _seal_lock():
+            while True:
+                oldest = self.db.query(func.min(AuditEvent.timestamp)).scalar()
+                if oldest is None:
+                    return sealed
+                start = month_start(oldest)
+                end = add_months(start, 1)
+                if end > cutoff:
+                    return sealed
+                sealed.append(self._seal_month(start, end))
+    
+    def _seal_month(self, start: datetime, end: datetime) -> AuditSegment:
+        """
+        Export one month of hot events to a segment and drop them from the
+        table. The caller holds the sealing lock.
+        """
+        # Seal by ID so segments stay contiguous even if timestamps interleave
+        # around the month boundary
+        last_event_id = self.db.query(func.max(AuditEvent.id)).filter(AuditEvent.timestamp < end).scalar()
+        period = start.strftime("%Y-%m")
+        
+        path = os.path.join(settings.AUDIT_SEGMENT_DIR, f"audit-{period}.ndjson.gz")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        
+        service = AuditService(self.db)
+        start_heads = self.sealed_heads()
+        heads = dict(start_heads)
+        count = 0
+        first_row = last_row = None
+        
+        blocks = []
+        
+        def write_member(f, lines: List[str]) -> dict:
+            data = gzip.compress("".join(lines).encode("utf-8"))
+            block = {"offset": f.tell(), "length": len(data)}
+            f.write(data)
+            return block
+        
+        with open(tmp_path, "wb") as f:
+            write_member(f, [json.dumps({"segment": period, "start_heads": start_heads}, sort_keys=True) + "\n"])
+            after_id = 0
+            while True:
+                events = (
+                    self.db.query(AuditEvent)
+                    .filter(AuditEvent.id > after_id, AuditEvent.id <= last_event_id)
+                    .order_by(AuditEvent.id.asc())
+                    .limit(SEGMENT_BLOCK_EVENTS)
+                    .all()
+                )
+                if not events:
+                    break
+                rows = list(service.export_rows(events))
+                for row in rows:
+                    heads[row["chain_key"]] = row["hash"]
+                    first_row = first_row or row
+                    last_row = row
+                    count += 1
+                block = write_member(f, [json.dumps(row) + "\n" for row in rows])
+                keys = [(datetime.fromisoformat(row["timestamp"]), row["id"]) for row in rows]
+                blocks.append({
+                    **block,
+                    "min": [min(keys)[0].isoformat(), min(keys)[1]],
+                    "max": [max(keys)[0].isoformat(), max(keys)[1]],
+                    "ids": [rows[0]["id"], rows[-1]["id"]]
+                })
+                after_id = events[-1].id
+                for event in events:
+                    self.db.expunge(event)
+            write_member(f, [json.dumps({"segment": period, "end_heads": heads, "event_count": count}, sort_keys=True) + "\n"])
+        
+        os.replace(tmp_path, path)
+        os.chmod(path, 0o444)
+        
+        segment = AuditSegment(
+            period=period,
+            path=path,
+            file_sha256=_file_sha256(path),
+            event_count=count,
+            first_event_id=first_row["id"],
+            last_event_id=last_row["id"],
+            first_timestamp=datetime.fromisoformat(first_row["timestamp"]),
+            last_timestamp=datetime.fromisoformat(last_row["timestamp"]),
+            start_heads=json.dumps(start_heads, sort_keys=True),
+            end_heads=json.dumps(heads, sort_keys=True),
+            blocks=json.dumps(blocks)
+        )
+        self.db.add(segment)
+        self.db.query(AuditEvent).filter(AuditEvent.id <= last_event_id).delete(synchronize_session=False)
+        self.db.commit()
+        return segment
+    
+    # ==================== Reading ====================
+    
+    def iter_rows(self, segment: AuditSegment) -> Iterator[dict]:
+        """Stream the event rows of a segment in chain order."""
+        with gzip.open(segment.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                if "segment" not in row:
+                    yield row
+    
+    def _segments_in_range(self, since: Optional[datetime], until: Optional[datetime]) -> List[AuditSegment]:
+        """Get the segments overlapping [since, until)."""
+        return [
+            segment for segment in self.segments()
+            if (since is None or segment.last_timestamp >= since)
+            and (until is None or segment.first_timestamp < until)
+        ]
+    
+    def iter_matching(self, **filters) -> Iterator[dict]:
+        """Stream cold rows matching the filters, oldest first."""
+        for segment in self._segments_in_range(filters.get("since"), filters.get("until")):
+            for row in self.iter_rows(segment):
+                if row_matches(row, **filters):
+                    yield row
+    
+    def _blocks(self, segment: AuditSegment) -> List[Tuple[tuple, tuple, Optional[dict]]]:
+        """(min key, max key, block) of each gzip member; one unbounded block for unindexed segments."""
+        if not segment.blocks:
+            return [(_KEY_MIN, _KEY_MAX, None)]
+        return [
+            (
+                (datetime.fromisoformat(block["min"][0]), block["min"][1]),
+                (datetime.fromisoformat(block["max"][0]), block["max"][1]),
+                block
+            )
+            for block in json.loads(segment.blocks)
+        ]
+    
+    def _block_rows(self, segment: AuditSegment, block: Optional[dict]) -> Iterator[dict]:
+        """Stream the event rows of one block, or of the whole segment if block is None."""
+        if block is None:
+            yield from self.iter_rows(segment)
+            return
+        with open(segment.path, "rb") as f:
+            f.seek(block["offset"])
+            data = gzip.decompress(f.read(block["length"]))
+        for line in data.decode("utf-8").splitlines():
+            row = json.loads(line)
+            if "segment" not in row:
+                yield row
+    
+    def events_by_id(self, event_ids: List[int]) -> Dict[int, AuditEvent]:
+        """Load sealed events by ID, reading only the blocks that hold them."""
+        wanted = set(event_ids)
+        found: Dict[int, AuditEvent] = {}
+        for segment in self.segments():
+            ids = {event_id for event_id in wanted if segment.first_event_id <= event_id <= segment.last_event_id}
+            if not ids:
+                continue
+            for _, _, block in self._blocks(segment):
+                # Segments sealed before blocks recorded their ID range are read whole
+                if block is not None and "ids" in block and not any(
+                    block["ids"][0] <= event_id <= block["ids"][1] for event_id in ids
+                ):
+                    continue
+                for row in self._block_rows(segment, block):
+                    if row["id"] in ids:
+                        found[row["id"]] = row_to_event(row)
+                        ids.discard(row["id"])
+                if not ids:
+                    break
+        return found
+    
+    def latest_matching(
+        self,
+        limit: int,
+        before: Optional[Tuple[datetime, int]] = None,
+        **filters
+    ) -> List[AuditEvent]:
+        """
+        Get up to limit matching cold events, newest first.
+        
+        before is an exclusive (timestamp, id) keyset position. Blocks are
+        read in descending order of their newest key, and reading stops once
+        no remaining block can hold a newer match than the limit kept so far.
+        """
+        since, until = filters.get("since"), filters.get("until")
+        candidates = []
+        for segment in self._segments_in_range(since, until):
+            for min_key, max_key, block in self._blocks(segment):
+                if before and min_key >= before:
+                    continue
+                if since and max_key < (since, 0):
+                    continue
+                if until and min_key >= (until, 0):
+                    continue
+                candidates.append((max_key, segment, block))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        
+        kept: List[Tuple[tuple, dict]] = []  # Min-heap of the newest matches
+        for max_key, segment, block in candidates:
+            if len(kept) >= limit and max_key < kept[0][0]:
+                break
+            for row in self._block_rows(segment, block):
+                if not row_matches(row, **filters):
+                    continue
+                key = (datetime.fromisoformat(row["timestamp"]), row["id"])
+                if before and key >= before:
+                    continue
+                if len(kept) < limit:
+                    heapq.heappush(kept, (key, row))
+                elif key > kept[0][0]:
+                    heapq.heapreplace(kept, (key, row))
+        return [row_to_event(row) for _, row in sorted(kept, key=lambda item: item[0], reverse=True)]
+    
+    # ==================== Verification ====================
+    
+    def verify(self) -> Tuple[dict, Dict[str, str]]:
+        """
+        Verify every sealed segment in order.
+        
+        Returns the verification result and the shard heads after the last
+        segment, from which hot verification continues.
+        """
+        heads: Dict[str, str] = {}
+        total = 0
+        
+        for segment in self.segments():
+            if json.loads(segment.start_heads) != heads:
+                return chain_result(
+                    False, total, total, segment.first_event_id,
+                    f"Segment {segment.period} does not continue from the previous segment."
+                ), heads
+            if not os.path.exists(segment.path) or _file_sha256(segment.path) != segment.file_sha256:
+                return chain_result(
+                    False, total, total, segment.first_event_id,
+                    f"Segment {segment.period} file is missing or has been modified."
+                ), heads
+            
+            count = 0
+            for row in self.iter_rows(segment):
+                chain_key = row["chain_key"]
+                expected_hash = compute_event_hash(
+                    prev_hash=row["prev_hash"],
+                    timestamp=datetime.fromisoformat(row["timestamp"]),
+                    asset_id=row["asset_id"],
+                    actor_user_id=row["actor_user_id"],
+                    action=row["action"],
+                    decision=row["decision"],
+                    site_id=row["site_id"],
+                    target_user_id=row["target_user_id"],
+                    approval_id=row["approval_id"],
+                    verification_summary=row["verification_summary"],
+                    version=row.get("hash_version")
+                )
+                if row["prev_hash"] != heads.get(chain_key) or row["hash"] != expected_hash:
+                    return chain_result(
+                        False, total + count, total + count, row["id"],
+                        f"Chain broken at archived event {row['id']} in segment {segment.period}."
+                    ), heads
+                heads[chain_key] = row["hash"]
+                count += 1
+            
+            total += count
+            if count != segment.event_count or heads != json.loads(segment.end_heads):
+                return chain_result(
+                    False, total, total, segment.last_event_id,
+                    f"Segment {segment.period} end heads do not match its contents."
+                ), heads
+        
+        return chain_result(True, total, total, None, "Archived segments verified."), heads
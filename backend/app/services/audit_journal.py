@@ -0,0 +1,424 @@
+"""Append-only binary journal mirroring the audit chain.
+
+When ``AUDIT_JOURNAL_DIR`` is set, every audit event is also appended to a
+fixed-layout record file next to the database insert. Verification summaries
+go to a companion blob file and records point into it by offset. Because
+every record has the same size, verification and bulk analytics can mmap the
+journal and scan it at disk speed without SQL or ORM overhead.
+
+File layout:
+
+- ``audit.journal``: 16-byte header (magic, format version, record size)
+  followed by one RECORD per event in event ID order.
+- ``audit.blobs``: concatenated UTF-8 verification summary texts.
+
+Run ``python -m app.services.audit_journal reconcile`` from the backend
+directory to prove the journal and the ``audit_events`` table (plus sealed
+segments) agree; ``--repair`` appends events missing from the journal tail.
+"""
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+from app.core.config import settings
+from app.models.audit import AuditEvent
+from app.services.audit_archive import row_to_event
+from app.services.audit_service import (
+    EPOCH,
+    HASH_VERSION_BINARY,
+    HASH_VERSION_JSON,
+    AuditService,
+    chain_result,
+    compute_event_hash,
+    to_microseconds
+)
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GCAJ"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHH8x")
+
+# event_id, timestamp_us, asset_id, actor_user_id, site_id, target_user_id,
+# approval_id, action, decision, chain_kind, flags, blob_length, blob_offset,
+# prev_hash, hash. Optional IDs are stored as 0.
+RECORD = struct.Struct("<QqQQQQQBBBBIQ32s32s")
+
+JournalRecord = namedtuple("JournalRecord", [
+    "event_id", "timestamp_us", "asset_id", "actor_user_id", "site_id",
+    "target_user_id", "approval_id", "action", "decision", "chain_kind",
+    "flags", "blob_length", "blob_offset", "prev_hash", "hash"
+])
+
+ACTION_CODES = {"CHECK_OUT": 1, "CHECK_IN": 2, "TRANSFER": 3, "INVENTORY_CLOSE": 4}
+DECISION_CODES = {"ALLOW": 1, "DENY": 2, "STEP_UP": 3}
+ACTIONS = {code: name for name, code in ACTION_CODES.items()}
+DECISIONS = {code: name for name, code in DECISION_CODES.items()}
+
+CHAIN_GLOBAL, CHAIN_ASSET, CHAIN_SITE = 0, 1, 2
+
+# Risk signal bit flags, mirroring the structured AuditEvent columns
+FLAG_NUMBER_MATCH = 1 << 0
+FLAG_INSIDE_GEOFENCE = 1 << 1
+FLAG_SIM_SWAP = 1 << 2
+FLAG_DEVICE_SWAP = 1 << 3
+FLAG_GATEWAY_ERROR = 1 << 4
+FLAG_HAS_SUMMARY = 1 << 5
+FLAG_HASH_V2 = 1 << 6  # Event hash uses the binary v2 format
+
+
+def from_microseconds(value: int) -> datetime:
+    """Convert microseconds since the epoch to a naive UTC timestamp."""
+    return EPOCH + timedelta(microseconds=value)
+
+
+def _chain_kind(chain_key: Optional[str]) -> int:
+    """Encode an event's chain shard kind."""
+    if chain_key and chain_key.startswith("asset:"):
+        return CHAIN_ASSET
+    if chain_key and chain_key.startswith("site:"):
+        return CHAIN_SITE
+    return CHAIN_GLOBAL
+
+
+def record_chain_key(record: JournalRecord) -> str:
+    """Rebuild the chain key of a journal record."""
+    if record.chain_kind == CHAIN_ASSET:
+        return f"asset:{record.asset_id}"
+    if record.chain_kind == CHAIN_SITE:
+        return f"site:{record.site_id}"
+    return "global"
+
+
+def _flags(event, has_summary: bool) -> int:
+    """Pack the structured risk signals of an event into bit flags."""
+    flags = FLAG_HAS_SUMMARY if has_summary else 0
+    if event.hash_version == HASH_VERSION_BINARY:
+        flags |= FLAG_HASH_V2
+    if event.number_match:
+        flags |= FLAG_NUMBER_MATCH
+    if event.inside_geofence:
+        flags |= FLAG_INSIDE_GEOFENCE
+    if event.sim_swap:
+        flags |= FLAG_SIM_SWAP
+    if event.device_swap:
+        flags |= FLAG_DEVICE_SWAP
+    if event.gateway_error:
+        flags |= FLAG_GATEWAY_ERROR
+    return flags
+
+
+class AuditJournal:
+    """Fixed-layout, append-only mirror of the audit chain."""
+    
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.journal_path = os.path.join(directory, "audit.journal")
+        self.blob_path = os.path.join(directory, "audit.blobs")
+        self._lock = threading.Lock()
+        
+        new_file = not os.path.exists(self.journal_path) or os.path.getsize(self.journal_path) == 0
+        self._journal_fd = os.open(self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._blob_fd = os.open(self.blob_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        if new_file:
+            os.write(self._journal_fd, HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size))
+        else:
+            self._check_header()
+    
+    def _check_header(self) -> None:
+        """Refuse to append to a journal written with another layout."""
+        with open(self.journal_path, "rb") as f:
+            magic, version, record_size = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD.size:
+            raise ValueError(f"Unsupported audit journal format in {self.journal_path}")
+    
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        """
+        Hold the journal for appending. The thread lock covers this process;
+        flock covers other workers appending to the same files, so the last
+        record and blob offset read under it are still the end of the files
+        when the next ones are written.
+        """
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._journal_fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._journal_fd, fcntl.LOCK_UN)
+    
+    def append(self, event: AuditEvent, verification_summary: Optional[str]) -> None:
+        """Append an event (already assigned an ID) unless the journal already holds it."""
+        with self._exclusive():
+            if event.id > self.last_event_id():
+                self._write(event, verification_summary)
+    
+    def append_committed(self, db: Session, events: List[Tuple[AuditEvent, Optional[str]]]) -> None:
+        """
+        Append the events of a committed unit of work, keeping the journal in
+        event ID order.
+        
+        SQLite serializes writers, so IDs are committed in order, but workers
+        reach the journal in any order after committing. Events other workers
+        committed after the last journaled one are appended first, read back
+        from the database, and events they already journaled are skipped.
+        """
+        with self._exclusive():
+            last_id = self.last_event_id()
+            pending = {event.id: (event, summary) for event, summary in events if event.id > last_id}
+            if not pending:
+                return
+            # An empty journal starts at these events rather than copying the table
+            if last_id and min(pending) > last_id + 1:
+                others = (
+                    db.query(AuditEvent)
+                    .filter(AuditEvent.id > last_id, AuditEvent.id < max(pending), AuditEvent.id.notin_(list(pending)))
+                    .order_by(AuditEvent.id.asc())
+                    .all()
+                )
+                for row in AuditService(db).export_rows(others):
+                    pending[row["id"]] = (row_to_event(row), row["verification_summary"])
+            for event_id in sorted(pending):
+                self._write(*pending[event_id])
+    
+    def _write(self, event: AuditEvent, verification_summary: Optional[str]) -> None:
+        blob = verification_summary.encode('utf-8') if verification_summary is not None else b""
+        blob_offset = os.fstat(self._blob_fd).st_size
+        if blob:
+            os.write(self._blob_fd, blob)
+        os.write(self._journal_fd, RECORD.pack(
+            event.id,
+            to_microseconds(event.timestamp),
+            event.asset_id,
+            event.actor_user_id,
+            event.site_id or 0,
+            event.target_user_id or 0,
+            event.approval_id or 0,
+            ACTION_CODES.get(event.action, 0),
+            DECISION_CODES.get(event.decision, 0),
+            _chain_kind(event.chain_key),
+            _flags(event, verification_summary is not None),
+            len(blob),
+            blob_offset,
+            bytes.fromhex(event.prev_hash) if event.prev_hash else bytes(32),
+            bytes.fromhex(event.hash)
+        ))
+    
+    def iter_records(self) -> Iterator[JournalRecord]:
+        """Scan all records through a read-only memory map."""
+        if os.path.getsize(self.journal_path) <= HEADER.size:
+            return
+        with open(self.journal_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            usable = (len(mapped) - HEADER.size) // RECORD.size * RECORD.size
+            view = memoryview(mapped)[HEADER.size:HEADER.size + usable]
+            try:
+                for fields in RECORD.iter_unpack(view):
+                    yield JournalRecord(*fields)
+            finally:
+                view.release()
+    
+    def last_event_id(self) -> int:
+        """Get the ID of the last journaled event (0 if empty)."""
+        size = os.path.getsize(self.journal_path)
+        count = (size - HEADER.size) // RECORD.size
+        if count <= 0:
+            return 0
+        with open(self.journal_path, "rb") as f:
+            f.seek(HEADER.size + (count - 1) * RECORD.size)
+            return JournalRecord(*RECORD.unpack(f.read(RECORD.size))).event_id
+    
+    def verify(self) -> dict:
+        """
+        Verify the hash chain from the journal alone.
+        
+        Every record's hash is recomputed from its fields and blob, and its
+        prev_hash is checked against the previous record of the same shard.
+        """
+        heads: Dict[str, str] = {}
+        total = 0
+        with open(self.blob_path, "rb") as blob_file:
+            blobs = mmap.mmap(blob_file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(self.blob_path) else b""
+            try:
+                for record in self.iter_records():
+                    chain_key = record_chain_key(record)
+                    prev_hash = record.prev_hash.hex() if any(record.prev_hash) else None
+                    summary = None
+                    if record.flags & FLAG_HAS_SUMMARY:
+                        summary = bytes(blobs[record.blob_offset:record.blob_offset + record.blob_length]).decode('utf-8')
+                    expected_hash = compute_event_hash(
+                        prev_hash=prev_hash,
+                        timestamp=from_microseconds(record.timestamp_us),
+                        asset_id=record.asset_id,
+                        actor_user_id=record.actor_user_id,
+                        action=ACTIONS.get(record.action, ""),
+                        decision=DECISIONS.get(record.decision, ""),
+                        site_id=record.site_id or None,
+                        target_user_id=record.target_user_id or None,
+                        approval_id=record.approval_id or None,
+                        verification_summary=summary,
+                        version=HASH_VERSION_BINARY if record.flags & FLAG_HASH_V2 else HASH_VERSION_JSON
+                    )
+                    if prev_hash != heads.get(chain_key) or record.hash.hex() != expected_hash:
+                        return chain_result(
+                            False, total, total, record.event_id,
+                            f"Journal chain broken at event {record.event_id}."
+                        )
+                    heads[chain_key] = record.hash.hex()
+                    total += 1
+            finally:
+                if blobs:
+                    blobs.close()
+        return chain_result(True, total, total, None, "Audit journal verified. All records are valid.")
+    
+    def reconcile(self, db: Session, repair: bool = False) -> dict:
+        """
+        Prove that the journal and the database hold the same events.
+        
+        Walks sealed segments, the hot table and the journal in event ID
+        order and compares every identifying field, timestamp, decision and
+        hash. With repair, events missing from the end of the journal are
+        appended (e.g. after a crash between the insert and the journal write).
+        """
+        service = AuditService(db)
+        records = self.iter_records()
+        compared = 0
+        missing = []
+        
+        def table_rows() -> Iterator[dict]:
+            yield from service.archive.iter_matching()
+            after_id = 0
+            while True:
+                events = (
+                    db.query(AuditEvent)
+                    .filter(AuditEvent.id > after_id)
+                    .order_by(AuditEvent.id.asc())
+                    .limit(1000)
+                    .all()
+                )
+                if not events:
+                    return
+                yield from service.export_rows(events)
+                after_id = events[-1].id
+                for event in events:
+                    db.expunge(event)
+        
+        for row in table_rows():
+            record = next(records, None)
+            if record is None:
+                missing.append(row)
+                continue
+            expected = (
+                row["id"],
+                to_microseconds(datetime.fromisoformat(row["timestamp"])),
+                row["asset_id"],
+                row["actor_user_id"],
+                ACTION_CODES.get(row["action"], 0),
+                DECISION_CODES.get(row["decision"], 0),
+                row["prev_hash"] or bytes(32).hex(),
+                row["hash"]
+            )
+            actual = (
+                record.event_id,
+                record.timestamp_us,
+                record.asset_id,
+                record.actor_user_id,
+                record.action,
+                record.decision,
+                record.prev_hash.hex(),
+                record.hash.hex()
+            )
+            if expected != actual:
+                return {
+                    "consistent": False,
+                    "compared": compared,
+                    "missing_from_journal": 0,
+                    "first_mismatch_id": row["id"],
+                    "message": f"Journal and database disagree at event {row['id']}."
+                }
+            compared += 1
+        
+        extra = next(records, None)
+        if extra is not None:
+            return {
+                "consistent": False,
+                "compared": compared,
+                "missing_from_journal": 0,
+                "first_mismatch_id": extra.event_id,
+                "message": f"Journal has event {extra.event_id} that is not in the database."
+            }
+        
+        if missing and repair:
+            for row in missing:
+                self.append(row_to_event(row), row["verification_summary"])
+            compared += len(missing)
+            missing = []
+        
+        return {
+            "consistent": not missing,
+            "compared": compared,
+            "missing_from_journal": len(missing),
+            "first_mismatch_id": missing[0]["id"] if missing else None,
+            "message": (
+                f"Journal is missing the last {len(missing)} events." if missing
+                else "Journal and database agree."
+            )
+        }
+
+
+_journal: Optional[AuditJournal] = None
+_journal_lock = threading.Lock()
+
+
+def get_journal() -> Optional[AuditJournal]:
+    """Get the process-wide journal, or None when journaling is disabled."""
+    global _journal
+    if not settings.AUDIT_JOURNAL_DIR:
+        return None
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                _journal = AuditJournal(settings.AUDIT_JOURNAL_DIR)
+    return _journal
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    
+    from app.core.database import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Audit journal maintenance")
+    parser.add_argument("command", choices=["verify", "reconcile"])
+    parser.add_argument("--repair", action="store_true", help="Append events missing from the journal tail")
+    args = parser.parse_args()
+    
+    journal = get_journal()
+    if journal is None:
+        parser.error("AUDIT_JOURNAL_DIR is not configured")
+    
+    if args.command == "verify":
+        result = journal.verify()
+        print(json.dumps(result, indent=2))
+        raise SystemExit(0 if result["valid"] else 1)
+    
+    session = SessionLocal()
+    try:
+        result = journal.reconcile(session, repair=args.repair)
+    finally:
+        session.close()
+    print(json.dumps(result, indent=2))
+    raise SystemExit(0 if result["consistent"] else 1)
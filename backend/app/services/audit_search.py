@@ -0,0 +1,313 @@
+"""Full-text search over the audit trail.
+
+Investigators search by free text: reasons, asset names, the rule that was
+triggered, gateway error messages. A SQLite FTS5 table holds one document
+per audit event and per approval request, written in the same transaction
+as the record it indexes. Queries are ranked with BM25 and never scan
+``verification_summary`` or ``ApprovalRequest.reason``.
+
+Event documents use the event ID as rowid and approval documents the
+negated approval ID, so either can be replaced or dropped by rowid. Documents
+of events sealed into cold segments are kept, so search covers the whole
+trail; their hits are loaded from the segments.
+"""
+import json
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.principal_cache import Principal
+from app.models.approval import ApprovalRequest
+from app.models.asset import Asset
+from app.models.audit import AuditEvent
+from app.models.user import User
+from app.services.entity_resolver import EntityResolver
+from app.services.verification_store import VerificationStore
+
+SEARCH_TABLE = "audit_search"
+
+SEARCH_COLUMNS = ["action", "decision", "asset_tag", "asset_name", "actor_name", "reason", "errors"]
+
+# BM25 weights: kind and ref_id are not searchable, names and reasons
+# outrank the action/decision codes
+_BM25_WEIGHTS = "0.0, 0.0, 1.0, 1.0, 4.0, 3.0, 3.0, 2.0, 2.0"
+
+# Built once; every indexed event runs both
+_DELETE_DOCUMENT = text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :rowid")
+_INSERT_DOCUMENT = text(
+    f"INSERT INTO {SEARCH_TABLE} (rowid, kind, ref_id, {', '.join(SEARCH_COLUMNS)}) "
+    f"VALUES (:rowid, :kind, :ref_id, {', '.join(':' + column for column in SEARCH_COLUMNS)})"
+)
+
+KIND_EVENT = "event"
+KIND_APPROVAL = "approval"
+
+
+def ensure_search_schema(engine: Engine) -> None:
+    """Create the FTS5 table if the database supports it."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            f"kind UNINDEXED, ref_id UNINDEXED, {', '.join(SEARCH_COLUMNS)}, "
+            f"tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+
+
+def extract_error_text(summary: Optional[dict]) -> str:
+    """Collect gateway error messages from a verification summary."""
+    if not summary:
+        return ""
+    errors = []
+    
+    def walk(value) -> None:
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key in ("error", "gateway_error") and isinstance(item, str):
+                    errors.append(item)
+                else:
+                    walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+    
+    walk(summary)
+    # The same message is usually repeated for every check
+    return " ".join(dict.fromkeys(errors))
+
+
+def match_expression(query: str) -> str:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+    
+    Every word must match, as a prefix; FTS5 operators in the input are
+    treated as plain words.
+    """
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _parse_summary(summary) -> Optional[dict]:
+    """Accept a summary as dict or JSON text."""
+    if isinstance(summary, str):
+        try:
+            return json.loads(summary)
+        except ValueError:
+            return None
+    return summary
+
+
+class AuditSearchIndex:
+    """Maintain and query the audit full-text index."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    @property
+    def enabled(self) -> bool:
+        """Full-text search needs SQLite FTS5."""
+        return self.db.get_bind().dialect.name == "sqlite"
+    
+    # ==================== Indexing ====================
+    
+    def _write(self, rowid: int, kind: str, ref_id: int, fields: Dict[str, str]) -> None:
+        """Insert or replace one document."""
+        # FTS5 has no upsert; delete then insert within the caller's transaction
+        self.db.execute(_DELETE_DOCUMENT, {"rowid": rowid})
+        self.db.execute(_INSERT_DOCUMENT, {"rowid": rowid, "kind": kind, "ref_id": ref_id, **fields})
+    
+    @staticmethod
+    def _fields(
+        action: str,
+        decision: Optional[str],
+        asset: Optional[Asset],
+        actor: Optional[Union[User, Principal]],
+        reason: Optional[str],
+        summary
+    ) -> Dict[str, str]:
+        return {
+            "action": action or "",
+            "decision": decision or "",
+            "asset_tag": asset.tag_id if asset else "",
+            "asset_name": asset.name if asset else "",
+            "actor_name": actor.full_name if actor else "",
+            "reason": reason or "",
+            "errors": extract_error_text(_parse_summary(summary))
+        }
+    
+    def index_event(
+        self,
+        event: AuditEvent,
+        verification_summary=None,
+        asset: Optional[Asset] = None,
+        actor: Optional[Union[User, Principal]] = None,
+        approval: Optional[ApprovalRequest] = None
+    ) -> None:
+        """
+        Index an audit event (flushed, so it has an ID).
+        
+        Related entities default to identity-map lookups, which cost no
+        query when the caller already loaded them.
+        """
+        if not self.enabled:
+            return
+        asset = asset or self.db.get(Asset, event.asset_id)
+        actor = actor or self.db.get(User, event.actor_user_id)
+        if approval is None and event.approval_id:
+            approval = self.db.get(ApprovalRequest, event.approval_id)
+        reason = " ".join(
+            part for part in (approval.reason, approval.resolution_note) if part
+        ) if approval else ""
+        self._write(event.id, KIND_EVENT, event.id, self._fields(
+            event.action, event.decision, asset, actor, reason, verification_summary
+        ))
+    
+    def index_approval(
+        self,
+        approval: ApprovalRequest,
+        verification_summary=None,
+        asset: Optional[Asset] = None,
+        requester: Optional[Union[User, Principal]] = None
+    ) -> None:
+        """Index (or re-index) an approval request (flushed, so it has an ID)."""
+        if not self.enabled:
+            return
+        asset = asset or self.db.get(Asset, approval.asset_id)
+        requester = requester or self.db.get(User, approval.requester_id)
+        reason = " ".join(part for part in (approval.reason, approval.resolution_note) if part)
+        self._write(-approval.id, KIND_APPROVAL, approval.id, self._fields(
+            approval.action, approval.status, asset, requester, reason, verification_summary
+        ))
+    
+    def backfill(self, batch_size: int = 500) -> int:
+        """
+        Index hot events and approval requests created before the index
+        existed. Only records newer than the newest indexed ones are read, so
+        this is cheap once caught up. Returns the number of documents added.
+        """
+        if not self.enabled:
+            return 0
+        last_event_id = self.db.execute(
+            text(f"SELECT coalesce(max(rowid), 0) FROM {SEARCH_TABLE} WHERE rowid > 0")
+        ).scalar()
+        last_approval_id = -self.db.execute(
+            text(f"SELECT coalesce(min(rowid), 0) FROM {SEARCH_TABLE} WHERE rowid < 0")
+        ).scalar()
+        
+        added = self._backfill(AuditEvent, last_event_id, batch_size, self._index_event_batch)
+        added += self._backfill(ApprovalRequest, last_approval_id, batch_size, self._index_approval_batch)
+        return added
+    
+    def _backfill(self, model, after_id: int, batch_size: int, index_batch) -> int:
+        """Index rows of a model above an ID in committed batches."""
+        added = 0
+        while True:
+            rows = (
+                self.db.query(model)
+                .filter(model.id > after_id)
+                .order_by(model.id.asc())
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                return added
+            after_id = rows[-1].id
+            index_batch(rows)
+            self.db.commit()
+            added += len(rows)
+            self.db.expunge_all()
+    
+    def _index_event_batch(self, events: List[AuditEvent]) -> None:
+        store = VerificationStore(self.db)
+        texts = store.get_many(event.verification_hash for event in events)
+        resolver = EntityResolver(self.db).load(
+            asset_ids=[event.asset_id for event in events],
+            user_ids=[event.actor_user_id for event in events]
+        )
+        approval_ids = {event.approval_id for event in events if event.approval_id}
+        approvals = {
+            approval.id: approval for approval in
+            self.db.query(ApprovalRequest).filter(ApprovalRequest.id.in_(approval_ids)).all()
+        } if approval_ids else {}
+        for event in events:
+            self.index_event(
+                event,
+                store.text_for(event, texts),
+                asset=resolver.asset(event.asset_id),
+                actor=resolver.user(event.actor_user_id),
+                approval=approvals.get(event.approval_id)
+            )
+    
+    def _index_approval_batch(self, approvals: List[ApprovalRequest]) -> None:
+        store = VerificationStore(self.db)
+        texts = store.get_many(approval.verification_hash for approval in approvals)
+        resolver = EntityResolver(self.db).load(
+            asset_ids=[approval.asset_id for approval in approvals],
+            user_ids=[approval.requester_id for approval in approvals]
+        )
+        for approval in approvals:
+            self.index_approval(
+                approval,
+                store.text_for(approval, texts),
+                asset=resolver.asset(approval.asset_id),
+                requester=resolver.user(approval.requester_id)
+            )
+    
+    # ==================== Querying ====================
+    
+    def search(
+        self,
+        query: str,
+        kind: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Tuple[str, int, float, str]]:
+        """
+        Rank documents matching free text, best first.
+        
+        Returns (kind, ref_id, rank, snippet) tuples; lower rank is better.
+        """
+        if not self.enabled:
+            raise ValueError("Full-text search requires SQLite FTS5")
+        if kind not in (None, KIND_EVENT, KIND_APPROVAL):
+            raise ValueError(f"Unknown search kind: {kind}")
+        
+        sql = (
+            f"SELECT kind, ref_id, bm25({SEARCH_TABLE}, {_BM25_WEIGHTS}) AS rank, "
+            f"snippet({SEARCH_TABLE}, -1, '[', ']', '...', 12) AS snippet "
+            f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match"
+        )
+        params = {"match": match_expression(query), "limit": limit, "offset": offset}
+        if kind:
+            sql += " AND kind = :kind"
+            params["kind"] = kind
+        sql += " ORDER BY rank LIMIT :limit OFFSET :offset"
+        
+        return [tuple(row) for row in self.db.execute(text(sql), params).all()]
+    
+    def load(self, hits: Iterable[Tuple[str, int, float, str]]) -> Tuple[Dict[int, AuditEvent], Dict[int, ApprovalRequest]]:
+        """
+        Load the events and approvals behind search hits, one query per kind.
+        Events no longer in the hot table are read from sealed segments.
+        """
+        hits = list(hits)
+        event_ids = [ref_id for kind, ref_id, _, _ in hits if kind == KIND_EVENT]
+        approval_ids = [ref_id for kind, ref_id, _, _ in hits if kind == KIND_APPROVAL]
+        events = {
+            event.id: event for event in
+            self.db.query(AuditEvent).filter(AuditEvent.id.in_(event_ids)).all()
+        } if event_ids else {}
+        sealed_ids = [event_id for event_id in event_ids if event_id not in events]
+        if sealed_ids:
+            from app.services.audit_archive import AuditArchive
+            events.update(AuditArchive(self.db).events_by_id(sealed_ids))
+        approvals = {
+            approval.id: approval for approval in
+            self.db.query(ApprovalRequest).filter(ApprovalRequest.id.in_(approval_ids)).all()
+        } if approval_ids else {}
+        return events, approvals
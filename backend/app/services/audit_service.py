@@ -3,36 +3,76 @@
 This module handles the creation and verification of audit events
 with a hash chain for tamper detection.
 """
+import base64
 import hashlib
 import json
+import logging
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Optional, List
+from typing import Callable, Optional, List, Iterable, Iterator, Tuple, Dict
+from sqlalchemy import and_, or_, func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.models.audit import AuditEvent
-from app.models.asset import Asset
-from app.models.user import User
-from app.models.site import Site
+from app.core.config import settings
+from app.core.principal_cache import Principal
+from app.models.audit import AuditEvent, AuditChainRoot
+from app.services.audit_search import AuditSearchIndex
+from app.services.entity_resolver import EntityResolver
+from app.services.verification_store import VerificationStore
 
+logger = logging.getLogger(__name__)
 
-def compute_event_hash(
-    prev_hash: Optional[str],
-    timestamp: datetime,
-    asset_id: int,
-    actor_user_id: int,
-    action: str,
-    decision: str,
-    site_id: Optional[int],
-    target_user_id: Optional[int],
-    approval_id: Optional[int],
-    verification_summary: Optional[str]
+# Called with the session just before a request commits the unit of work
+# that carries out its action (its audit events, or a custody job it
+# queued), so the request can record its outcome in the same transaction.
+# Only run_idempotent sets it, to complete its Idempotency-Key record
+before_audit_commit: ContextVar[Optional[Callable[[Session], None]]] = ContextVar("before_audit_commit", default=None)
+
+
+def run_before_audit_commit(db: Session) -> None:
+    """Run the request's before_audit_commit callback, at most once."""
+    callback = before_audit_commit.get()
+    if callback is not None:
+        before_audit_commit.set(None)
+        callback(db)
+
+
+HASH_VERSION_JSON = 1
+HASH_VERSION_BINARY = 2
+
+EPOCH = datetime(1970, 1, 1)
+
+# v2 layout: magic, timestamp (microseconds), asset_id, actor_user_id,
+# site_id, target_user_id, approval_id (optional IDs as -1), then the
+# length-prefixed prev_hash, action, decision and verification_summary
+_V2_FIXED = struct.Struct("<4sqqqqqq")
+_V2_LENGTH = struct.Struct("<I")
+_V2_NONE = _V2_LENGTH.pack(0xFFFFFFFF)
+
+
+def to_microseconds(timestamp: datetime) -> int:
+    """Convert a naive UTC timestamp to microseconds since the epoch."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.replace(tzinfo=None)
+    delta = timestamp - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _v2_field(value: Optional[bytes]) -> bytes:
+    """Length-prefix a variable field, keeping None distinct from empty."""
+    if value is None:
+        return _V2_NONE
+    return _V2_LENGTH.pack(len(value)) + value
+
+
+def _hash_v1(
+    prev_hash, timestamp, asset_id, actor_user_id, action, decision,
+    site_id, target_user_id, approval_id, verification_summary
 ) -> str:
-    """
-    Compute SHA256 hash for an audit event.
-    
-    The hash is computed from a canonical JSON representation of the event
-    fields concatenated with the previous event's hash.
-    """
+    """Hash an event over canonical JSON (original format)."""
     # Create canonical representation
     canonical_data = {
         "prev_hash": prev_hash or "",
@@ -54,15 +94,238 @@ def compute_event_hash(
     return hashlib.sha256(canonical_json.encode('utf-8')).hexdigest()
 
 
+def _hash_v2(
+    prev_hash, timestamp, asset_id, actor_user_id, action, decision,
+    site_id, target_user_id, approval_id, verification_summary
+) -> str:
+    """Hash an event over a fixed-order, length-prefixed binary encoding."""
+    return hashlib.sha256(b"".join((
+        _V2_FIXED.pack(
+            b"GCH2",
+            to_microseconds(timestamp),
+            asset_id,
+            actor_user_id,
+            -1 if site_id is None else site_id,
+            -1 if target_user_id is None else target_user_id,
+            -1 if approval_id is None else approval_id
+        ),
+        _v2_field(bytes.fromhex(prev_hash) if prev_hash else None),
+        _v2_field(action.encode('utf-8')),
+        _v2_field(decision.encode('utf-8')),
+        _v2_field(verification_summary.encode('utf-8') if verification_summary is not None else None)
+    ))).hexdigest()
+
+
+_HASHERS = {
+    HASH_VERSION_JSON: _hash_v1,
+    HASH_VERSION_BINARY: _hash_v2,
+}
+
+
+def compute_event_hash(
+    prev_hash: Optional[str],
+    timestamp: datetime,
+    asset_id: int,
+    actor_user_id: int,
+    action: str,
+    decision: str,
+    site_id: Optional[int],
+    target_user_id: Optional[int],
+    approval_id: Optional[int],
+    verification_summary: Optional[str],
+    version: Optional[int] = HASH_VERSION_JSON
+) -> str:
+    """
+    Compute SHA256 hash for an audit event.
+    
+    The hash covers the event fields and the previous event's hash. Version 1
+    hashes canonical JSON; version 2 hashes a binary encoding that is much
+    cheaper to build. Events without a recorded version are version 1.
+    """
+    hasher = _HASHERS.get(version or HASH_VERSION_JSON)
+    if hasher is None:
+        raise ValueError(f"Unknown audit hash version: {version}")
+    return hasher(
+        prev_hash, timestamp, asset_id, actor_user_id, action, decision,
+        site_id, target_user_id, approval_id, verification_summary
+    )
+
+
+GLOBAL_CHAIN = "global"
+
+
+def chain_key_for(asset_id: int, site_id: Optional[int], topology: Optional[str] = None) -> str:
+    """
+    Get the chain shard an event belongs to under the given topology.
+    
+    With the "asset" or "site" topology every shard is an independent hash
+    chain, so appends to different shards never contend for the same head.
+    """
+    topology = topology or settings.AUDIT_CHAIN_TOPOLOGY
+    if topology == "asset":
+        return f"asset:{asset_id}"
+    if topology == "site" and site_id is not None:
+        return f"site:{site_id}"
+    return GLOBAL_CHAIN
+
+
+def compute_root_hash(prev_root_hash: Optional[str], last_event_id: int, heads: Dict[str, str]) -> str:
+    """Compute the hash committing a set of chain heads."""
+    canonical_json = json.dumps(
+        {
+            "prev_root_hash": prev_root_hash or "",
+            "last_event_id": last_event_id,
+            "heads": heads
+        },
+        sort_keys=True,
+        separators=(',', ':')
+    )
+    return hashlib.sha256(canonical_json.encode('utf-8')).hexdigest()
+
+
+# Structured verification outcome columns on AuditEvent usable as filters
+RISK_SIGNAL_COLUMNS = [
+    "number_match",
+    "inside_geofence",
+    "sim_swap",
+    "device_swap",
+    "gateway_error",
+]
+
+
+def extract_risk_signals(verification_summary: Optional[dict]) -> dict:
+    """
+    Extract the structured verification outcomes stored on AuditEvent.
+    
+    Defaults mirror PolicyEngine.evaluate_from_verification so the columns
+    reflect the inputs the decision was actually made on.
+    """
+    if not verification_summary:
+        return {}
+    
+    number_verification = verification_summary.get("number_verification") or {}
+    location_verification = verification_summary.get("location_verification") or {}
+    risk_signals = verification_summary.get("risk_signals") or {}
+    match_rate = location_verification.get("match_rate")
+    
+    return {
+        "number_match": bool(number_verification.get("match", True)),
+        "inside_geofence": bool(location_verification.get("inside_geofence", True)),
+        "sim_swap": bool(risk_signals.get("sim_swap_recent", False)),
+        "device_swap": bool(risk_signals.get("device_swap_recent", False)),
+        "match_rate": int(match_rate) if isinstance(match_rate, (int, float)) else None,
+        "gateway_error": bool(verification_summary.get("gateway_error")),
+    }
+
+
+# Columns written by the streaming export, in output order
+EXPORT_FIELDS = [
+    "id",
+    "timestamp",
+    "asset_id",
+    "actor_user_id",
+    "action",
+    "decision",
+    "site_id",
+    "target_user_id",
+    "approval_id",
+    "number_match",
+    "inside_geofence",
+    "sim_swap",
+    "device_swap",
+    "match_rate",
+    "gateway_error",
+    "verification_summary",
+    "chain_key",
+    "prev_hash",
+    "hash",
+    "hash_version",
+]
+
+
+def encode_cursor(event: AuditEvent) -> str:
+    """Encode the keyset position of an event as an opaque cursor."""
+    raw = f"{event.timestamp.isoformat()}|{event.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor into (timestamp, id)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        timestamp, event_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(event_id)
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+
+def event_to_export_row(event: AuditEvent, verification_summary: Optional[str] = None) -> dict:
+    """Flatten an audit event into a row for NDJSON/CSV export."""
+    row = {field: getattr(event, field) for field in EXPORT_FIELDS}
+    row["timestamp"] = event.timestamp.isoformat()
+    row["verification_summary"] = verification_summary
+    return row
+
+
+def chain_result(
+    valid: bool,
+    total_events: int,
+    verified_events: int,
+    first_broken_id: Optional[int],
+    message: str,
+    shards: int = 1,
+    anchors: int = 0
+) -> dict:
+    """Build a chain verification result."""
+    return {
+        "valid": valid,
+        "total_events": total_events,
+        "verified_events": verified_events,
+        "first_broken_id": first_broken_id,
+        "message": message,
+        "shards": shards,
+        "anchors": anchors
+    }
+
+
 class AuditService:
     """Service for managing audit events with hash chain integrity."""
     
     def __init__(self, db: Session):
         self.db = db
+        self.verification_store = VerificationStore(db)
+        self.search_index = AuditSearchIndex(db)
+        # Events flushed but not yet committed, with their summary text
+        self._pending_events: List[Tuple[AuditEvent, Optional[str]]] = []
+        # Head hash of each chain written to in the current unit of work
+        self._pending_heads: Dict[str, str] = {}
+        self._archive = None
+        self._anchors = None
+    
+    @property
+    def archive(self):
+        """Cold segment storage for sealed months of the trail."""
+        if self._archive is None:
+            from app.services.audit_archive import AuditArchive
+            self._archive = AuditArchive(self.db)
+        return self._archive
+    
+    @property
+    def anchors(self):
+        """Signed anchors over the chain heads."""
+        if self._anchors is None:
+            from app.services.audit_anchor import AuditAnchors
+            self._anchors = AuditAnchors(self.db)
+        return self._anchors
     
-    def get_last_event(self) -> Optional[AuditEvent]:
-        """Get the most recent audit event."""
-        return self.db.query(AuditEvent).order_by(AuditEvent.id.desc()).first()
+    def get_last_event(self, chain_key: str = GLOBAL_CHAIN) -> Optional[AuditEvent]:
+        """Get the most recent audit event of a chain."""
+        return (
+            self.db.query(AuditEvent)
+            .filter(AuditEvent.chain_key == chain_key)
+            .order_by(AuditEvent.id.desc())
+            .first()
+        )
     
     def create_event(
         self,
@@ -73,23 +336,38 @@ class AuditService:
         site_id: Optional[int] = None,
         target_user_id: Optional[int] = None,
         approval_id: Optional[int] = None,
-        verification_summary: Optional[dict] = None
+        verification_summary: Optional[dict] = None,
+        actor: Optional[Principal] = None,
+        commit: bool = True
     ) -> AuditEvent:
         """
         Create a new audit event with hash chain linkage.
         
-        The event is appended to the chain with a hash that includes
-        the previous event's hash for tamper detection.
+        The event is appended to its chain shard with a hash that includes
+        the previous event's hash in that shard for tamper detection.
+        
+        With commit=False the event is only flushed, so it joins the caller's
+        unit of work; the caller finishes it with commit(). Callers that
+        already hold the actor pass it so indexing does not load it again.
         """
-        # Get previous hash
-        last_event = self.get_last_event()
-        prev_hash = last_event.hash if last_event else None
+        # Get previous hash within the event's chain; events already
+        # appended in this unit of work are the head without a query
+        chain_key = chain_key_for(asset_id, site_id)
+        prev_hash = self._pending_heads.get(chain_key)
+        if prev_hash is None:
+            last_event = self.get_last_event(chain_key)
+            if last_event:
+                prev_hash = last_event.hash
+            else:
+                # The shard may continue from a sealed segment
+                prev_hash = self.archive.sealed_heads().get(chain_key)
         
         # Current timestamp
         timestamp = datetime.utcnow()
         
-        # Serialize verification summary
-        verification_json = json.dumps(verification_summary) if verification_summary else None
+        # Store verification summary once, by content hash; the chain
+        # covers the same canonical text that the blob holds
+        verification_hash, verification_json = self.verification_store.put(verification_summary)
         
         # Compute hash
         event_hash = compute_event_hash(
@@ -102,7 +380,8 @@ class AuditService:
             site_id=site_id,
             target_user_id=target_user_id,
             approval_id=approval_id,
-            verification_summary=verification_json
+            verification_summary=verification_json,
+            version=settings.AUDIT_HASH_VERSION
         )
         
         # Create event
@@ -115,32 +394,326 @@ class AuditService:
             site_id=site_id,
             target_user_id=target_user_id,
             approval_id=approval_id,
-            verification_summary=verification_json,
+            verification_hash=verification_hash,
+            chain_key=chain_key,
             prev_hash=prev_hash,
-            hash=event_hash
+            hash=event_hash,
+            hash_version=settings.AUDIT_HASH_VERSION,
+            **extract_risk_signals(verification_summary)
         )
         
         self.db.add(event)
-        self.db.commit()
-        self.db.refresh(event)
+        self.db.flush()
+        # Index in the same transaction as the event
+        self.search_index.index_event(event, verification_summary, actor=actor)
+        self._pending_events.append((event, verification_json))
+        self._pending_heads[chain_key] = event_hash
         
+        if commit:
+            self.commit()
         return event
     
-    def get_events(
+    def commit(self) -> None:
+        """
+        Commit the unit of work, then run post-commit audit maintenance.
+        
+        Everything the caller changed (asset state, approval requests), the
+        events created with commit=False and the request's Idempotency-Key
+        record land in one transaction. The journal, roots and anchors only
+        ever see committed events.
+        """
+        pending, self._pending_events = self._pending_events, []
+        self._pending_heads = {}
+        run_before_audit_commit(self.db)
+        
+        # Objects written in this transaction already hold their committed
+        # state, so skip expiring them rather than reloading each one
+        expire_on_commit = self.db.expire_on_commit
+        self.db.expire_on_commit = False
+        try:
+            self.db.commit()
+        finally:
+            self.db.expire_on_commit = expire_on_commit
+        
+        if pending:
+            self._append_to_journal(pending)
+        # Roots and anchors are checked once per unit of work, covering its
+        # last event, so a bulk write produces at most one of each
+        sharded = [event.id for event, _ in pending if event.chain_key != GLOBAL_CHAIN]
+        if sharded:
+            self.maybe_commit_root(max(sharded))
+        if pending:
+            self.anchors.maybe_commit(max(event.id for event, _ in pending))
+    
+    def _append_to_journal(self, events: List[Tuple[AuditEvent, Optional[str]]]) -> None:
+        """Mirror committed events to the binary journal, if enabled."""
+        from app.services.audit_journal import get_journal
+        
+        journal = get_journal()
+        if journal is None:
+            return
+        try:
+            journal.append_committed(self.db, events)
+        except OSError:
+            # The database is the source of truth; reconcile --repair
+            # appends anything the journal missed
+            logger.exception(f"Failed to append audit events up to {max(event.id for event, _ in events)} to the journal")
+    
+    def get_last_root(self) -> Optional[AuditChainRoot]:
+        """Get the most recent global root."""
+        return self.db.query(AuditChainRoot).order_by(AuditChainRoot.id.desc()).first()
+    
+    def get_chain_heads(self, upto_event_id: int) -> Dict[str, str]:
+        """
+        Get the head hash of every chain shard as of an event ID.
+        
+        Shards without hot events up to that ID keep their sealed head.
+        Only meaningful for IDs at or above the hot/cold boundary.
+        """
+        latest = (
+            self.db.query(
+                AuditEvent.chain_key,
+                func.max(AuditEvent.id).label("head_id")
+            )
+            .filter(AuditEvent.id <= upto_event_id)
+            .group_by(AuditEvent.chain_key)
+            .subquery()
+        )
+        rows = (
+            self.db.query(AuditEvent.chain_key, AuditEvent.hash)
+            .join(latest, AuditEvent.id == latest.c.head_id)
+            .all()
+        )
+        heads = self.archive.sealed_heads()
+        heads.update({chain_key: head_hash for chain_key, head_hash in rows})
+        return heads
+    
+    def iter_chain_heads(self, event_ids: Iterable[int]) -> Iterator[Tuple[int, Dict[str, str]]]:
+        """
+        Get the shard heads as of each of several event IDs, in one ordered
+        pass over the hot events.
+        
+        Yields (event ID, heads) in ascending ID order. The heads dict is
+        updated in place as the pass continues, so compare it before
+        advancing. Like get_chain_heads, only meaningful for IDs at or above
+        the hot/cold boundary.
+        """
+        targets = sorted(set(event_ids))
+        if not targets:
+            return
+        heads = self.archive.sealed_heads()
+        rows = (
+            self.db.query(AuditEvent.id, AuditEvent.chain_key, AuditEvent.hash)
+            .filter(AuditEvent.id <= targets[-1])
+            .order_by(AuditEvent.id.asc())
+            .yield_per(10000)
+        )
+        index = 0
+        for event_id, chain_key, event_hash in rows:
+            while index < len(targets) and targets[index] < event_id:
+                yield targets[index], heads
+                index += 1
+            heads[chain_key] = event_hash
+        for target in targets[index:]:
+            yield target, heads
+    
+    def commit_root(self, upto_event_id: Optional[int] = None) -> Optional[AuditChainRoot]:
+        """
+        Commit the heads of all chain shards into a new global root.
+        
+        Returns None when there is nothing new to commit. Each root names
+        its predecessor in the unique prev_root_id, so when two workers
+        race, one insert fails and that worker rechecks against the winner.
+        """
+        if upto_event_id is None:
+            upto_event_id = self.db.query(func.max(AuditEvent.id)).scalar()
+        for _ in range(3):
+            last_root = self.get_last_root()
+            if upto_event_id is None or (last_root and last_root.last_event_id >= upto_event_id):
+                return None
+            
+            heads = self.get_chain_heads(upto_event_id)
+            prev_root_hash = last_root.root_hash if last_root else None
+            root = AuditChainRoot(
+                last_event_id=upto_event_id,
+                heads=json.dumps(heads, sort_keys=True),
+                prev_root_id=last_root.id if last_root else 0,
+                prev_root_hash=prev_root_hash,
+                root_hash=compute_root_hash(prev_root_hash, upto_event_id, heads)
+            )
+            self.db.add(root)
+            try:
+                self.db.commit()
+                return root
+            except IntegrityError:
+                self.db.rollback()
+        logger.warning(f"Gave up committing a root for event {upto_event_id} after repeated conflicts")
+        return None
+    
+    def maybe_commit_root(self, event_id: int) -> Optional[AuditChainRoot]:
+        """Commit a root once AUDIT_ROOT_INTERVAL_EVENTS have been appended."""
+        interval = settings.AUDIT_ROOT_INTERVAL_EVENTS
+        if not interval:
+            return None
+        last_root = self.get_last_root()
+        covered = last_root.last_event_id if last_root else 0
+        if event_id - covered < interval:
+            return None
+        return self.commit_root(event_id)
+    
+    def filtered_query(
         self,
         asset_id: Optional[int] = None,
         user_id: Optional[int] = None,
-        limit: int = 100
-    ) -> List[AuditEvent]:
-        """Get audit events with optional filters."""
+        action: Optional[str] = None,
+        decision: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        site_id: Optional[int] = None,
+        signals: Optional[dict] = None
+    ):
+        """
+        Build an audit event query with optional filters applied.
+        
+        signals maps RISK_SIGNAL_COLUMNS names to the required boolean value,
+        e.g. {"sim_swap": True}.
+        """
         query = self.db.query(AuditEvent)
         
         if asset_id:
             query = query.filter(AuditEvent.asset_id == asset_id)
         if user_id:
             query = query.filter(AuditEvent.actor_user_id == user_id)
+        if action:
+            query = query.filter(AuditEvent.action == action)
+        if decision:
+            query = query.filter(AuditEvent.decision == decision)
+        if since:
+            query = query.filter(AuditEvent.timestamp >= since)
+        if until:
+            query = query.filter(AuditEvent.timestamp < until)
+        if site_id:
+            query = query.filter(AuditEvent.site_id == site_id)
+        for column, value in (signals or {}).items():
+            if column not in RISK_SIGNAL_COLUMNS:
+                raise ValueError(f"Unknown risk signal: {column}")
+            if value is not None:
+                query = query.filter(getattr(AuditEvent, column) == value)
+        
+        return query
+    
+    def get_events(
+        self,
+        asset_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        limit: int = 100,
+        action: Optional[str] = None,
+        decision: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        site_id: Optional[int] = None,
+        signals: Optional[dict] = None
+    ) -> List[AuditEvent]:
+        """
+        Get a page of audit events, newest first.
+        
+        Pagination is keyset-based on (timestamp, id): pass the cursor of the
+        last event of the previous page to continue after it. Unlike OFFSET,
+        the cost of fetching a page does not grow with its depth.
+        """
+        query = self.filtered_query(asset_id, user_id, action, decision, since, until, site_id, signals)
+        
+        position = None
+        if cursor:
+            cursor_timestamp, cursor_id = decode_cursor(cursor)
+            position = (cursor_timestamp, cursor_id)
+            query = query.filter(
+                or_(
+                    AuditEvent.timestamp < cursor_timestamp,
+                    and_(
+                        AuditEvent.timestamp == cursor_timestamp,
+                        AuditEvent.id < cursor_id
+                    )
+                )
+            )
+        
+        events = query.order_by(
+            AuditEvent.timestamp.desc(),
+            AuditEvent.id.desc()
+        ).limit(limit).all()
+        
+        # Continue into sealed segments only when the page runs past the
+        # hot table and the requested range reaches that far back
+        if len(events) < limit and self.archive.needed_for(since):
+            if events:
+                position = (events[-1].timestamp, events[-1].id)
+            events += self.archive.latest_matching(
+                limit - len(events),
+                before=position,
+                asset_id=asset_id,
+                user_id=user_id,
+                action=action,
+                decision=decision,
+                since=since,
+                until=until,
+                site_id=site_id,
+                signals=signals
+            )
+        
+        return events
+    
+    def iter_events(
+        self,
+        asset_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        action: Optional[str] = None,
+        decision: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        site_id: Optional[int] = None,
+        signals: Optional[dict] = None,
+        batch_size: int = 1000
+    ) -> Iterator[AuditEvent]:
+        """
+        Stream all matching audit events in chain order.
         
-        return query.order_by(AuditEvent.timestamp.desc()).limit(limit).all()
+        Rows are fetched from the database cursor in batches of batch_size
+        and expunged once yielded, so memory stays constant regardless of
+        how many events match.
+        """
+        query = self.filtered_query(asset_id, user_id, action, decision, since, until, site_id, signals)
+        query = query.order_by(AuditEvent.id.asc()).execution_options(stream_results=True)
+        
+        for event in query.yield_per(batch_size):
+            yield event
+            self.db.expunge(event)
+    
+    def iter_export_rows(self, batch_size: int = 1000, **filters) -> Iterator[dict]:
+        """
+        Stream matching audit events as flat export rows.
+        
+        Sealed segments are streamed first when the time range reaches them.
+        Verification summaries are resolved once per batch of events, so the
+        export still issues a bounded number of queries per batch.
+        """
+        if self.archive.needed_for(filters.get("since")):
+            yield from self.archive.iter_matching(**filters)
+        
+        batch = []
+        for event in self.iter_events(batch_size=batch_size, **filters):
+            batch.append(event)
+            if len(batch) >= batch_size:
+                yield from self.export_rows(batch)
+                batch = []
+        if batch:
+            yield from self.export_rows(batch)
+    
+    def export_rows(self, events: List[AuditEvent]) -> Iterator[dict]:
+        """Convert a batch of events to export rows."""
+        summaries = self.verification_store.get_many(event.verification_hash for event in events)
+        for event in events:
+            yield event_to_export_row(event, self.verification_store.text_for(event, summaries))
     
     def get_events_with_details(
         self,
@@ -150,14 +723,19 @@ class AuditService:
     ) -> List[dict]:
         """Get audit events with related entity names."""
         events = self.get_events(asset_id, user_id, limit)
+        resolver = EntityResolver(self.db).load(
+            asset_ids=[event.asset_id for event in events],
+            user_ids=[event.actor_user_id for event in events] + [event.target_user_id for event in events],
+            site_ids=[event.site_id for event in events]
+        )
+        summaries = self.verification_store.get_many(event.verification_hash for event in events)
         result = []
         
         for event in events:
-            # Get related entities
-            asset = self.db.query(Asset).filter(Asset.id == event.asset_id).first()
-            actor = self.db.query(User).filter(User.id == event.actor_user_id).first()
-            site = self.db.query(Site).filter(Site.id == event.site_id).first() if event.site_id else None
-            target_user = self.db.query(User).filter(User.id == event.target_user_id).first() if event.target_user_id else None
+            asset = resolver.asset(event.asset_id)
+            actor = resolver.user(event.actor_user_id)
+            site = resolver.site(event.site_id)
+            target_user = resolver.user(event.target_user_id)
             
             result.append({
                 "id": event.id,
@@ -166,50 +744,166 @@ class AuditService:
                 "asset_name": asset.name if asset else None,
                 "asset_tag_id": asset.tag_id if asset else None,
                 "actor_user_id": event.actor_user_id,
-                "actor_name": actor.name if actor else None,
+                "actor_name": actor.full_name if actor else None,
                 "action": event.action,
                 "decision": event.decision,
                 "site_id": event.site_id,
                 "site_name": site.name if site else None,
                 "target_user_id": event.target_user_id,
-                "target_user_name": target_user.name if target_user else None,
+                "target_user_name": target_user.full_name if target_user else None,
                 "approval_id": event.approval_id,
-                "verification_summary": event.verification_summary,
+                "verification_summary": self.verification_store.text_for(event, summaries),
                 "hash": event.hash
             })
         
         return result
     
-    def verify_chain(self) -> dict:
+    def assign_legacy_chain_keys(self) -> int:
+        """Place events written before chain sharding on the global chain."""
+        updated = (
+            self.db.query(AuditEvent)
+            .filter(AuditEvent.chain_key.is_(None))
+            .update({AuditEvent.chain_key: GLOBAL_CHAIN}, synchronize_session=False)
+        )
+        self.db.commit()
+        return updated
+    
+    def backfill_risk_signals(self, batch_size: int = 1000) -> int:
+        """
+        Populate the structured signal columns of events written before
+        they existed.
+        
+        Walks the table by primary key in batches, resolving summaries once
+        per batch and committing as it goes, so memory stays bounded and the
+        migration can be interrupted and resumed. Returns rows updated.
+        """
+        updated = 0
+        last_id = 0
+        while True:
+            events = (
+                self.db.query(AuditEvent)
+                .filter(
+                    AuditEvent.id > last_id,
+                    AuditEvent.number_match.is_(None),
+                    (AuditEvent.verification_hash.isnot(None)) |
+                    (AuditEvent.verification_summary.isnot(None))
+                )
+                .order_by(AuditEvent.id.asc())
+                .limit(batch_size)
+                .all()
+            )
+            if not events:
+                return updated
+            
+            summaries = self.verification_store.get_many(event.verification_hash for event in events)
+            for event in events:
+                text = self.verification_store.text_for(event, summaries)
+                try:
+                    summary = json.loads(text) if text else None
+                except ValueError:
+                    summary = None
+                for column, value in extract_risk_signals(summary).items():
+                    setattr(event, column, value)
+            
+            last_id = events[-1].id
+            updated += len(events)
+            self.db.commit()
+            self.db.expunge_all()
+    
+    def verify_chain(self, chain_key: Optional[str] = None) -> dict:
         """
-        Verify the integrity of the entire audit chain.
+        Verify the integrity of the audit chain.
+        
+        With a chain_key only that shard is verified, in O(events in the
+        shard). Otherwise every shard is verified in parallel and the global
+        roots are checked against the shard heads.
         
         Returns a result indicating whether the chain is valid and,
         if not, the ID of the first broken link.
         """
-        events = self.db.query(AuditEvent).order_by(AuditEvent.id.asc()).all()
+        if chain_key is not None:
+            start_hash = self.archive.sealed_heads().get(chain_key)
+            return self._verify_shard(self.db, chain_key, start_hash)
+        
+        # Sealed segments first; hot shards continue from their end heads
+        archive_result, sealed_heads = self.archive.verify()
+        if not archive_result["valid"]:
+            return archive_result
+        
+        chain_keys = set(sealed_heads) | {
+            row[0] for row in self.db.query(AuditEvent.chain_key).distinct().all()
+        }
+        if not chain_keys:
+            return chain_result(True, 0, 0, None, "No events in audit trail.")
+        
+        bind = self.db.get_bind()
+        
+        def verify(key: str) -> dict:
+            # Each worker needs its own session
+            db = Session(bind=bind)
+            try:
+                return self._verify_shard(db, key, sealed_heads.get(key))
+            finally:
+                db.close()
+        
+        workers = max(1, min(settings.AUDIT_VERIFY_WORKERS, len(chain_keys)))
+        if workers == 1:
+            results = [self._verify_shard(self.db, key, sealed_heads.get(key)) for key in chain_keys]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(verify, chain_keys))
+        
+        total = archive_result["total_events"] + sum(result["total_events"] for result in results)
+        verified = archive_result["verified_events"] + sum(result["verified_events"] for result in results)
+        broken = [result for result in results if not result["valid"]]
+        if broken:
+            first = min(broken, key=lambda result: result["first_broken_id"])
+            return chain_result(
+                False, total, verified, first["first_broken_id"], first["message"], len(chain_keys)
+            )
+        
+        roots_result = self._verify_roots()
+        if roots_result is not None:
+            return chain_result(False, total, verified, None, roots_result, len(chain_keys))
+        
+        anchors_result, anchor_count = self.anchors.verify()
+        if anchors_result is not None:
+            return chain_result(False, total, verified, None, anchors_result, len(chain_keys), anchor_count)
+        
+        return chain_result(
+            True, total, verified, None,
+            "Audit chain integrity verified. All events are valid.",
+            len(chain_keys),
+            anchor_count
+        )
+    
+    def _verify_shard(self, db: Session, chain_key: str, start_hash: Optional[str] = None) -> dict:
+        """
+        Verify the links and hashes of the hot part of a chain shard.
+        
+        start_hash is the shard head at the hot/cold boundary, if any.
+        """
+        events = (
+            db.query(AuditEvent)
+            .filter(AuditEvent.chain_key == chain_key)
+            .order_by(AuditEvent.id.asc())
+            .all()
+        )
         
         if not events:
-            return {
-                "valid": True,
-                "total_events": 0,
-                "verified_events": 0,
-                "first_broken_id": None,
-                "message": "No events in audit trail."
-            }
+            return chain_result(True, 0, 0, None, f"No events in chain {chain_key}.")
         
-        prev_hash = None
+        store = VerificationStore(db)
+        summaries = store.get_many(event.verification_hash for event in events)
+        prev_hash = start_hash
         
         for i, event in enumerate(events):
             # Verify prev_hash matches
             if event.prev_hash != prev_hash:
-                return {
-                    "valid": False,
-                    "total_events": len(events),
-                    "verified_events": i,
-                    "first_broken_id": event.id,
-                    "message": f"Chain broken at event {event.id}: prev_hash mismatch."
-                }
+                return chain_result(
+                    False, len(events), i, event.id,
+                    f"Chain broken at event {event.id}: prev_hash mismatch."
+                )
             
             # Recompute hash and verify
             expected_hash = compute_event_hash(
@@ -222,24 +916,51 @@ class AuditService:
                 site_id=event.site_id,
                 target_user_id=event.target_user_id,
                 approval_id=event.approval_id,
-                verification_summary=event.verification_summary
+                verification_summary=store.text_for(event, summaries),
+                version=event.hash_version
             )
             
             if event.hash != expected_hash:
-                return {
-                    "valid": False,
-                    "total_events": len(events),
-                    "verified_events": i,
-                    "first_broken_id": event.id,
-                    "message": f"Chain broken at event {event.id}: hash mismatch (data may have been tampered)."
-                }
+                return chain_result(
+                    False, len(events), i, event.id,
+                    f"Chain broken at event {event.id}: hash mismatch (data may have been tampered)."
+                )
             
             prev_hash = event.hash
         
-        return {
-            "valid": True,
-            "total_events": len(events),
-            "verified_events": len(events),
-            "first_broken_id": None,
-            "message": "Audit chain integrity verified. All events are valid."
-        }
+        return chain_result(
+            True, len(events), len(events), None,
+            f"Chain {chain_key} verified. All events are valid."
+        )
+    
+    def _verify_roots(self) -> Optional[str]:
+        """
+        Check the global roots against the current shard heads.
+        
+        Returns an error message for the first invalid root, or None.
+        """
+        sealed_upto = self.archive.sealed_upto()
+        roots = self.db.query(AuditChainRoot).order_by(AuditChainRoot.id.asc()).all()
+        # Heads of sealed roots are covered by the segment boundary hashes
+        hot_roots = [root for root in roots if root.last_event_id >= sealed_upto]
+        stale = set()
+        by_event_id: Dict[int, List[AuditChainRoot]] = {}
+        for root in hot_roots:
+            by_event_id.setdefault(root.last_event_id, []).append(root)
+        for event_id, heads in self.iter_chain_heads(by_event_id):
+            stale.update(root.id for root in by_event_id[event_id] if json.loads(root.heads) != heads)
+        
+        prev_root_hash = None
+        for root in roots:
+            if root.prev_root_hash != prev_root_hash:
+                return f"Root {root.id} does not link to the previous root."
+            
+            heads = json.loads(root.heads)
+            if root.root_hash != compute_root_hash(root.prev_root_hash, root.last_event_id, heads):
+                return f"Root {root.id} hash mismatch."
+            if root.id in stale:
+                return f"Root {root.id} no longer matches the chain heads (events may have been altered or removed)."
+            
+            prev_root_hash = root.root_hash
+        return None
+
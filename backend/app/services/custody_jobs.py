@@ -0,0 +1,139 @@
+"""Background execution of custody actions.
+
+Real CIBA authorization can keep a verification waiting for seconds. A
+custody request sent with ``Prefer: respond-async`` is recorded as a
+CustodyJob and answered with 202 straight away; the action then runs in a
+background task on the worker's event loop, with its own database session,
+so the request's connection and worker slot are released while the gateway
+waits. The outcome is stored on the job row, from where clients poll it or
+receive it over server-sent events.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.principal_cache import Principal
+from app.models.custody_job import CustodyJob, CustodyJobStatus
+from app.services.audit_service import run_before_audit_commit
+from app.services.custody_service import CustodyService
+from app.services.telefonica_gateway import ciba_poll_listener
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = (CustodyJobStatus.SUCCEEDED.value, CustodyJobStatus.FAILED.value)
+
+# Runs a custody action for the job's user in the job's own session
+JobAction = Callable[[CustodyService, Principal], Awaitable[Any]]
+
+
+def job_is_stale(job: CustodyJob) -> bool:
+    """Unfinished past its timeout: the worker running it went away."""
+    if job.status in FINAL_STATUSES:
+        return False
+    # Allow the timeout itself plus time to record the failure
+    limit = timedelta(seconds=settings.CUSTODY_JOB_TIMEOUT_SECONDS + 30)
+    return datetime.utcnow() - job.created_at.replace(tzinfo=None) > limit
+
+
+class CustodyJobRunner:
+    """Run custody jobs as bounded background tasks of this process."""
+    
+    def __init__(self):
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Set when a job running in this process finishes
+        self._finished: Dict[str, asyncio.Event] = {}
+        # Keep references so running tasks aren't garbage collected
+        self._tasks: Dict[str, asyncio.Task] = {}
+    
+    def submit(self, db: Session, user: Principal, action: str, run: JobAction) -> CustodyJob:
+        """Record a job and start running it in the background."""
+        now = datetime.utcnow()
+        db.query(CustodyJob).filter(
+            CustodyJob.created_at <= now - timedelta(seconds=settings.CUSTODY_JOB_TTL_SECONDS)
+        ).delete(synchronize_session=False)
+        job = CustodyJob(
+            id=uuid.uuid4().hex,
+            user_id=user.id,
+            action=action,
+            status=CustodyJobStatus.PENDING.value,
+            created_at=now,
+            poll_interval=settings.CUSTODY_JOB_POLL_SECONDS
+        )
+        db.add(job)
+        run_before_audit_commit(db)
+        db.commit()
+        
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.CUSTODY_JOB_CONCURRENCY)
+        self._finished[job.id] = asyncio.Event()
+        task = asyncio.get_running_loop().create_task(self._execute(job.id, user, run))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _, job_id=job.id: self._tasks.pop(job_id, None))
+        return job
+    
+    async def wait(self, job_id: str, timeout: float) -> None:
+        """
+        Wait up to timeout for a job to finish. Jobs running elsewhere can't
+        be observed from here, so the full timeout is slept.
+        """
+        finished = self._finished.get(job_id)
+        if finished is None:
+            await asyncio.sleep(timeout)
+            return
+        try:
+            await asyncio.wait_for(finished.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def _execute(self, job_id: str, user: Principal, run: JobAction) -> None:
+        async with self._semaphore:
+            db = SessionLocal()
+            token = ciba_poll_listener.set(lambda interval: self._update(job_id, poll_interval=interval))
+            try:
+                self._update(job_id, status=CustodyJobStatus.RUNNING.value, started_at=datetime.utcnow())
+                result = await asyncio.wait_for(
+                    run(CustodyService(db), user),
+                    settings.CUSTODY_JOB_TIMEOUT_SECONDS
+                )
+                self._update(
+                    job_id,
+                    status=CustodyJobStatus.SUCCEEDED.value,
+                    result=json.dumps(jsonable_encoder(result))
+                )
+            except ValueError as e:
+                db.rollback()
+                self._update(job_id, status=CustodyJobStatus.FAILED.value, error=str(e))
+            except asyncio.TimeoutError:
+                db.rollback()
+                logger.error(f"Custody job {job_id} timed out")
+                self._update(job_id, status=CustodyJobStatus.FAILED.value, error="Verification timed out")
+            except Exception as e:
+                db.rollback()
+                logger.exception(f"Custody job {job_id} failed: {str(e)}")
+                self._update(job_id, status=CustodyJobStatus.FAILED.value, error="Internal error")
+            finally:
+                ciba_poll_listener.reset(token)
+                db.close()
+                self._finished.pop(job_id).set()
+    
+    @staticmethod
+    def _update(job_id: str, **values) -> None:
+        """Write job progress in a short transaction of its own."""
+        if values.get("status") in FINAL_STATUSES:
+            values["finished_at"] = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            db.query(CustodyJob).filter(CustodyJob.id == job_id).update(values, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+custody_jobs = CustodyJobRunner()
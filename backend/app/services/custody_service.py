@@ -2,23 +2,42 @@
 import json
 import asyncio
 import logging
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from datetime import datetime
+from sqlalchemy import or_, select
 from sqlalchemy.orm import Session
 
 from app.models.asset import Asset, AssetStatus
 from app.models.site import Site
 from app.models.user import User
+from app.core.principal_cache import Principal
 from app.models.approval import ApprovalRequest, ApprovalStatus
-from app.schemas.custody import MockNetworkContext, VerificationResult, CustodyActionResponse
+from app.schemas.custody import (
+    MockNetworkContext,
+    VerificationResult,
+    CustodyActionResponse,
+    BulkAssetResult,
+    BulkCustodyResponse
+)
 from app.services.telefonica_gateway import TelefonicaGateway, GatewayMode, TelefonicaGatewayError
-from app.services.policy_engine import policy_engine, PolicyDecision
+from app.services.policy_engine import policy_engine, PolicyDecision, PolicyResult
+from app.services.policy_store import PolicyRuleStore
 from app.services.audit_service import AuditService
+from app.services.single_flight import SingleFlight
+from app.services.site_cache import SiteGeofence, site_geofence_cache
+from app.services.verification_lease import lease_key, lease_ttl, leased_summary, verification_leases
+from app.services.speculative_verification import speculation_key, speculated_summary, speculative_verifications
 from app.core.config import settings
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Verifications in flight in this process, shared by identical concurrent requests
+verification_flights = SingleFlight()
+
+# Actions the bulk endpoints support, with the label used in result messages
+BULK_ACTIONS = {"CHECK_OUT": "Checkout", "CHECK_IN": "Return", "TRANSFER": "Transfer"}
+
 
 class CustodyService:
     """Service for handling custody transactions."""
@@ -26,6 +45,8 @@ class CustodyService:
     def __init__(self, db: Session):
         self.db = db
         self.audit_service = AuditService(db)
+        # Pick up rule sets saved by other processes
+        PolicyRuleStore(db).sync()
     
     def _get_asset(self, asset_id: int) -> Asset:
         """Get asset by ID or raise error."""
@@ -34,24 +55,122 @@ class CustodyService:
             raise ValueError(f"Asset with ID {asset_id} not found")
         return asset
     
-    def _get_site(self, site_id: int) -> Site:
-        """Get site by ID or raise error."""
-        site = self.db.query(Site).filter(Site.id == site_id).first()
-        if not site:
-            raise ValueError(f"Site with ID {site_id} not found")
-        return site
+    def _load_context(
+        self,
+        asset_id: int,
+        site_id: int,
+        target_user_id: Optional[int] = None
+    ) -> Tuple[Asset, SiteGeofence, Optional[User]]:
+        """
+        Load the asset, site and target user of a custody action in one query.
+        
+        The site comes from the geofence cache when possible, in which case
+        it is left out of the query. Missing entities raise ValueError,
+        checked in asset, site, target user order.
+        """
+        site = site_geofence_cache.get(site_id)
+        
+        entities = [Asset]
+        if site is None:
+            entities.append(Site)
+        if target_user_id is not None:
+            entities.append(User)
+        
+        statement = select(*entities).select_from(Asset)
+        if site is None:
+            statement = statement.outerjoin(Site, Site.id == site_id)
+        if target_user_id is not None:
+            statement = statement.outerjoin(User, User.id == target_user_id)
+        row = self.db.execute(statement.where(Asset.id == asset_id)).first()
+        
+        if row is None:
+            raise ValueError(f"Asset with ID {asset_id} not found")
+        asset, *rest = row
+        if site is None:
+            loaded_site, *rest = rest
+            if loaded_site is None:
+                raise ValueError(f"Site with ID {site_id} not found")
+            site = site_geofence_cache.put(loaded_site)
+        target_user = rest[0] if rest else None
+        if target_user_id is not None and target_user is None:
+            raise ValueError(f"User with ID {target_user_id} not found")
+        return asset, site, target_user
     
-    def _get_user(self, user_id: int) -> User:
-        """Get user by ID or raise error."""
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise ValueError(f"User with ID {user_id} not found")
-        return user
+    async def _verify(
+        self,
+        user: Principal,
+        site: SiteGeofence,
+        sensitivity: str,
+        mock_context: Optional[MockNetworkContext],
+        device_id: Optional[str]
+    ) -> dict:
+        """
+        Verify the user at the site, reusing a speculative verification or
+        a valid verification lease.
+        
+        A verification started by the user's last tag scan at the site is
+        used once while fresh. Leases are only used when the client
+        identifies its device. Both are only used within the reuse window of
+        the given asset sensitivity.
+        """
+        mock_data = mock_context.model_dump() if mock_context else None
+        speculation = await speculative_verifications.take(
+            speculation_key(user.id, user.phone_number, site, mock_data),
+            lease_ttl(sensitivity)
+        )
+        if speculation is not None:
+            summary, started_at = speculation
+            logger.info(f"Using speculative verification for user {user.id} at site {site.id}")
+            return speculated_summary(summary, started_at)
+        
+        if not device_id:
+            return await self._perform_verification(user, site, mock_context)
+        
+        key = lease_key(
+            user.id,
+            user.phone_number,
+            site,
+            device_id,
+            mock_data
+        )
+        lease = verification_leases.get(key, sensitivity)
+        if lease is not None:
+            summary, verified_at = lease
+            logger.info(f"Reusing verification lease for user {user.id} at site {site.id}")
+            return leased_summary(summary, verified_at)
+        
+        verified_at = datetime.utcnow()
+        summary = await self._perform_verification(user, site, mock_context)
+        verification_leases.put(key, summary, verified_at)
+        return summary
     
     async def _perform_verification(
         self,
-        user: User,
-        site: Site,
+        user: Principal,
+        site: SiteGeofence,
+        mock_context: Optional[MockNetworkContext]
+    ) -> dict:
+        """
+        Verify a user at a site, coalescing identical concurrent requests.
+        
+        Concurrent calls for the same user, phone number, site and mock
+        context share one gateway exchange and its result.
+        """
+        key = (
+            user.id,
+            user.phone_number,
+            site,
+            json.dumps(mock_context.model_dump(), sort_keys=True) if mock_context else None
+        )
+        return await verification_flights.run(
+            key,
+            lambda: self._run_verification(user, site, mock_context)
+        )
+    
+    async def _run_verification(
+        self,
+        user: Principal,
+        site: SiteGeofence,
         mock_context: Optional[MockNetworkContext]
     ) -> dict:
         """
@@ -105,7 +224,7 @@ class CustodyService:
                     site_radius=site.geofence_radius_m
                 )
                 return result
-                    
+        
         except TelefonicaGatewayError as e:
             logger.error(f"Gateway error during verification: {e.message}")
             # Return a safe fallback result on gateway errors
@@ -174,7 +293,7 @@ class CustodyService:
     def _create_approval_request(
         self,
         asset: Asset,
-        user: User,
+        user: Principal,
         action: str,
         site_id: int,
         verification_summary: dict,
@@ -182,27 +301,48 @@ class CustodyService:
         target_user_id: Optional[int] = None
     ) -> ApprovalRequest:
         """Create a step-up approval request."""
-        approval = ApprovalRequest(
-            asset_id=asset.id,
-            requester_id=user.id,
-            action=action,
-            site_id=site_id,
-            target_user_id=target_user_id,
-            verification_summary=json.dumps(verification_summary),
-            reason=reason,
-            status=ApprovalStatus.PENDING.value
-        )
-        self.db.add(approval)
-        self.db.commit()
-        self.db.refresh(approval)
-        return approval
+        return self._create_approval_requests(
+            [(asset, reason)], user, action, site_id, verification_summary, target_user_id
+        )[0]
+    
+    def _create_approval_requests(
+        self,
+        assets: List[Tuple[Asset, str]],
+        user: Principal,
+        action: str,
+        site_id: int,
+        verification_summary: dict,
+        target_user_id: Optional[int] = None
+    ) -> List[ApprovalRequest]:
+        """Create step-up approval requests for (asset, reason) pairs with one flush."""
+        verification_hash = self.audit_service.verification_store.put(verification_summary)[0]
+        approvals = [
+            ApprovalRequest(
+                asset_id=asset.id,
+                requester_id=user.id,
+                action=action,
+                site_id=site_id,
+                target_user_id=target_user_id,
+                verification_hash=verification_hash,
+                reason=reason,
+                status=ApprovalStatus.PENDING.value
+            )
+            for asset, reason in assets
+        ]
+        self.db.add_all(approvals)
+        # Flushed only; committed together with the STEP_UP audit events
+        self.db.flush()
+        for approval, (asset, _) in zip(approvals, assets):
+            self.audit_service.search_index.index_approval(approval, verification_summary, asset=asset, requester=user)
+        return approvals
     
     async def checkout(
         self,
         asset_id: int,
         site_id: int,
-        user: User,
-        mock_context: Optional[MockNetworkContext] = None
+        user: Principal,
+        mock_context: Optional[MockNetworkContext] = None,
+        device_id: Optional[str] = None
     ) -> CustodyActionResponse:
         """
         Check out an asset to a user.
@@ -210,8 +350,7 @@ class CustodyService:
         The asset must be AVAILABLE. Verification is performed and policy
         is evaluated to determine if the action is allowed.
         """
-        asset = self._get_asset(asset_id)
-        site = self._get_site(site_id)
+        asset, site, _ = self._load_context(asset_id, site_id)
         
         # Validate asset status
         if asset.status != AssetStatus.AVAILABLE.value:
@@ -231,7 +370,7 @@ class CustodyService:
             )
         
         # Perform verification
-        verification_summary = await self._perform_verification(user, site, mock_context)
+        verification_summary = await self._verify(user, site, asset.sensitivity_level, mock_context, device_id)
         verification_result = self._create_verification_result(verification_summary)
         
         # Evaluate policy
@@ -248,12 +387,12 @@ class CustodyService:
             asset.status = AssetStatus.CHECKED_OUT.value
             asset.current_custodian_id = user.id
             asset.site_id = site_id
-            self.db.commit()
             
-            # Create audit event
+            # Create audit event; commits the asset change with it
             event = self.audit_service.create_event(
                 asset_id=asset.id,
                 actor_user_id=user.id,
+                actor=user,
                 action="CHECK_OUT",
                 decision="ALLOW",
                 site_id=site_id,
@@ -284,6 +423,7 @@ class CustodyService:
             event = self.audit_service.create_event(
                 asset_id=asset.id,
                 actor_user_id=user.id,
+                actor=user,
                 action="CHECK_OUT",
                 decision="STEP_UP",
                 site_id=site_id,
@@ -305,6 +445,7 @@ class CustodyService:
             event = self.audit_service.create_event(
                 asset_id=asset.id,
                 actor_user_id=user.id,
+                actor=user,
                 action="CHECK_OUT",
                 decision="DENY",
                 site_id=site_id,
@@ -324,16 +465,16 @@ class CustodyService:
         self,
         asset_id: int,
         site_id: int,
-        user: User,
-        mock_context: Optional[MockNetworkContext] = None
+        user: Principal,
+        mock_context: Optional[MockNetworkContext] = None,
+        device_id: Optional[str] = None
     ) -> CustodyActionResponse:
         """
         Return a checked-out asset.
         
         The asset must be CHECKED_OUT and the user must be the current custodian.
         """
-        asset = self._get_asset(asset_id)
-        site = self._get_site(site_id)
+        asset, site, _ = self._load_context(asset_id, site_id)
         
         # Validate asset status
         if asset.status != AssetStatus.CHECKED_OUT.value:
@@ -370,7 +511,7 @@ class CustodyService:
             )
         
         # Perform verification
-        verification_summary = await self._perform_verification(user, site, mock_context)
+        verification_summary = await self._verify(user, site, asset.sensitivity_level, mock_context, device_id)
         verification_result = self._create_verification_result(verification_summary)
         
         # Evaluate policy
@@ -387,12 +528,12 @@ class CustodyService:
             asset.status = AssetStatus.AVAILABLE.value
             asset.current_custodian_id = None
             asset.site_id = site_id
-            self.db.commit()
             
-            # Create audit event
+            # Create audit event; commits the asset change with it
             event = self.audit_service.create_event(
                 asset_id=asset.id,
                 actor_user_id=user.id,
+                actor=user,
                 action="CHECK_IN",
                 decision="ALLOW",
                 site_id=site_id,
@@ -421,6 +562,7 @@ class CustodyService:
             event = self.audit_service.create_event(
                 asset_id=asset.id,
                 actor_user_id=user.id,
+                actor=user,
                 action="CHECK_IN",
                 decision="STEP_UP",
                 site_id=site_id,
@@ -441,6 +583,7 @@ class CustodyService:
             event = self.audit_service.create_event(
                 asset_id=asset.id,
                 actor_user_id=user.id,
+                actor=user,
                 action="CHECK_IN",
                 decision="DENY",
                 site_id=site_id,
@@ -460,18 +603,17 @@ class CustodyService:
         self,
         asset_id: int,
         site_id: int,
-        user: User,
+        user: Principal,
         target_user_id: int,
-        mock_context: Optional[MockNetworkContext] = None
+        mock_context: Optional[MockNetworkContext] = None,
+        device_id: Optional[str] = None
     ) -> CustodyActionResponse:
         """
         Transfer asset custody to another user.
         
         The asset must be checked out to the current user.
         """
-        asset = self._get_asset(asset_id)
-        site = self._get_site(site_id)
-        target_user = self._get_user(target_user_id)
+        asset, site, target_user = self._load_context(asset_id, site_id, target_user_id)
         
         # Validate asset status
         if asset.status != AssetStatus.CHECKED_OUT.value:
@@ -508,7 +650,7 @@ class CustodyService:
             )
         
         # Perform verification
-        verification_summary = await self._perform_verification(user, site, mock_context)
+        verification_summary = await self._verify(user, site, asset.sensitivity_level, mock_context, device_id)
         verification_result = self._create_verification_result(verification_summary)
         
         # Evaluate policy
@@ -523,12 +665,12 @@ class CustodyService:
         if policy_result.decision == PolicyDecision.ALLOW:
             # Update asset
             asset.current_custodian_id = target_user_id
-            self.db.commit()
             
-            # Create audit event
+            # Create audit event; commits the asset change with it
             event = self.audit_service.create_event(
                 asset_id=asset.id,
                 actor_user_id=user.id,
+                actor=user,
                 action="TRANSFER",
                 decision="ALLOW",
                 site_id=site_id,
@@ -559,6 +701,7 @@ class CustodyService:
             event = self.audit_service.create_event(
                 asset_id=asset.id,
                 actor_user_id=user.id,
+                actor=user,
                 action="TRANSFER",
                 decision="STEP_UP",
                 site_id=site_id,
@@ -580,6 +723,7 @@ class CustodyService:
             event = self.audit_service.create_event(
                 asset_id=asset.id,
                 actor_user_id=user.id,
+                actor=user,
                 action="TRANSFER",
                 decision="DENY",
                 site_id=site_id,
@@ -600,17 +744,17 @@ class CustodyService:
         self,
         asset_id: int,
         site_id: int,
-        user: User,
-        mock_context: Optional[MockNetworkContext] = None
+        user: Principal,
+        mock_context: Optional[MockNetworkContext] = None,
+        device_id: Optional[str] = None
     ) -> CustodyActionResponse:
         """
         Close inventory cycle for an asset (simplified cycle count verification).
         """
-        asset = self._get_asset(asset_id)
-        site = self._get_site(site_id)
+        asset, site, _ = self._load_context(asset_id, site_id)
         
         # Perform verification
-        verification_summary = await self._perform_verification(user, site, mock_context)
+        verification_summary = await self._verify(user, site, asset.sensitivity_level, mock_context, device_id)
         verification_result = self._create_verification_result(verification_summary)
         
         # Evaluate policy
@@ -627,6 +771,7 @@ class CustodyService:
             event = self.audit_service.create_event(
                 asset_id=asset.id,
                 actor_user_id=user.id,
+                actor=user,
                 action="INVENTORY_CLOSE",
                 decision="ALLOW",
                 site_id=site_id,
@@ -655,6 +800,7 @@ class CustodyService:
             event = self.audit_service.create_event(
                 asset_id=asset.id,
                 actor_user_id=user.id,
+                actor=user,
                 action="INVENTORY_CLOSE",
                 decision="STEP_UP",
                 site_id=site_id,
@@ -675,6 +821,7 @@ class CustodyService:
             event = self.audit_service.create_event(
                 asset_id=asset.id,
                 actor_user_id=user.id,
+                actor=user,
                 action="INVENTORY_CLOSE",
                 decision="DENY",
                 site_id=site_id,
@@ -690,10 +837,203 @@ class CustodyService:
                 message="Inventory close denied"
             )
     
+    def speculate(self, user: Principal, site_id: int) -> bool:
+        """
+        Start verifying the user at a site in the background, ahead of a
+        custody action. Returns whether a verification was started.
+        """
+        site = self._load_site(site_id)
+        return speculative_verifications.start(
+            speculation_key(user.id, user.phone_number, site),
+            lambda: self._perform_verification(user, site, None)
+        )
+    
+    def _load_site(self, site_id: int) -> SiteGeofence:
+        """Get a site's geofence, from the cache when possible."""
+        site = site_geofence_cache.get(site_id)
+        if site is None:
+            loaded_site = self.db.get(Site, site_id)
+            if loaded_site is None:
+                raise ValueError(f"Site with ID {site_id} not found")
+            site = site_geofence_cache.put(loaded_site)
+        return site
+    
+    @staticmethod
+    def _bulk_precondition_error(action: str, asset: Asset, user: Principal) -> Optional[str]:
+        """Why an asset can't take part in a bulk action, checked before verification."""
+        if action == "CHECK_OUT":
+            if asset.status != AssetStatus.AVAILABLE.value:
+                return f"Asset is not available for checkout. Current status: {asset.status}"
+            return None
+        if asset.status != AssetStatus.CHECKED_OUT.value:
+            return f"Asset is not checked out. Current status: {asset.status}"
+        if asset.current_custodian_id != user.id and user.role not in ["ADMIN", "MANAGER"]:
+            return "You are not the current custodian of this asset"
+        return None
+    
+    async def bulk_action(
+        self,
+        action: str,
+        site_id: int,
+        user: Principal,
+        asset_ids: Sequence[int] = (),
+        tag_ids: Sequence[str] = (),
+        target_user_id: Optional[int] = None,
+        mock_context: Optional[MockNetworkContext] = None,
+        device_id: Optional[str] = None
+    ) -> BulkCustodyResponse:
+        """
+        Check out, return or transfer several assets with one verification.
+        
+        Assets are given by ID and/or tag ID. The user is verified once, with
+        the lease window of the most sensitive asset; policy is evaluated per
+        asset sensitivity. All ALLOW changes, STEP_UP approval requests and
+        audit events are committed in a single transaction. Assets that are
+        unknown or fail the action's preconditions are denied without an
+        audit event, as the single-asset endpoints do.
+        """
+        if action not in BULK_ACTIONS:
+            raise ValueError(f"Unsupported bulk action: {action}")
+        asset_ids = list(dict.fromkeys(asset_ids))
+        tag_ids = list(dict.fromkeys(tag_ids))
+        if not asset_ids and not tag_ids:
+            raise ValueError("At least one asset ID or tag ID is required")
+        if len(asset_ids) + len(tag_ids) > settings.CUSTODY_BULK_MAX_ASSETS:
+            raise ValueError(f"At most {settings.CUSTODY_BULK_MAX_ASSETS} assets can be processed per request")
+        if action == "TRANSFER" and target_user_id is None:
+            raise ValueError("target_user_id is required for transfers")
+        
+        site = self._load_site(site_id)
+        target_user = None
+        if target_user_id is not None:
+            target_user = self.db.get(User, target_user_id)
+            if target_user is None:
+                raise ValueError(f"User with ID {target_user_id} not found")
+        
+        found = self.db.query(Asset).filter(or_(Asset.id.in_(asset_ids), Asset.tag_id.in_(tag_ids))).all()
+        by_id = {asset.id: asset for asset in found}
+        by_tag = {asset.tag_id: asset for asset in found}
+        
+        # One result per distinct asset, in request order; eligible assets
+        # get theirs once policy has been evaluated
+        label = BULK_ACTIONS[action]
+        results: List[Optional[BulkAssetResult]] = []
+        eligible: List[Tuple[int, Asset]] = []
+        seen = set()
+        for asset_id, tag_id in [(asset_id, None) for asset_id in asset_ids] + [(None, tag_id) for tag_id in tag_ids]:
+            asset = by_id.get(asset_id) if tag_id is None else by_tag.get(tag_id)
+            if asset is None:
+                results.append(BulkAssetResult(
+                    asset_id=asset_id,
+                    tag_id=tag_id,
+                    success=False,
+                    decision="DENY",
+                    reason=f"Asset with ID {asset_id} not found" if tag_id is None else f"Asset with tag {tag_id} not found",
+                    message=f"{label} failed: asset not found"
+                ))
+                continue
+            if asset.id in seen:
+                continue
+            seen.add(asset.id)
+            error = self._bulk_precondition_error(action, asset, user)
+            if error:
+                results.append(BulkAssetResult(
+                    asset_id=asset.id,
+                    tag_id=asset.tag_id,
+                    success=False,
+                    decision="DENY",
+                    reason=error,
+                    message=f"{label} failed"
+                ))
+                continue
+            eligible.append((len(results), asset))
+            results.append(None)
+        
+        verification_result = None
+        if eligible:
+            # Verify once; the lease must be valid for every asset in the batch
+            lease_sensitivity = min((asset.sensitivity_level for _, asset in eligible), key=lease_ttl)
+            verification_summary = await self._verify(user, site, lease_sensitivity, mock_context, device_id)
+            verification_result = self._create_verification_result(verification_summary)
+            
+            # Policy depends on sensitivity, not on the individual asset
+            policy_results: Dict[str, PolicyResult] = {}
+            for _, asset in eligible:
+                if asset.sensitivity_level not in policy_results:
+                    policy_results[asset.sensitivity_level] = policy_engine.evaluate_from_verification(
+                        action=action,
+                        asset_sensitivity=asset.sensitivity_level,
+                        user_role=user.role,
+                        site_requires_onsite=site.requires_onsite,
+                        verification_summary=verification_summary
+                    )
+            
+            step_ups = []
+            for _, asset in eligible:
+                policy_result = policy_results[asset.sensitivity_level]
+                if policy_result.decision == PolicyDecision.ALLOW:
+                    if action == "CHECK_OUT":
+                        asset.status = AssetStatus.CHECKED_OUT.value
+                        asset.current_custodian_id = user.id
+                        asset.site_id = site_id
+                    elif action == "CHECK_IN":
+                        asset.status = AssetStatus.AVAILABLE.value
+                        asset.current_custodian_id = None
+                        asset.site_id = site_id
+                    else:
+                        asset.current_custodian_id = target_user_id
+                elif policy_result.decision == PolicyDecision.STEP_UP:
+                    step_ups.append((asset, policy_result.reason))
+            approvals = {
+                approval.asset_id: approval for approval in self._create_approval_requests(
+                    step_ups, user, action, site_id, verification_summary, target_user_id
+                )
+            } if step_ups else {}
+            
+            messages = {
+                PolicyDecision.ALLOW: f"Transfer to {target_user.full_name} successful" if target_user else f"{label} successful",
+                PolicyDecision.STEP_UP: f"{label} requires manager approval",
+                PolicyDecision.DENY: f"{label} denied"
+            }
+            for index, asset in eligible:
+                policy_result = policy_results[asset.sensitivity_level]
+                approval = approvals.get(asset.id)
+                # Flushed only; the whole batch is committed below
+                event = self.audit_service.create_event(
+                    asset_id=asset.id,
+                    actor_user_id=user.id,
+                    actor=user,
+                    action=action,
+                    decision=policy_result.decision.value,
+                    site_id=site_id,
+                    target_user_id=target_user_id,
+                    verification_summary=verification_summary,
+                    commit=False
+                )
+                results[index] = BulkAssetResult(
+                    asset_id=asset.id,
+                    tag_id=asset.tag_id,
+                    success=policy_result.decision == PolicyDecision.ALLOW,
+                    decision=policy_result.decision.value,
+                    reason=policy_result.reason,
+                    event_id=event.id,
+                    approval_id=approval.id if approval else None,
+                    message=messages[policy_result.decision]
+                )
+            self.audit_service.commit()
+        
+        return BulkCustodyResponse(
+            verification=verification_result,
+            results=results,
+            allowed=sum(1 for result in results if result.decision == "ALLOW"),
+            step_up=sum(1 for result in results if result.decision == "STEP_UP"),
+            denied=sum(1 for result in results if result.decision == "DENY")
+        )
+    
     def process_approval(
         self,
         approval_id: int,
-        manager: User,
+        manager: Principal,
         approved: bool,
         note: Optional[str] = None
     ) -> CustodyActionResponse:
@@ -714,11 +1054,12 @@ class CustodyService:
         approval.resolved_by_id = manager.id
         approval.resolved_at = datetime.utcnow()
         approval.resolution_note = note
-        self.db.commit()
+        verification_text = self.audit_service.verification_store.text_for(approval)
+        self.audit_service.search_index.index_approval(approval, verification_text)
         
         # Get related data
         asset = self._get_asset(approval.asset_id)
-        verification_summary = json.loads(approval.verification_summary) if approval.verification_summary else {}
+        verification_summary = json.loads(verification_text) if verification_text else {}
         
         if approved:
             # Execute the original action
@@ -734,9 +1075,8 @@ class CustodyService:
                 asset.current_custodian_id = approval.target_user_id
             # INVENTORY_CLOSE doesn't change asset state
             
-            self.db.commit()
-            
-            # Create audit event for approval
+            # Create audit event for approval; commits the resolution and
+            # asset change with it
             event = self.audit_service.create_event(
                 asset_id=approval.asset_id,
                 actor_user_id=approval.requester_id,
@@ -0,0 +1,255 @@
+"""Cycle count sessions: site-wide inventory close with one verification.
+
+A count is opened for a site with a single verification of the counting
+user. Scanned tag IDs are streamed in batches while it is open. Closing it
+reconciles scans against the assets recorded at the site with set
+operations and writes all INVENTORY_CLOSE events in one transaction.
+"""
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, func
+
+from app.core.config import settings
+from app.core.principal_cache import Principal
+from app.models.asset import Asset, AssetSensitivity, AssetStatus
+from app.models.cycle_count import CycleCount, CycleCountScan, CycleCountStatus
+from app.schemas.custody import MockNetworkContext
+from app.schemas.cycle_count import CycleCountCloseResponse, CycleCountResponse, MisplacedAsset
+from app.services.custody_service import CustodyService
+from app.services.policy_engine import policy_engine, PolicyDecision, PolicyResult
+
+# Asset states expected on the shelf of their site
+SHELF_STATUSES = [AssetStatus.AVAILABLE.value, AssetStatus.MAINTENANCE.value]
+
+
+class CycleCountService(CustodyService):
+    """Open, scan into and close cycle count sessions."""
+    
+    async def open(
+        self,
+        site_id: int,
+        user: Principal,
+        mock_context: Optional[MockNetworkContext] = None,
+        device_id: Optional[str] = None
+    ) -> Tuple[CycleCount, dict]:
+        """
+        Open a cycle count at a site, verifying the user once.
+        
+        The count may include assets of any sensitivity, so a verification
+        lease is only reused if it is valid for HIGH assets.
+        """
+        site = self._load_site(site_id)
+        verification_summary = await self._verify(
+            user, site, AssetSensitivity.HIGH.value, mock_context, device_id
+        )
+        
+        now = datetime.utcnow()
+        cycle_count = CycleCount(
+            site_id=site_id,
+            opened_by_id=user.id,
+            status=CycleCountStatus.OPEN.value,
+            opened_at=now,
+            expires_at=now + timedelta(seconds=settings.CYCLE_COUNT_SESSION_TTL_SECONDS),
+            verification_hash=self.audit_service.verification_store.put(verification_summary)[0]
+        )
+        self.db.add(cycle_count)
+        self.db.commit()
+        return cycle_count, verification_summary
+    
+    def get(self, cycle_count_id: int) -> CycleCount:
+        """Get a cycle count by ID or raise error."""
+        cycle_count = self.db.get(CycleCount, cycle_count_id)
+        if cycle_count is None:
+            raise ValueError(f"Cycle count {cycle_count_id} not found")
+        return cycle_count
+    
+    def to_response(
+        self,
+        cycle_count: CycleCount,
+        verification_summary: Optional[dict] = None
+    ) -> CycleCountResponse:
+        """Describe a session, with the verification made when it was opened."""
+        if verification_summary is None:
+            verification_text = self.audit_service.verification_store.get(cycle_count.verification_hash)
+            verification_summary = json.loads(verification_text) if verification_text else None
+        return CycleCountResponse(
+            id=cycle_count.id,
+            site_id=cycle_count.site_id,
+            opened_by_id=cycle_count.opened_by_id,
+            status=cycle_count.status,
+            opened_at=cycle_count.opened_at,
+            expires_at=cycle_count.expires_at,
+            closed_at=cycle_count.closed_at,
+            scanned_count=self.scanned_count(cycle_count.id),
+            verification=self._create_verification_result(verification_summary) if verification_summary else None
+        )
+    
+    def _get_open(self, cycle_count_id: int, user: Principal) -> CycleCount:
+        """Get a cycle count the user may still scan into or close."""
+        cycle_count = self.get(cycle_count_id)
+        if cycle_count.opened_by_id != user.id and user.role not in ["ADMIN", "MANAGER"]:
+            raise ValueError("Only the user who opened this cycle count can update it")
+        if cycle_count.status != CycleCountStatus.OPEN.value:
+            raise ValueError(f"Cycle count is already {cycle_count.status}")
+        if cycle_count.expires_at.replace(tzinfo=None) <= datetime.utcnow():
+            raise ValueError("Cycle count has expired; open a new one")
+        return cycle_count
+    
+    def scanned_count(self, cycle_count_id: int) -> int:
+        """Number of distinct tags scanned so far."""
+        return self.db.query(func.count(CycleCountScan.id)).filter(
+            CycleCountScan.cycle_count_id == cycle_count_id
+        ).scalar()
+    
+    def record_scans(self, cycle_count_id: int, user: Principal, tag_ids: Iterable[str]) -> Tuple[int, int]:
+        """
+        Record a batch of scanned tags.
+        
+        Tags already scanned in this session are ignored. Returns the number
+        of new tags and the session's total.
+        """
+        cycle_count = self._get_open(cycle_count_id, user)
+        tags = list(dict.fromkeys(tag.strip() for tag in tag_ids if tag and tag.strip()))
+        if len(tags) > settings.CYCLE_COUNT_MAX_SCANS_PER_REQUEST:
+            raise ValueError(
+                f"At most {settings.CYCLE_COUNT_MAX_SCANS_PER_REQUEST} tags can be sent per request"
+            )
+        
+        before = self.scanned_count(cycle_count.id)
+        if tags:
+            # Rescans and scans sent concurrently from several handhelds must
+            # not conflict, so let the database skip tags already recorded
+            if self.db.get_bind().dialect.name == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            now = datetime.utcnow()
+            self.db.execute(
+                insert(CycleCountScan).on_conflict_do_nothing(index_elements=["cycle_count_id", "tag_id"]),
+                [{"cycle_count_id": cycle_count.id, "tag_id": tag, "scanned_at": now} for tag in tags]
+            )
+        after = self.scanned_count(cycle_count.id)
+        self.db.commit()
+        return after - before, after
+    
+    def close(self, cycle_count_id: int, user: Principal) -> CycleCountCloseResponse:
+        """
+        Reconcile and close a cycle count.
+        
+        - missing: assets on the site's shelf (AVAILABLE or MAINTENANCE there)
+          that were not scanned
+        - unexpected: scanned tags that match no asset
+        - misplaced: scanned assets recorded at another site or as checked out
+        
+        Every scanned asset gets an INVENTORY_CLOSE event, decided by policy
+        per sensitivity from the verification made at open; STEP_UP
+        decisions raise approval requests. Events, approvals and the closed
+        session are committed in one transaction.
+        """
+        cycle_count = self._get_open(cycle_count_id, user)
+        site = self._load_site(cycle_count.site_id)
+        verification_text = self.audit_service.verification_store.get(cycle_count.verification_hash)
+        verification_summary = json.loads(verification_text) if verification_text else {}
+        
+        scanned = {
+            tag_id for (tag_id,) in
+            self.db.query(CycleCountScan.tag_id)
+            .filter(CycleCountScan.cycle_count_id == cycle_count.id)
+            .all()
+        }
+        expected = {
+            asset.tag_id: asset for asset in
+            self.db.query(Asset)
+            .filter(Asset.site_id == cycle_count.site_id, Asset.status.in_(SHELF_STATUSES))
+            .all()
+        }
+        found = {
+            asset.tag_id: asset for asset in
+            self.db.query(Asset)
+            .join(CycleCountScan, and_(
+                CycleCountScan.tag_id == Asset.tag_id,
+                CycleCountScan.cycle_count_id == cycle_count.id
+            ))
+            .all()
+        }
+        
+        counted = expected.keys() & scanned
+        missing = expected.keys() - scanned
+        unexpected = scanned - found.keys()
+        misplaced = found.keys() - expected.keys()
+        
+        # Policy depends on sensitivity, not on the individual asset
+        policy_results: Dict[str, PolicyResult] = {}
+        for asset in found.values():
+            if asset.sensitivity_level not in policy_results:
+                policy_results[asset.sensitivity_level] = policy_engine.evaluate_from_verification(
+                    action="INVENTORY_CLOSE",
+                    asset_sensitivity=asset.sensitivity_level,
+                    user_role=user.role,
+                    site_requires_onsite=site.requires_onsite,
+                    verification_summary=verification_summary
+                )
+        
+        assets = [found[tag_id] for tag_id in sorted(found)]
+        step_ups = [
+            (asset, policy_results[asset.sensitivity_level].reason) for asset in assets
+            if policy_results[asset.sensitivity_level].decision == PolicyDecision.STEP_UP
+        ]
+        approvals = self._create_approval_requests(
+            step_ups, user, "INVENTORY_CLOSE", cycle_count.site_id, verification_summary
+        ) if step_ups else []
+        
+        decisions: List[str] = []
+        for asset in assets:
+            decision = policy_results[asset.sensitivity_level].decision.value
+            # Flushed only; the whole count is committed below
+            self.audit_service.create_event(
+                asset_id=asset.id,
+                actor_user_id=user.id,
+                actor=user,
+                action="INVENTORY_CLOSE",
+                decision=decision,
+                site_id=cycle_count.site_id,
+                verification_summary=verification_summary,
+                commit=False
+            )
+            decisions.append(decision)
+        
+        misplaced_assets = [
+            MisplacedAsset(
+                asset_id=found[tag_id].id,
+                tag_id=tag_id,
+                site_id=found[tag_id].site_id,
+                status=found[tag_id].status
+            )
+            for tag_id in sorted(misplaced)
+        ]
+        cycle_count.status = CycleCountStatus.CLOSED.value
+        cycle_count.closed_at = datetime.utcnow()
+        cycle_count.expected_count = len(expected)
+        cycle_count.scanned_count = len(scanned)
+        cycle_count.missing_count = len(missing)
+        cycle_count.unexpected_count = len(unexpected)
+        cycle_count.misplaced_count = len(misplaced)
+        cycle_count.discrepancies = json.dumps({
+            "missing": sorted(missing),
+            "unexpected": sorted(unexpected),
+            "misplaced": sorted(misplaced)
+        })
+        self.audit_service.commit()
+        
+        return CycleCountCloseResponse(
+            id=cycle_count.id,
+            site_id=cycle_count.site_id,
+            expected_count=len(expected),
+            scanned_count=len(scanned),
+            counted_count=len(counted),
+            missing=sorted(missing),
+            unexpected=sorted(unexpected),
+            misplaced=misplaced_assets,
+            allowed=decisions.count(PolicyDecision.ALLOW.value),
+            step_up=decisions.count(PolicyDecision.STEP_UP.value),
+            denied=decisions.count(PolicyDecision.DENY.value),
+            approval_ids=[approval.id for approval in approvals]
+        )
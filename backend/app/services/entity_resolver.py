@@ -0,0 +1,55 @@
+"""Batched lookup of entities referenced by list endpoints.
+
+List endpoints render related assets, users and sites for every row. Loading
+each of those with its own query turns a page of N rows into up to 4N round
+trips. The resolver instead collects the referenced IDs for the whole page and
+loads each entity type with a single ``IN (...)`` query.
+"""
+from typing import Dict, Iterable, Optional
+from sqlalchemy.orm import Session
+
+from app.models.asset import Asset
+from app.models.user import User
+from app.models.site import Site
+
+
+class EntityResolver:
+    """Resolve asset, user and site IDs to entities with one query per type."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self.assets: Dict[int, Asset] = {}
+        self.users: Dict[int, User] = {}
+        self.sites: Dict[int, Site] = {}
+    
+    def _load(self, model, cache: Dict[int, object], ids: Iterable[Optional[int]]) -> None:
+        """Load the given IDs of a model that are not cached yet."""
+        missing = {entity_id for entity_id in ids if entity_id is not None} - cache.keys()
+        if not missing:
+            return
+        for entity in self.db.query(model).filter(model.id.in_(missing)).all():
+            cache[entity.id] = entity
+    
+    def load(
+        self,
+        asset_ids: Iterable[Optional[int]] = (),
+        user_ids: Iterable[Optional[int]] = (),
+        site_ids: Iterable[Optional[int]] = ()
+    ) -> "EntityResolver":
+        """Batch-load the referenced entities. ``None`` IDs are ignored."""
+        self._load(Asset, self.assets, asset_ids)
+        self._load(User, self.users, user_ids)
+        self._load(Site, self.sites, site_ids)
+        return self
+    
+    def asset(self, asset_id: Optional[int]) -> Optional[Asset]:
+        """Get a loaded asset by ID."""
+        return self.assets.get(asset_id)
+    
+    def user(self, user_id: Optional[int]) -> Optional[User]:
+        """Get a loaded user by ID."""
+        return self.users.get(user_id)
+    
+    def site(self, site_id: Optional[int]) -> Optional[Site]:
+        """Get a loaded site by ID."""
+        return self.sites.get(site_id)
@@ -3,15 +3,22 @@
 This module implements the policy rules that determine whether a custody
 action should be ALLOWED, DENIED, or require STEP_UP approval.
 
-Policy Rules:
+Rules are data: an ordered list where the first rule whose conditions match
+decides. A rule set is compiled into a decision table covering every
+combination of action, sensitivity, role and verification signal, so
+evaluation is a single lookup. Values outside the known domains share one
+"other" slot that only matches rules not constrained on that input.
+
+Built-in rules:
 1. If number mismatch -> DENY
 2. If outside geofence for on-site required actions -> DENY (or STEP_UP for LOW sensitivity)
 3. If HIGH sensitivity and any risk signal -> STEP_UP
 4. If MEDIUM sensitivity and sim_swap_recent -> STEP_UP
 5. Otherwise -> ALLOW
 """
+import itertools
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, List, Optional, Sequence
 from enum import Enum
 
 
@@ -58,89 +65,215 @@ class PolicyResult:
     rule_triggered: str
 
 
+# Input domains of the decision table
+ACTIONS = tuple(action.value for action in CustodyAction)
+SENSITIVITIES = tuple(sensitivity.value for sensitivity in AssetSensitivity)
+USER_ROLES = ("ADMIN", "MANAGER", "EMPLOYEE")
+FLAGS = ("site_requires_onsite", "number_match", "inside_geofence", "sim_swap_recent", "device_swap_recent")
+
+# Risk signals a rule may require any of, with their names in reasons
+RISK_SIGNALS = {"sim_swap_recent": "SIM swap", "device_swap_recent": "device swap"}
+
+# Conditions on the categorical inputs, as lists of allowed values
+VALUE_CONDITIONS = {"actions": ACTIONS, "sensitivities": SENSITIVITIES, "roles": USER_ROLES}
+
+# Actions that require being on-site
+ONSITE_REQUIRED_ACTIONS = list(ACTIONS)
+
+BUILTIN_RULES: List[dict] = [
+    {
+        "name": "NUMBER_MISMATCH",
+        "decision": "DENY",
+        "reason": "Phone number verification failed. The claimed number does not match the network-verified number.",
+        "number_match": False
+    },
+    {
+        # For LOW sensitivity, allow step-up approval
+        "name": "GEOFENCE_OUTSIDE_LOW_SENSITIVITY",
+        "decision": "STEP_UP",
+        "reason": "Device is outside the authorized geofence. Manager approval required for low-sensitivity assets.",
+        "actions": ONSITE_REQUIRED_ACTIONS,
+        "sensitivities": ["LOW"],
+        "site_requires_onsite": True,
+        "inside_geofence": False
+    },
+    {
+        "name": "GEOFENCE_OUTSIDE",
+        "decision": "DENY",
+        "reason": "Device is outside the authorized geofence. On-site presence required for this action.",
+        "actions": ONSITE_REQUIRED_ACTIONS,
+        "site_requires_onsite": True,
+        "inside_geofence": False
+    },
+    {
+        "name": "HIGH_SENSITIVITY_RISK_SIGNALS",
+        "decision": "STEP_UP",
+        "reason": "High-sensitivity asset with risk signals detected: {signals}. Manager approval required.",
+        "sensitivities": ["HIGH"],
+        "any_signal": ["sim_swap_recent", "device_swap_recent"]
+    },
+    {
+        "name": "MEDIUM_SENSITIVITY_SIM_SWAP",
+        "decision": "STEP_UP",
+        "reason": "Medium-sensitivity asset with recent SIM swap detected. Manager approval required.",
+        "sensitivities": ["MEDIUM"],
+        "sim_swap_recent": True
+    },
+    {
+        "name": "DEFAULT_ALLOW",
+        "decision": "ALLOW",
+        "reason": "All verification checks passed. Action authorized."
+    }
+]
+
+
+def _slots(values: Sequence[str]) -> Dict[str, int]:
+    """Table slot of each known value; unknown values use slot len(values)."""
+    return {value: slot for slot, value in enumerate(values)}
+
+
+_ACTION_SLOTS = _slots(ACTIONS)
+_SENSITIVITY_SLOTS = _slots(SENSITIVITIES)
+_ROLE_SLOTS = _slots(USER_ROLES)
+
+
+def _validate_rule(rule: dict) -> None:
+    """Raise ValueError if a rule names unknown decisions, values or signals."""
+    name = rule.get("name")
+    if not name:
+        raise ValueError("Every policy rule needs a name")
+    known = {"name", "decision", "reason", "any_signal", *VALUE_CONDITIONS, *FLAGS}
+    unknown = set(rule) - known
+    if unknown:
+        raise ValueError(f"Rule {name}: unknown fields {', '.join(sorted(unknown))}")
+    if rule.get("decision") not in PolicyDecision.__members__:
+        raise ValueError(f"Rule {name}: decision must be one of {', '.join(PolicyDecision.__members__)}")
+    if not rule.get("reason"):
+        raise ValueError(f"Rule {name}: reason is required")
+    try:
+        rule["reason"].format(signals="")
+    except (KeyError, IndexError, ValueError):
+        raise ValueError(f"Rule {name}: reason may only use the {{signals}} placeholder")
+    for field, domain in VALUE_CONDITIONS.items():
+        values = rule.get(field)
+        if values is not None and not set(values) <= set(domain):
+            raise ValueError(f"Rule {name}: {field} must be taken from {', '.join(domain)}")
+    for flag in FLAGS:
+        if rule.get(flag) not in (None, True, False):
+            raise ValueError(f"Rule {name}: {flag} must be true or false")
+    signals = rule.get("any_signal")
+    if signals is not None and (not signals or not set(signals) <= set(RISK_SIGNALS)):
+        raise ValueError(f"Rule {name}: any_signal must be taken from {', '.join(RISK_SIGNALS)}")
+
+
+def _matches(rule: dict, values: Dict[str, Optional[str]], flags: Dict[str, bool]) -> bool:
+    """Whether a rule applies to one cell of the decision table."""
+    for field in VALUE_CONDITIONS:
+        allowed = rule.get(field)
+        if allowed is not None and values[field] not in allowed:
+            return False
+    for flag in FLAGS:
+        if rule.get(flag) is not None and rule[flag] != flags[flag]:
+            return False
+    signals = rule.get("any_signal")
+    if signals is not None and not any(flags[signal] for signal in signals):
+        return False
+    return True
+
+
+def _result(rule: dict, flags: Dict[str, bool]) -> PolicyResult:
+    """Build a rule's result, naming the risk signals present in its reason."""
+    signals = ", ".join(label for signal, label in RISK_SIGNALS.items() if flags[signal])
+    return PolicyResult(
+        decision=PolicyDecision(rule["decision"]),
+        reason=rule["reason"].format(signals=signals),
+        rule_triggered=rule["name"]
+    )
+
+
+class CompiledPolicy:
+    """
+    Decision table of a rule set.
+    
+    Cells are laid out by action, sensitivity and role slot, then by the
+    verification flags as bits, in FLAGS order.
+    """
+    
+    def __init__(self, rules: List[dict], version: Optional[int] = None):
+        """Compile rules, raising ValueError if invalid or if any input has no decision."""
+        if not rules:
+            raise ValueError("A rule set needs at least one rule")
+        for rule in rules:
+            _validate_rule(rule)
+        
+        self.rules = rules
+        self.version = version
+        results: Dict[tuple, PolicyResult] = {}
+        self._table: List[PolicyResult] = []
+        for action, sensitivity, role, bits in itertools.product(
+            ACTIONS + (None,),
+            SENSITIVITIES + (None,),
+            USER_ROLES + (None,),
+            itertools.product((False, True), repeat=len(FLAGS))
+        ):
+            values = {"actions": action, "sensitivities": sensitivity, "roles": role}
+            flags = dict(zip(FLAGS, bits))
+            rule = next((rule for rule in rules if _matches(rule, values, flags)), None)
+            if rule is None:
+                raise ValueError("The rule set leaves some inputs without a decision; end it with a rule without conditions")
+            result = _result(rule, flags)
+            # Cells with the same outcome share one result object
+            self._table.append(results.setdefault((result.decision, result.reason, result.rule_triggered), result))
+    
+    def evaluate(self, policy_input: PolicyInput) -> PolicyResult:
+        """Look up the decision for an input."""
+        slot = (
+            _ACTION_SLOTS.get(policy_input.action, len(ACTIONS)) * (len(SENSITIVITIES) + 1)
+            + _SENSITIVITY_SLOTS.get(policy_input.asset_sensitivity, len(SENSITIVITIES))
+        ) * (len(USER_ROLES) + 1) + _ROLE_SLOTS.get(policy_input.user_role, len(USER_ROLES))
+        bits = (
+            bool(policy_input.site_requires_onsite) << 4
+            | bool(policy_input.number_match) << 3
+            | bool(policy_input.inside_geofence) << 2
+            | bool(policy_input.sim_swap_recent) << 1
+            | bool(policy_input.device_swap_recent)
+        )
+        return self._table[slot << len(FLAGS) | bits]
+
+
 class PolicyEngine:
     """
     Policy engine for custody action authorization.
     
     Evaluates verification results and asset properties to determine
     whether an action should be allowed, denied, or require approval.
+    The active rule set can be replaced at any time with load().
     """
     
-    # Actions that require being on-site
-    ONSITE_REQUIRED_ACTIONS = {
-        CustodyAction.CHECK_OUT.value,
-        CustodyAction.CHECK_IN.value,
-        CustodyAction.TRANSFER.value,
-        CustodyAction.INVENTORY_CLOSE.value
-    }
+    def __init__(self, rules: List[dict] = BUILTIN_RULES):
+        self._policy = CompiledPolicy(rules)
     
-    def evaluate(self, policy_input: PolicyInput) -> PolicyResult:
+    @property
+    def rules(self) -> List[dict]:
+        """The active rule set."""
+        return self._policy.rules
+    
+    @property
+    def version(self) -> Optional[int]:
+        """ID of the stored rule set in use, or None for the built-in rules."""
+        return self._policy.version
+    
+    def load(self, rules: List[dict], version: Optional[int] = None) -> None:
         """
-        Evaluate policy rules and return a decision.
-        
-        Rules are evaluated in order of priority:
-        1. Number verification (highest priority)
-        2. Geofence verification
-        3. Risk signals based on sensitivity
-        4. Default allow
+        Compile and activate a rule set. Invalid rule sets raise ValueError
+        and leave the active one in place; evaluations never see a partly
+        built table.
         """
-        # Rule 1: Number mismatch -> DENY
-        if not policy_input.number_match:
-            return PolicyResult(
-                decision=PolicyDecision.DENY,
-                reason="Phone number verification failed. The claimed number does not match the network-verified number.",
-                rule_triggered="NUMBER_MISMATCH"
-            )
-        
-        # Rule 2: Geofence check for on-site actions
-        if (policy_input.site_requires_onsite and 
-            policy_input.action in self.ONSITE_REQUIRED_ACTIONS and
-            not policy_input.inside_geofence):
-            
-            # For LOW sensitivity, allow step-up approval
-            if policy_input.asset_sensitivity == AssetSensitivity.LOW.value:
-                return PolicyResult(
-                    decision=PolicyDecision.STEP_UP,
-                    reason="Device is outside the authorized geofence. Manager approval required for low-sensitivity assets.",
-                    rule_triggered="GEOFENCE_OUTSIDE_LOW_SENSITIVITY"
-                )
-            else:
-                # For MEDIUM and HIGH sensitivity, deny outright
-                return PolicyResult(
-                    decision=PolicyDecision.DENY,
-                    reason="Device is outside the authorized geofence. On-site presence required for this action.",
-                    rule_triggered="GEOFENCE_OUTSIDE"
-                )
-        
-        # Rule 3: HIGH sensitivity with any risk signal -> STEP_UP
-        if policy_input.asset_sensitivity == AssetSensitivity.HIGH.value:
-            if policy_input.sim_swap_recent or policy_input.device_swap_recent:
-                signals = []
-                if policy_input.sim_swap_recent:
-                    signals.append("SIM swap")
-                if policy_input.device_swap_recent:
-                    signals.append("device swap")
-                return PolicyResult(
-                    decision=PolicyDecision.STEP_UP,
-                    reason=f"High-sensitivity asset with risk signals detected: {', '.join(signals)}. Manager approval required.",
-                    rule_triggered="HIGH_SENSITIVITY_RISK_SIGNALS"
-                )
-        
-        # Rule 4: MEDIUM sensitivity with SIM swap -> STEP_UP
-        if policy_input.asset_sensitivity == AssetSensitivity.MEDIUM.value:
-            if policy_input.sim_swap_recent:
-                return PolicyResult(
-                    decision=PolicyDecision.STEP_UP,
-                    reason="Medium-sensitivity asset with recent SIM swap detected. Manager approval required.",
-                    rule_triggered="MEDIUM_SENSITIVITY_SIM_SWAP"
-                )
-        
-        # Rule 5: Default allow
-        return PolicyResult(
-            decision=PolicyDecision.ALLOW,
-            reason="All verification checks passed. Action authorized.",
-            rule_triggered="DEFAULT_ALLOW"
-        )
+        self._policy = CompiledPolicy(rules, version)
+    
+    def evaluate(self, policy_input: PolicyInput) -> PolicyResult:
+        """Evaluate policy rules and return a decision."""
+        return self._policy.evaluate(policy_input)
     
     def evaluate_from_verification(
         self,
@@ -0,0 +1,68 @@
+"""Storage and hot reload of policy rule sets.
+
+Saved rule sets are compiled and activated in the saving process at once.
+Other processes pick them up on their next custody request after at most
+``POLICY_RELOAD_SECONDS``, without a restart.
+"""
+import json
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.policy import PolicyRuleSet
+from app.models.user import User
+from app.services.policy_engine import BUILTIN_RULES, CompiledPolicy, policy_engine
+
+logger = logging.getLogger(__name__)
+
+# Monotonic time after which sync() looks for a newer rule set again
+_next_check = 0.0
+
+
+class PolicyRuleStore:
+    """Versioned policy rule sets in the database."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def active(self) -> Optional[PolicyRuleSet]:
+        """The latest stored rule set, or None if the built-in rules apply."""
+        return self.db.query(PolicyRuleSet).order_by(PolicyRuleSet.id.desc()).first()
+    
+    def save(self, rules: List[dict], user: User) -> PolicyRuleSet:
+        """Store and activate a rule set; invalid rules raise ValueError."""
+        CompiledPolicy(rules)
+        rule_set = PolicyRuleSet(
+            rules=json.dumps(rules),
+            created_by_id=user.id,
+            created_at=datetime.utcnow()
+        )
+        self.db.add(rule_set)
+        self.db.commit()
+        policy_engine.load(rules, rule_set.id)
+        logger.info(f"Policy rule set {rule_set.id} activated by user {user.id}")
+        return rule_set
+    
+    def sync(self, force: bool = False) -> None:
+        """Activate the latest stored rule set if this process runs an older one."""
+        global _next_check
+        now = time.monotonic()
+        if not force and now < _next_check:
+            return
+        _next_check = now + settings.POLICY_RELOAD_SECONDS
+        
+        latest_id = self.db.query(func.max(PolicyRuleSet.id)).scalar()
+        if latest_id == policy_engine.version:
+            return
+        if latest_id is None:
+            policy_engine.load(BUILTIN_RULES)
+            return
+        rule_set = self.db.get(PolicyRuleSet, latest_id)
+        try:
+            policy_engine.load(json.loads(rule_set.rules), rule_set.id)
+        except ValueError as e:
+            logger.error(f"Policy rule set {rule_set.id} failed to compile, keeping the active one: {str(e)}")
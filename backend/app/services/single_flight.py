@@ -0,0 +1,57 @@
+"""In-process single-flight coalescing of identical async calls.
+
+Double-taps and client retries can start several identical verifications at
+once. The first caller for a key runs the call; callers arriving while it is
+in flight await the same result instead of starting their own.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Share one in-flight call per key among concurrent callers."""
+    
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+    
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn for key, or join the call already running for key."""
+        self.calls += 1
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # Shield so a cancelled follower doesn't cancel the shared call
+            return await asyncio.shield(future)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.executions += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Followers re-raise it; don't warn when there were none
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
+    
+    def metrics(self) -> dict:
+        """Counters since process start."""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight)
+        }
@@ -0,0 +1,76 @@
+"""Read-through cache of site geofence parameters.
+
+Every custody action needs the site's location, geofence radius and on-site
+requirement, and those almost never change. The cache keeps an immutable
+snapshot per site so custody calls can skip the site query. Site updates
+invalidate the entry; ``SITE_CACHE_TTL_SECONDS`` bounds staleness for
+changes made by other processes.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.models.site import Site
+
+
+@dataclass(frozen=True)
+class SiteGeofence:
+    """Snapshot of the site fields used by verification and policy."""
+    id: int
+    name: str
+    latitude: float
+    longitude: float
+    geofence_radius_m: float
+    requires_onsite: bool
+    
+    @classmethod
+    def from_site(cls, site: Site) -> "SiteGeofence":
+        return cls(
+            id=site.id,
+            name=site.name,
+            latitude=site.latitude,
+            longitude=site.longitude,
+            geofence_radius_m=site.geofence_radius_m,
+            requires_onsite=site.requires_onsite
+        )
+
+
+class SiteGeofenceCache:
+    """Process-wide cache of SiteGeofence snapshots by site ID."""
+    
+    def __init__(self):
+        self._entries: Dict[int, Tuple[SiteGeofence, float]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, site_id: int) -> Optional[SiteGeofence]:
+        """Get a cached snapshot, or None if missing or expired."""
+        entry = self._entries.get(site_id)
+        if entry is None:
+            return None
+        geofence, expires_at = entry
+        if time.monotonic() >= expires_at:
+            with self._lock:
+                self._entries.pop(site_id, None)
+            return None
+        return geofence
+    
+    def put(self, site: Site) -> SiteGeofence:
+        """Cache a snapshot of a loaded site and return it."""
+        geofence = SiteGeofence.from_site(site)
+        if settings.SITE_CACHE_TTL_SECONDS:
+            with self._lock:
+                self._entries[site.id] = (geofence, time.monotonic() + settings.SITE_CACHE_TTL_SECONDS)
+        return geofence
+    
+    def invalidate(self, site_id: Optional[int] = None) -> None:
+        """Drop one site, or every site when site_id is None."""
+        with self._lock:
+            if site_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(site_id, None)
+
+
+site_geofence_cache = SiteGeofenceCache()
@@ -0,0 +1,130 @@
+"""Speculative verification started when an asset tag is scanned.
+
+An employee scans a tag, reviews the asset and only then submits the
+custody action, which is when verification used to start. A tag lookup can
+opt in to start verifying the scanning user at the asset's site right away,
+in the background. The next custody action by that user at that site takes
+the result (waiting for the remainder if it is still running) as long as it
+started less than ``SPECULATIVE_VERIFICATION_TTL_SECONDS`` ago, hiding the
+gateway latency behind the review. Like a lease, it is also never older than
+the reuse window of the asset sensitivity (``VERIFICATION_LEASE_TTL_SECONDS``),
+so HIGH assets always verify afresh.
+
+A speculative result is used at most once. Results with gateway errors are
+discarded, and the audit event records when the verification started.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SPECULATION_KEY = "speculative_verification"
+
+
+def speculation_key(
+    user_id: int,
+    phone_number: Optional[str],
+    site: Hashable,
+    mock_context: Optional[dict] = None
+) -> Tuple:
+    """
+    Build the key a speculative verification is stored under.
+    
+    As with leases, the site snapshot and the mock network context are part
+    of the key, so a changed geofence or simulated context never reuses it.
+    """
+    mock_digest = None
+    if mock_context:
+        mock_digest = hashlib.sha256(json.dumps(mock_context, sort_keys=True).encode('utf-8')).hexdigest()
+    return (user_id, phone_number, site, mock_digest)
+
+
+def speculated_summary(summary: dict, started_at: datetime) -> dict:
+    """Annotate a summary with when its speculative verification started."""
+    return {**summary, SPECULATION_KEY: {"started_at": started_at.isoformat()}}
+
+
+class SpeculativeVerifications:
+    """Process-wide store of verifications started ahead of custody actions."""
+    
+    def __init__(self):
+        self._entries: Dict[Tuple, Tuple[asyncio.Task, datetime]] = {}
+        self.started = 0
+        self.used = 0
+        self.discarded = 0
+    
+    def start(self, key: Tuple, verify: Callable[[], Awaitable[dict]]) -> bool:
+        """
+        Start verifying in the background, unless a fresh speculation for
+        the same key exists. Returns whether one was started.
+        """
+        ttl = settings.SPECULATIVE_VERIFICATION_TTL_SECONDS
+        if ttl <= 0:
+            return False
+        self._evict_expired(ttl)
+        if key in self._entries:
+            return False
+        
+        task = asyncio.get_running_loop().create_task(verify())
+        # Nobody may ever await it; don't warn about unretrieved errors
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._entries[key] = (task, datetime.utcnow())
+        self.started += 1
+        return True
+    
+    async def take(self, key: Tuple, max_age: int) -> Optional[Tuple[dict, datetime]]:
+        """
+        Take a speculative result as (summary, started_at), waiting if
+        needed, if it started less than max_age seconds ago and within the
+        speculation window. An older one is dropped.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        task, started_at = entry
+        ttl = min(settings.SPECULATIVE_VERIFICATION_TTL_SECONDS, max_age)
+        if (datetime.utcnow() - started_at).total_seconds() >= ttl:
+            self.discarded += 1
+            return None
+        
+        try:
+            # Shield so a cancelled custody request leaves the task alone
+            summary = await asyncio.shield(task)
+        except Exception as e:
+            logger.warning(f"Speculative verification failed: {str(e)}")
+            self.discarded += 1
+            return None
+        if summary.get("gateway_error"):
+            self.discarded += 1
+            return None
+        self.used += 1
+        return summary, started_at
+    
+    def _evict_expired(self, ttl: int) -> None:
+        """Drop speculations too old to be used."""
+        now = datetime.utcnow()
+        expired = [
+            key for key, (_, started_at) in self._entries.items()
+            if (now - started_at).total_seconds() >= ttl
+        ]
+        for key in expired:
+            del self._entries[key]
+            self.discarded += 1
+    
+    def metrics(self) -> dict:
+        """Counters since process start."""
+        return {
+            "started": self.started,
+            "used": self.used,
+            "discarded": self.discarded,
+            "pending": len(self._entries)
+        }
+
+
+speculative_verifications = SpeculativeVerifications()
@@ -7,15 +7,19 @@ API Documentation: https://developers.opengateway.telefonica.com/reference
 
 Authorization Flow (CIBA - Client-Initiated Backchannel Authentication):
 1. POST /bc-authorize with login_hint (phone number) and scope
-2. POST /token with auth_req_id to get access token
+2. POST /token with auth_req_id to get access token; background custody jobs
+   keep polling, no faster than the interval from step 1, while
+   authorization is pending
 3. Use access token for API calls
 """
 import os
 import math
 import httpx
 import base64
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, Callable
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
@@ -25,6 +29,26 @@ from app.core.config import settings
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# CIBA defaults when /bc-authorize omits them (OpenID CIBA Core 7.3)
+CIBA_DEFAULT_INTERVAL_SECONDS = 5
+CIBA_DEFAULT_EXPIRES_IN_SECONDS = 120
+CIBA_SLOW_DOWN_SECONDS = 5
+
+# Called with the current /token polling interval while a CIBA authorization
+# is pending, so callers running verification in the background can tell
+# their own clients how often to poll. Only CustodyJobRunner sets it; without
+# a listener the caller is waiting on an HTTP response, so /token is
+# requested once and a pending authorization fails the request as before
+ciba_poll_listener: ContextVar[Optional[Callable[[int], None]]] = ContextVar("ciba_poll_listener", default=None)
+
+
+def _oauth_error(response: httpx.Response) -> Optional[str]:
+    """OAuth error code of a failed token response, if any."""
+    try:
+        return response.json().get("error")
+    except ValueError:
+        return None
+
 
 class GatewayMode(str, Enum):
     """Gateway operation mode."""
@@ -293,6 +317,10 @@ class TelefonicaGateway:
                 )
             
             logger.debug(f"Got auth_req_id: {auth_req_id[:20]}...")
+            interval = int(auth_result.get("interval") or CIBA_DEFAULT_INTERVAL_SECONDS)
+            deadline = datetime.utcnow() + timedelta(
+                seconds=int(auth_result.get("expires_in") or CIBA_DEFAULT_EXPIRES_IN_SECONDS)
+            )
             
             # Step 2: Token request
             token_url = f"{self.base_url}{self.ENDPOINTS['token']}"
@@ -306,8 +334,27 @@ class TelefonicaGateway:
                 "auth_req_id": auth_req_id,
             }
             
-            logger.debug(f"Token request to {token_url}")
-            token_response = await client.post(token_url, data=token_data, headers=token_headers)
+            while True:
+                logger.debug(f"Token request to {token_url}")
+                token_response = await client.post(token_url, data=token_data, headers=token_headers)
+                if token_response.status_code == 200:
+                    break
+                
+                # Poll mode: wait at least the advertised interval between
+                # token requests until the authorization is granted
+                error_code = _oauth_error(token_response)
+                if error_code not in ("authorization_pending", "slow_down"):
+                    break
+                listener = ciba_poll_listener.get()
+                if listener is None:
+                    break
+                if error_code == "slow_down":
+                    interval += CIBA_SLOW_DOWN_SECONDS
+                if datetime.utcnow() + timedelta(seconds=interval) >= deadline:
+                    break
+                listener(interval)
+                logger.debug(f"CIBA authorization {error_code}; polling again in {interval}s")
+                await asyncio.sleep(interval)
             
             if token_response.status_code != 200:
                 error_detail = token_response.text
@@ -0,0 +1,115 @@
+"""Short-lived reuse of verification results across custody actions.
+
+A technician checking out several tools at one site would otherwise run the
+full set of gateway checks for every item. After a clean verification, the
+summary is leased to the same user, device and site for a few seconds. A
+custody action holding a valid lease evaluates policy against the leased
+summary and skips the gateway.
+
+How long a lease may be reused depends on the asset's sensitivity
+(``VERIFICATION_LEASE_TTL_SECONDS``; 0 means always verify afresh). The audit
+event of a leased action carries the time of the original verification.
+"""
+import hashlib
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+LEASE_KEY = "verification_lease"
+
+
+def lease_ttl(sensitivity: str) -> int:
+    """Lease reuse window in seconds for an asset sensitivity."""
+    return settings.VERIFICATION_LEASE_TTL_SECONDS.get(sensitivity, 0)
+
+
+def lease_key(
+    user_id: int,
+    phone_number: Optional[str],
+    site: Hashable,
+    device_id: str,
+    mock_context: Optional[dict] = None
+) -> Tuple:
+    """
+    Build the key a lease is stored under.
+    
+    The site snapshot is part of the key, so a geofence change never reuses
+    a verification made against the old one. In mock mode the simulated
+    network context is too, so changing it in the panel verifies afresh.
+    """
+    mock_digest = None
+    if mock_context:
+        mock_digest = hashlib.sha256(json.dumps(mock_context, sort_keys=True).encode('utf-8')).hexdigest()
+    return (user_id, phone_number, site, device_id, mock_digest)
+
+
+def is_clean(summary: dict) -> bool:
+    """
+    Whether every policy input of a summary passed: number match, inside the
+    geofence, no recent SIM or device swap, no gateway error. Failed checks
+    are never leased, so the next action retries them against the network.
+    """
+    if summary.get("gateway_error"):
+        return False
+    number_verification = summary.get("number_verification", {})
+    location_verification = summary.get("location_verification", {})
+    risk_signals = summary.get("risk_signals", {})
+    return (
+        number_verification.get("match", True) is not False
+        and location_verification.get("inside_geofence", True) is not False
+        and not risk_signals.get("sim_swap_recent", False)
+        and not risk_signals.get("device_swap_recent", False)
+    )
+
+
+def leased_summary(summary: dict, verified_at: datetime) -> dict:
+    """Annotate a leased summary with when the verification really happened."""
+    return {**summary, LEASE_KEY: {"verified_at": verified_at.isoformat()}}
+
+
+class VerificationLeaseCache:
+    """Process-wide store of recent clean verification summaries."""
+    
+    def __init__(self):
+        self._entries: Dict[Tuple, Tuple[dict, datetime]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: Tuple, sensitivity: str) -> Optional[Tuple[dict, datetime]]:
+        """Get (summary, verified_at) if a lease is valid for this sensitivity."""
+        ttl = lease_ttl(sensitivity)
+        if ttl <= 0:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        summary, verified_at = entry
+        if (datetime.utcnow() - verified_at).total_seconds() >= ttl:
+            return None
+        return summary, verified_at
+    
+    def put(self, key: Tuple, summary: dict, verified_at: datetime) -> None:
+        """Lease a fresh verification if it is clean."""
+        if not is_clean(summary):
+            return
+        max_ttl = max(settings.VERIFICATION_LEASE_TTL_SECONDS.values(), default=0)
+        if max_ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (summary, verified_at)
+            self._evict_expired(max_ttl)
+    
+    def _evict_expired(self, max_ttl: int) -> None:
+        """Drop leases no sensitivity can use any more (caller holds the lock)."""
+        now = datetime.utcnow()
+        expired = [
+            key for key, (_, verified_at) in self._entries.items()
+            if (now - verified_at).total_seconds() >= max_ttl
+        ]
+        for key in expired:
+            del self._entries[key]
+
+
+verification_leases = VerificationLeaseCache()
@@ -0,0 +1,150 @@
+"""Content-addressed store for verification summaries.
+
+Verification summaries are near-identical across events, and a STEP_UP used
+to write the same JSON twice (approval request and audit event). The store
+keeps one copy per distinct summary in ``verification_blobs``, keyed by the
+SHA256 of its text, and optionally zlib-compresses it. Records reference the
+blob through their ``verification_hash`` column.
+
+The stored text is exactly what the audit hash chain covers, so resolving a
+hash back to text reproduces the bytes the event hash was computed over.
+"""
+import hashlib
+import json
+import zlib
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.verification_blob import VerificationBlob
+
+
+def canonical_json(summary: dict) -> str:
+    """Serialize a verification summary to canonical JSON."""
+    return json.dumps(summary, sort_keys=True, separators=(',', ':'))
+
+
+def text_hash(text: str) -> str:
+    """Content address of a summary text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _encode(text: str) -> Tuple[str, bytes]:
+    """Encode summary text for storage, compressing it if large enough."""
+    raw = text.encode('utf-8')
+    if settings.VERIFICATION_BLOB_COMPRESS_MIN_BYTES and len(raw) >= settings.VERIFICATION_BLOB_COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(raw, 6)
+        if len(compressed) < len(raw):
+            return "zlib", compressed
+    return "raw", raw
+
+
+def _decode(blob: VerificationBlob) -> str:
+    """Decode a stored blob back to summary text."""
+    if blob.encoding == "zlib":
+        return zlib.decompress(blob.data).decode('utf-8')
+    return blob.data.decode('utf-8')
+
+
+class VerificationStore:
+    """Read and write deduplicated verification summaries."""
+    
+    def __init__(self, db: Session):
+        self.db = db
+        # Hashes known to exist (or pending insert) in this session
+        self._known: Dict[str, str] = {}
+    
+    def _insert_if_absent(self, text: str) -> str:
+        """Store a summary text under its content hash, if not already present."""
+        digest = text_hash(text)
+        if digest in self._known:
+            return digest
+        
+        encoding, data = _encode(text)
+        values = dict(
+            hash=digest,
+            encoding=encoding,
+            data=data,
+            size=len(text.encode('utf-8'))
+        )
+        # Identical summaries written concurrently must not conflict, so
+        # rely on the database to skip blobs that already exist
+        if self.db.get_bind().dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        self.db.execute(
+            insert(VerificationBlob).values(**values).on_conflict_do_nothing(index_elements=["hash"])
+        )
+        
+        self._known[digest] = text
+        return digest
+    
+    def put(self, summary: Optional[dict]) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Store a verification summary.
+        
+        Returns (hash, canonical_text). Both are None for an empty summary.
+        """
+        if not summary:
+            return None, None
+        text = canonical_json(summary)
+        return self._insert_if_absent(text), text
+    
+    def get_many(self, hashes: Iterable[Optional[str]]) -> Dict[str, str]:
+        """Resolve a batch of hashes to summary texts with a single query."""
+        wanted = {digest for digest in hashes if digest}
+        result = {digest: self._known[digest] for digest in wanted if digest in self._known}
+        missing = wanted - result.keys()
+        if missing:
+            blobs = self.db.query(VerificationBlob).filter(VerificationBlob.hash.in_(missing)).all()
+            for blob in blobs:
+                result[blob.hash] = _decode(blob)
+        return result
+    
+    def get(self, digest: Optional[str]) -> Optional[str]:
+        """Resolve a single hash to summary text."""
+        if not digest:
+            return None
+        return self.get_many([digest]).get(digest)
+    
+    def text_for(self, record, texts: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """
+        Get the summary text of an audit event or approval request.
+        
+        Legacy rows carry the JSON inline; newer rows reference a blob. Pass
+        the result of get_many() as texts to avoid a query per record.
+        """
+        if record.verification_summary is not None:
+            return record.verification_summary
+        if not record.verification_hash:
+            return None
+        if texts is not None and record.verification_hash in texts:
+            return texts[record.verification_hash]
+        return self.get(record.verification_hash)
+    
+    def migrate_legacy(self, model, batch_size: int = 500) -> int:
+        """
+        Move inline summaries of a model into the blob store.
+        
+        The stored text is the legacy string byte-for-byte, so existing audit
+        hashes keep verifying. Commits per batch and returns the number of
+        rows migrated.
+        """
+        migrated = 0
+        while True:
+            rows = (
+                self.db.query(model)
+                .filter(model.verification_summary.isnot(None))
+                .order_by(model.id.asc())
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                return migrated
+            for row in rows:
+                row.verification_hash = self._insert_if_absent(row.verification_summary)
+                row.verification_summary = None
+            self.db.commit()
+            self._known.clear()
+            migrated += len(rows)
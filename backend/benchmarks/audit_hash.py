@@ -0,0 +1,45 @@
+"""Micro-benchmark of per-event audit hash cost by hash format version.
+
+Run from the backend directory:
+
+    python -m benchmarks.audit_hash [iterations]
+"""
+import hashlib
+import json
+import sys
+import timeit
+from datetime import datetime
+
+from app.services.audit_service import HASH_VERSION_BINARY, HASH_VERSION_JSON, compute_event_hash
+
+SAMPLE_EVENT = dict(
+    prev_hash=hashlib.sha256(b"previous event").hexdigest(),
+    timestamp=datetime(2025, 1, 15, 9, 30, 12, 345678),
+    asset_id=42,
+    actor_user_id=7,
+    action="CHECK_OUT",
+    decision="STEP_UP",
+    site_id=3,
+    target_user_id=None,
+    approval_id=12,
+    verification_summary=json.dumps({
+        "number_verified": True,
+        "inside_geofence": True,
+        "sim_swap_recent": False,
+        "device_swap_recent": False,
+        "match_rate": 100
+    }, sort_keys=True, separators=(',', ':'))
+)
+
+
+def main(iterations: int) -> None:
+    baseline = None
+    for version in (HASH_VERSION_JSON, HASH_VERSION_BINARY):
+        seconds = timeit.timeit(lambda: compute_event_hash(**SAMPLE_EVENT, version=version), number=iterations)
+        per_event = seconds / iterations * 1e6
+        baseline = baseline or per_event
+        print(f"v{version}: {per_event:.2f} us/event, {iterations / seconds:,.0f} events/s ({baseline / per_event:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
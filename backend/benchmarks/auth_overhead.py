@@ -0,0 +1,79 @@
+"""Benchmark of authentication overhead per request against a scratch SQLite database.
+
+Compares resolving the current user with a database query (get_current_user)
+to the cached principal used by role checks (require_role), and to the
+signed claims read in stateless mode (STATELESS_AUTH). Each simulated
+request opens and closes its own session, as get_db does. Run from the
+backend directory:
+
+    python -m benchmarks.auth_overhead [requests]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp(prefix="geocustody-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+os.environ["GATEWAY_MODE"] = "mock"
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import SessionLocal  # noqa: E402
+from app.core.principal_cache import principal_cache  # noqa: E402
+from app.core.security import (  # noqa: E402
+    create_access_token,
+    get_current_principal,
+    get_current_user,
+    principal_claims,
+    require_role
+)
+from app.models import User  # noqa: E402
+
+
+async def per_request(requests: int, resolve) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        db = SessionLocal()
+        try:
+            await resolve(db)
+        finally:
+            db.close()
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def run(requests: int) -> None:
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.role == "ADMIN").first()
+        token = create_access_token(principal_claims(user))
+    finally:
+        db.close()
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    role_checker = require_role(["ADMIN"])
+
+    async def query_user(db):
+        return await get_current_user(credentials, db)
+
+    async def cached_role_check(db):
+        # Resolve the principal the way FastAPI does for require_role
+        return await role_checker(await get_current_principal(credentials, db))
+
+    query = await per_request(requests, query_user)
+    principal_cache.invalidate(user.id)
+    cached = await per_request(requests, cached_role_check)
+    settings.STATELESS_AUTH = True
+    stateless = await per_request(requests, cached_role_check)
+    print(f"get_current_user: {query:.1f} us/request")
+    print(f"require_role (cached principal): {cached:.1f} us/request ({query / cached:.1f}x)")
+    print(f"require_role (stateless claims): {stateless:.1f} us/request ({query / stateless:.1f}x)")
+
+
+if __name__ == "__main__":
+    from main import startup  # noqa: E402
+
+    os.chdir(_workdir)
+    asyncio.run(startup())
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,100 @@
+"""Benchmark of bulk asset and user imports against one-row-at-a-time creates.
+
+Creates assets the way POST /api/assets does (a uniqueness query, then an
+insert and commit per row) for a sample, then imports the full set as CSV
+through the bulk importer, and finally imports users, whose time is almost
+all bcrypt. Run from the backend directory:
+
+    python -m benchmarks.bulk_import [assets] [users]
+"""
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp(prefix="geocustody-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+os.environ["GATEWAY_MODE"] = "mock"
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.core.password_pool import password_pool  # noqa: E402
+from app.models import Asset  # noqa: E402
+from app.services.bulk_import import AssetImporter, UserImporter  # noqa: E402
+
+SINGLE_SAMPLE = 2000
+
+
+def assets_csv(count: int) -> bytes:
+    lines = ["tag_id,name,description,sensitivity_level,site_id"]
+    lines += [f"BULK-{i},Bulk asset {i},\"Imported, row {i}\",{('LOW', 'MEDIUM', 'HIGH')[i % 3]},1" for i in range(count)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def users_ndjson(count: int) -> bytes:
+    lines = [
+        f'{{"email": "bulk{i}@example.com", "password": "password{i}", "full_name": "Bulk {i}", "role": "EMPLOYEE", "home_site_id": 1}}'
+        for i in range(count)
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def create_one_by_one(count: int) -> float:
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        for i in range(count):
+            tag_id = f"SINGLE-{i}"
+            if db.query(Asset).filter(Asset.tag_id == tag_id).first():
+                continue
+            asset = Asset(tag_id=tag_id, name=f"Single asset {i}", sensitivity_level="LOW", site_id=1)
+            db.add(asset)
+            db.commit()
+            db.refresh(asset)
+    finally:
+        db.close()
+    return time.perf_counter() - started
+
+
+async def bulk(importer_class, body: bytes, format: str) -> dict:
+    db = SessionLocal()
+    try:
+        summary = None
+        async for event in importer_class(db).run(io.BytesIO(body), format):
+            if event["type"] == "error":
+                print(f"  row {event['row']}: {event['error']}")
+            summary = event
+        return summary
+    finally:
+        db.close()
+
+
+def main(assets: int, users: int) -> None:
+    sample = min(assets, SINGLE_SAMPLE)
+    seconds = create_one_by_one(sample)
+    single_rate = sample / seconds
+    print(f"one by one: {sample} assets in {seconds:.2f}s ({single_rate:.0f} rows/s)")
+
+    summary = asyncio.run(bulk(AssetImporter, assets_csv(assets), "csv"))
+    rate = summary["created"] / summary["seconds"] if summary["seconds"] else float("inf")
+    print(f"bulk csv:   {summary['created']} assets in {summary['seconds']:.2f}s ({rate:.0f} rows/s, {rate / single_rate:.1f}x)")
+
+    if users:
+        summary = asyncio.run(bulk(UserImporter, users_ndjson(users), "ndjson"))
+        rate = summary["created"] / summary["seconds"]
+        print(
+            f"bulk users: {summary['created']} in {summary['seconds']:.2f}s ({rate:.1f} rows/s "
+            f"on {password_pool.workers} hashing workers; 100k users would take {100000 / rate / 60:.0f} min)"
+        )
+
+
+if __name__ == "__main__":
+    from main import startup  # noqa: E402
+
+    os.chdir(_workdir)
+    asyncio.run(startup())
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    )
@@ -0,0 +1,96 @@
+"""Throughput benchmark of custody actions against a scratch SQLite database.
+
+Runs check-out/return cycles through CustodyService with the mock gateway
+and reports actions per second and database commits per action, then
+compares kitting out a set of assets one request at a time with the bulk
+action. Run from the backend directory:
+
+    python -m benchmarks.custody_actions [cycles]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp(prefix="geocustody-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+os.environ["GATEWAY_MODE"] = "mock"
+
+from sqlalchemy import event  # noqa: E402
+
+from app.core.database import SessionLocal, engine  # noqa: E402
+from app.models import User  # noqa: E402
+from app.services.custody_service import CustodyService  # noqa: E402
+
+ASSET_ID = 1
+SITE_ID = 1
+KIT_ASSET_IDS = [1, 2, 3, 4, 5, 6, 11]
+
+
+async def run(cycles: int) -> None:
+    commits = 0
+
+    @event.listens_for(engine, "commit")
+    def count_commit(conn):
+        nonlocal commits
+        commits += 1
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.role == "ADMIN").first()
+        service = CustodyService(db)
+        # Warm up caches and the first chain/anchor writes
+        await service.checkout(ASSET_ID, SITE_ID, user)
+        await service.return_asset(ASSET_ID, SITE_ID, user)
+
+        commits = 0
+        started = time.perf_counter()
+        for _ in range(cycles):
+            await service.checkout(ASSET_ID, SITE_ID, user)
+            await service.return_asset(ASSET_ID, SITE_ID, user)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+
+    actions = cycles * 2
+    print(f"{actions} actions in {elapsed:.2f}s: {actions / elapsed:,.0f} actions/s, "
+          f"{commits / actions:.2f} commits/action")
+
+
+async def run_kit(cycles: int) -> None:
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.role == "ADMIN").first()
+        service = CustodyService(db)
+
+        started = time.perf_counter()
+        for _ in range(cycles):
+            for asset_id in KIT_ASSET_IDS:
+                await service.checkout(asset_id, SITE_ID, user)
+            for asset_id in KIT_ASSET_IDS:
+                await service.return_asset(asset_id, SITE_ID, user)
+        single = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(cycles):
+            await service.bulk_action("CHECK_OUT", SITE_ID, user, asset_ids=KIT_ASSET_IDS)
+            await service.bulk_action("CHECK_IN", SITE_ID, user, asset_ids=KIT_ASSET_IDS)
+        bulk = time.perf_counter() - started
+    finally:
+        db.close()
+
+    actions = cycles * 2 * len(KIT_ASSET_IDS)
+    print(f"Kit of {len(KIT_ASSET_IDS)} assets: {actions / single:,.0f} actions/s one by one, "
+          f"{actions / bulk:,.0f} actions/s in bulk")
+
+
+if __name__ == "__main__":
+    from main import startup  # noqa: E402
+
+    # Relative data paths (segments, journal) land in the scratch directory
+    os.chdir(_workdir)
+    asyncio.run(startup())
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    asyncio.run(run(cycles))
+    asyncio.run(run_kit(max(cycles // 10, 1)))
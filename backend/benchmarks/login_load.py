@@ -0,0 +1,96 @@
+"""Load test of concurrent logins against a scratch SQLite database.
+
+Sends bursts of logins through the ASGI app while a probe requests /health
+every 10ms, and reports login throughput and probe latency, counted from
+when each probe was due. "inline" runs
+bcrypt on the event loop as login used to; the other rows use the password
+pool with 1 worker up to one per CPU. Run from the backend directory:
+
+    python -m benchmarks.login_load [logins] [concurrency]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp(prefix="geocustody-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+os.environ["GATEWAY_MODE"] = "mock"
+
+import httpx  # noqa: E402
+
+from app.api import auth  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.password_pool import password_pool  # noqa: E402
+from app.core.security import verify_password, verify_password_async  # noqa: E402
+
+CREDENTIALS = {"email": "admin@geocustody.com", "password": "admin123"}
+
+
+async def verify_inline(plain_password: str, hashed_password: str) -> bool:
+    return verify_password(plain_password, hashed_password)
+
+
+async def burst(app, logins: int, concurrency: int) -> None:
+    done = asyncio.Event()
+    probe_latencies = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def probe():
+            while not done.is_set():
+                # Measured from when the probe was due, so time spent
+                # waiting for a blocked event loop counts
+                due = time.perf_counter() + 0.01
+                await asyncio.sleep(0.01)
+                await client.get("/health")
+                probe_latencies.append(time.perf_counter() - due)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def login():
+            async with semaphore:
+                response = await client.post("/api/auth/login", json=CREDENTIALS)
+                response.raise_for_status()
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    probe_ms = sorted(latency * 1000 for latency in probe_latencies)
+    p95 = probe_ms[int(len(probe_ms) * 0.95)] if probe_ms else 0.0
+    print(f"{logins / elapsed:6.1f} logins/s, /health p50 {statistics.median(probe_ms or [0]):7.1f}ms "
+          f"p95 {p95:7.1f}ms max {max(probe_ms or [0]):7.1f}ms ({len(probe_ms)} probes)")
+
+
+async def run(logins: int, concurrency: int) -> None:
+    from main import app
+
+    print("inline:      ", end="")
+    auth.verify_password_async = verify_inline
+    await burst(app, logins, concurrency)
+    auth.verify_password_async = verify_password_async
+
+    workers = 1
+    while True:
+        settings.PASSWORD_HASH_WORKERS = workers
+        password_pool._executor = None
+        print(f"{workers:2d} worker(s): ", end="")
+        await burst(app, logins, concurrency)
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(workers * 2, os.cpu_count() or 1)
+
+
+if __name__ == "__main__":
+    from main import startup  # noqa: E402
+
+    os.chdir(_workdir)
+    asyncio.run(startup())
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    asyncio.run(run(logins, concurrency))
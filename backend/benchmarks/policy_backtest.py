@@ -0,0 +1,149 @@
+"""Benchmark of policy backtesting over a scratch database of audit events.
+
+Fills a scratch SQLite database with synthetic assets, users and custody
+decisions, then times the grouped backtest against evaluating every event in
+Python. Run from the backend directory:
+
+    python -m benchmarks.policy_backtest [events] [assets] [users]
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_workdir = tempfile.mkdtemp(prefix="geocustody-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+os.environ["GATEWAY_MODE"] = "mock"
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.models import Asset, AuditEvent, Site, User  # noqa: E402
+from app.services.policy_backtest import PolicyBacktest  # noqa: E402
+from app.services.policy_engine import BUILTIN_RULES, CompiledPolicy, PolicyInput  # noqa: E402
+
+BATCH = 50000
+
+# Candidate: any SIM swap on a MEDIUM or HIGH asset is denied outright
+CANDIDATE_RULES = [
+    {
+        "name": "SIM_SWAP_DENY",
+        "decision": "DENY",
+        "reason": "Recent SIM swap on a sensitive asset.",
+        "sensitivities": ["MEDIUM", "HIGH"],
+        "sim_swap_recent": True
+    },
+    *BUILTIN_RULES
+]
+
+
+def fill(events: int, assets: int, users: int) -> None:
+    db = SessionLocal()
+    try:
+        site_ids = [site_id for (site_id,) in db.query(Site.id)]
+        rng = random.Random(0)
+        db.execute(insert(Asset), [
+            {
+                "tag_id": f"BENCH-{i}",
+                "name": f"Bench asset {i}",
+                "sensitivity_level": rng.choice(("LOW", "MEDIUM", "HIGH")),
+                "site_id": rng.choice(site_ids)
+            }
+            for i in range(assets)
+        ])
+        db.execute(insert(User), [
+            {
+                "email": f"bench{i}@example.com",
+                "hashed_password": "-",
+                "full_name": f"Bench {i}",
+                "role": rng.choice(("EMPLOYEE", "EMPLOYEE", "MANAGER"))
+            }
+            for i in range(users)
+        ])
+        db.commit()
+        asset_ids = [asset_id for (asset_id,) in db.query(Asset.id)]
+        user_ids = [user_id for (user_id,) in db.query(User.id)]
+        start = datetime(2025, 1, 1)
+        for offset in range(0, events, BATCH):
+            db.execute(insert(AuditEvent), [
+                {
+                    "timestamp": start + timedelta(seconds=offset + i),
+                    "asset_id": rng.choice(asset_ids),
+                    "actor_user_id": rng.choice(user_ids),
+                    "action": rng.choice(("CHECK_OUT", "CHECK_IN", "TRANSFER")),
+                    "decision": rng.choice(("ALLOW", "ALLOW", "ALLOW", "STEP_UP", "DENY")),
+                    "site_id": rng.choice(site_ids),
+                    "number_match": rng.random() > 0.02,
+                    "inside_geofence": rng.random() > 0.05,
+                    "sim_swap": rng.random() < 0.03,
+                    "device_swap": rng.random() < 0.03,
+                    "hash": "0" * 64
+                }
+                for i in range(min(BATCH, events - offset))
+            ])
+            db.commit()
+    finally:
+        db.close()
+
+
+def per_event(rules) -> int:
+    """Reference: load every event and evaluate it on its own."""
+    policy = CompiledPolicy(rules)
+    db = SessionLocal()
+    try:
+        assets = {asset.id: asset.sensitivity_level for asset in db.query(Asset)}
+        roles = {user.id: user.role for user in db.query(User)}
+        onsite = {site.id: site.requires_onsite for site in db.query(Site)}
+        changed = 0
+        rows = db.query(
+            AuditEvent.action, AuditEvent.asset_id, AuditEvent.actor_user_id, AuditEvent.site_id,
+            AuditEvent.number_match, AuditEvent.inside_geofence, AuditEvent.sim_swap,
+            AuditEvent.device_swap, AuditEvent.decision
+        ).yield_per(BATCH)
+        for action, asset_id, user_id, site_id, number_match, inside, sim_swap, device_swap, decision in rows:
+            result = policy.evaluate(PolicyInput(
+                action, assets[asset_id], roles[user_id], bool(onsite.get(site_id)),
+                number_match is not False, inside is not False, bool(sim_swap), bool(device_swap)
+            ))
+            changed += result.decision.value != decision
+        return changed
+    finally:
+        db.close()
+
+
+def main(events: int, assets: int, users: int) -> None:
+    started = time.perf_counter()
+    fill(events, assets, users)
+    print(f"Inserted {events:,} events in {time.perf_counter() - started:.1f}s")
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        report = PolicyBacktest(db).run(CANDIDATE_RULES)
+        grouped = time.perf_counter() - started
+    finally:
+        db.close()
+
+    started = time.perf_counter()
+    changed = per_event(CANDIDATE_RULES)
+    single = time.perf_counter() - started
+
+    assert changed == report["changed"], (changed, report["changed"])
+    print(f"{report['events']:,} events, {report['changed']:,} changed: grouped {grouped:.2f}s, "
+          f"per event {single:.2f}s ({single / grouped:.1f}x)")
+    print(f"over {assets:,} extra assets and {users:,} extra users")
+
+
+if __name__ == "__main__":
+    from main import startup  # noqa: E402
+
+    os.chdir(_workdir)
+    asyncio.run(startup())
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20000,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    )
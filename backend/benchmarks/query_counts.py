@@ -0,0 +1,141 @@
+"""Check that list endpoints issue the same number of statements at any page size.
+
+Counts the SQL statements each list endpoint sends to a scratch SQLite
+database with a before_cursor_execute listener, first with a few rows of
+each kind and again after seeding many more, and lists audit events at a
+small and a large limit. Related assets, users and sites are loaded in one
+IN query per type, so a count that grows with the page is an N+1 query; it
+is printed and exits with status 1.
+
+Run from the backend directory:
+
+    python -m benchmarks.query_counts [rows]
+"""
+import os
+import sys
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="geocustody-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'bench.db')}"
+os.environ["GATEWAY_MODE"] = "mock"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core.database import SessionLocal, engine  # noqa: E402
+from app.models import ApprovalRequest, Asset, Site, User  # noqa: E402
+from app.services.audit_service import AuditService  # noqa: E402
+
+SMALL = 5
+ENDPOINTS = ("/api/approvals", "/api/assets", "/api/users")
+
+
+def seed(count: int) -> None:
+    """Add count users, assets, approvals and audit events, each referring to different rows."""
+    db = SessionLocal()
+    try:
+        site_ids = [site_id for (site_id,) in db.query(Site.id)]
+        hashed_password = db.query(User.hashed_password).first()[0]
+        start = db.query(User).count()
+        users = [
+            User(
+                email=f"query{start + i}@example.com",
+                hashed_password=hashed_password,
+                full_name=f"Query user {start + i}",
+                role="EMPLOYEE",
+                home_site_id=site_ids[i % len(site_ids)]
+            )
+            for i in range(count)
+        ]
+        db.add_all(users)
+        db.flush()
+        assets = [
+            Asset(
+                tag_id=f"QUERY-{start + i}",
+                name=f"Query asset {start + i}",
+                sensitivity_level="LOW",
+                status="CHECKED_OUT",
+                site_id=site_ids[i % len(site_ids)],
+                current_custodian_id=user.id
+            )
+            for i, user in enumerate(users)
+        ]
+        db.add_all(assets)
+        db.flush()
+        db.add_all(
+            ApprovalRequest(
+                asset_id=asset.id,
+                requester_id=user.id,
+                target_user_id=users[i - 1].id,
+                action="TRANSFER",
+                site_id=asset.site_id,
+                reason="Query count check"
+            )
+            for i, (user, asset) in enumerate(zip(users, assets))
+        )
+        db.commit()
+
+        service = AuditService(db)
+        for i, (user, asset) in enumerate(zip(users, assets)):
+            service.create_event(
+                asset_id=asset.id,
+                actor_user_id=user.id,
+                action="TRANSFER",
+                decision="ALLOW",
+                site_id=asset.site_id,
+                target_user_id=users[i - 1].id,
+                verification_summary={"number_verified": True, "row": start + i},
+                commit=False
+            )
+        service.commit()
+    finally:
+        db.close()
+
+
+def statements(client: TestClient, path: str, headers: dict) -> int:
+    """Statements issued by a GET after a warm-up request has filled the caches."""
+    count = 0
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        nonlocal count
+        count += 1
+
+    assert client.get(path, headers=headers).status_code == 200
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        response = client.get(path, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+    assert response.status_code == 200, (path, response.status_code, response.text)
+    return count
+
+
+def main(rows: int) -> None:
+    from main import app  # noqa: E402
+
+    os.chdir(_workdir)
+    with TestClient(app) as client:
+        token = client.post(
+            "/api/auth/login", json={"email": "admin@geocustody.com", "password": "admin123"}
+        ).json()["token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        seed(SMALL)
+        small = {path: statements(client, path, headers) for path in ENDPOINTS}
+        seed(rows)
+        large = {path: statements(client, path, headers) for path in ENDPOINTS}
+        small["/api/audit/events"] = statements(client, f"/api/audit/events?limit={SMALL}", headers)
+        large["/api/audit/events"] = statements(client, f"/api/audit/events?limit={rows}", headers)
+
+    mismatches = 0
+    for path in small:
+        ok = small[path] == large[path]
+        mismatches += not ok
+        print(f"{path}: {small[path]} statements for a small page, {large[path]} for {rows} rows"
+              f"{'' if ok else '  MISMATCH'}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
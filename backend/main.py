@@ -5,9 +5,15 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.core.database import Base, engine, SessionLocal
+from app.core.migrations import add_missing_columns, ensure_sqlite_autoincrement
 from app.core.security import get_password_hash
 from app.api import api_router
-from app.models import User, Site, Asset
+from app.models import User, Site, Asset, AuditEvent, ApprovalRequest
+from app.services.verification_store import VerificationStore
+from app.services.audit_service import AuditService
+from app.services.audit_archive import AuditArchive, hot_cutoff
+from app.services.audit_search import AuditSearchIndex, ensure_search_schema
+from app.services.policy_store import PolicyRuleStore
 
 # Create data directory
 os.makedirs("data", exist_ok=True)
@@ -31,6 +37,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Next-Offset", "Idempotent-Replayed", "Location", "Retry-After", "Preference-Applied"],
 )
 
 # Include API routes
@@ -226,7 +233,53 @@ def seed_database():
         db.commit()
         
         print(f"Seeded {len(sites)} sites, {len(users)} users, and {len(assets)} assets")
+    
+    finally:
+        db.close()
+
+
+def migrate_verification_summaries():
+    """Move inline verification summaries into the content-addressed store."""
+    db = SessionLocal()
+    
+    try:
+        store = VerificationStore(db)
+        for model in (AuditEvent, ApprovalRequest):
+            migrated = store.migrate_legacy(model)
+            if migrated:
+                print(f"Migrated {migrated} {model.__tablename__} verification summaries")
+    finally:
+        db.close()
+
+
+def migrate_audit_events():
+    """Bring audit events written by older versions up to the current schema."""
+    db = SessionLocal()
+    
+    try:
+        service = AuditService(db)
+        service.assign_legacy_chain_keys()
+        updated = service.backfill_risk_signals()
+        if updated:
+            print(f"Backfilled risk signals on {updated} audit events")
+        
+        # Keep only AUDIT_HOT_MONTHS of events in the hot table
+        if settings.AUDIT_HOT_MONTHS:
+            for segment in AuditArchive(db).seal_before(hot_cutoff(settings.AUDIT_HOT_MONTHS)):
+                print(f"Sealed audit segment {segment.period} ({segment.event_count} events)")
         
+        indexed = AuditSearchIndex(db).backfill()
+        if indexed:
+            print(f"Indexed {indexed} audit events and approvals for search")
+    finally:
+        db.close()
+
+
+def load_policy_rules():
+    """Activate the stored policy rule set, if any."""
+    db = SessionLocal()
+    try:
+        PolicyRuleStore(db).sync(force=True)
     finally:
         db.close()
 
@@ -236,6 +289,15 @@ async def startup():
     """Run startup tasks."""
     # Create database tables
     Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    # Sealed events are gone from the table but their IDs stay taken
+    ensure_sqlite_autoincrement(engine, {"audit_events": "SELECT MAX(last_event_id) FROM audit_segments"})
+    ensure_search_schema(engine)
+    migrate_verification_summaries()
+    migrate_audit_events()
+    load_policy_rules()
+    if not settings.AUDIT_ANCHOR_KEY and (settings.AUDIT_ANCHOR_INTERVAL_EVENTS or settings.AUDIT_ANCHOR_INTERVAL_SECONDS):
+        print("AUDIT_ANCHOR_KEY is not set; signed audit anchors are disabled")
     
     # Seed sample data
     seed_database()